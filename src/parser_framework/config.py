@@ -1,4 +1,8 @@
 SYNTAX_ANALYZER_DEFAULT_NAME = "syntax_analyzer"
 EPSILON = 'ε'
 END_OF_INPUT = '$'
-
+SLR = "slr"  # reduções com lookahead FOLLOW(A)
+LALR = "lalr"  # lookaheads LALR(1) de DeRemer–Pennello sobre a mesma coleção LR(0)
+LR1 = "lr1"  # estados LR(1), fundindo os compatíveis (Pager): poder LR(1) com tamanho próximo ao LALR
+TABLE_CONSTRUCTION_METHODS = (SLR, LALR, LR1)
+DEFAULT_TABLE_CONSTRUCTION = SLR
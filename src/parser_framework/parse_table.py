@@ -0,0 +1,221 @@
+from array import array
+from collections import Counter
+from typing import Dict, List
+
+
+class ParseTable:
+    """
+    Forma compactada das tabelas ACTION e GOTO de um parser LR.
+
+    Terminais e não terminais são numerados (terminal_ids, non_terminal_ids) e cada
+    ação é um inteiro: ERROR (0), ACCEPT (-1), shift s como s + 1 e reduce p como
+    -(p + 2) (ver encode_shift / encode_reduce).
+
+    Cada estado tem uma redução padrão (default_reductions[s], ERROR se nenhuma): a
+    redução mais frequente da sua linha, usada para todo terminal sem ação explícita.
+    Um erro passa então a ser detectado depois de algumas reduções, mas ainda antes de
+    qualquer shift, então as cadeias aceitas são as mesmas. No GOTO, a padrão é por não
+    terminal (default_gotos[A]): o estado destino mais comum de A.
+
+    As entradas restantes são empacotadas por deslocamento de linhas (comb vector): a
+    linha do estado s ocupa action_value[action_base[s] + t] para os terminais t com
+    ação explícita, marcados com action_check[...] == t; as linhas se intercalam nos
+    buracos umas das outras e linhas idênticas compartilham o mesmo deslocamento. O GOTO
+    é empacotado igual, por coluna de não terminal: goto_value[goto_base[A] + s], com
+    goto_check[...] == s.
+    """
+    ERROR = 0
+    ACCEPT = -1
+    FREE = -1  # posição de check sem entrada
+
+    def __init__(self, terminals: List[str], non_terminals: List[str], action_base: array, action_check: array,
+                 action_value: array, default_reductions: array, goto_base: array, goto_check: array,
+                 goto_value: array, default_gotos: array, production_heads: array, production_lengths: array):
+        self.terminals = terminals
+        self.non_terminals = non_terminals
+        self.terminal_ids: Dict[str, int] = {terminal: i for i, terminal in enumerate(terminals)}
+        self.non_terminal_ids: Dict[str, int] = {nt: i for i, nt in enumerate(non_terminals)}
+        self.action_base = action_base
+        self.action_check = action_check
+        self.action_value = action_value
+        self.default_reductions = default_reductions
+        self.goto_base = goto_base
+        self.goto_check = goto_check
+        self.goto_value = goto_value
+        self.default_gotos = default_gotos
+        # Por produção: id do não terminal da cabeça e quantos estados o reduce desempilha
+        self.production_heads = production_heads
+        self.production_lengths = production_lengths
+        self.n_states = len(action_base)
+
+    @staticmethod
+    def encode_shift(state: int) -> int:
+        return state + 1
+
+    @staticmethod
+    def encode_reduce(prod_index: int) -> int:
+        return -(prod_index + 2)
+
+    @staticmethod
+    def decode(code: int):
+        """Ação codificada -> ('shift', s), ('reduce', p), ('accept',) ou None (erro)."""
+        if code > 0:
+            return ('shift', code - 1)
+        if code == ParseTable.ACCEPT:
+            return ('accept',)
+        if code < 0:
+            return ('reduce', -code - 2)
+        return None
+
+    @staticmethod
+    def from_dicts(action_table, goto_table, productions, epsilon: str) -> 'ParseTable':
+        """
+        Compacta as tabelas no formato de ParserGenerator.generate_parser:
+        action_table[estado][terminal] -> ('shift', s) | ('reduce', p) | ('accept',) e
+        goto_table[estado][não terminal] -> estado. Os estados devem ser 0..n-1.
+        epsilon: corpo (epsilon,) é tratado como vazio ao desempilhar.
+        """
+        n_states = len(action_table)
+        terminals = sorted({terminal for row in action_table.values() for terminal in row})
+        terminal_ids = {terminal: i for i, terminal in enumerate(terminals)}
+        non_terminals = list(dict.fromkeys(head for head, _ in productions))
+        non_terminals += sorted({nt for row in goto_table.values() for nt in row} - set(non_terminals))
+        non_terminal_ids = {nt: i for i, nt in enumerate(non_terminals)}
+
+        action_rows = []
+        default_reductions = array('i', [ParseTable.ERROR]) * n_states
+        for state in range(n_states):
+            row = []
+            for terminal, action in action_table[state].items():
+                if action[0] == 'shift':
+                    code = ParseTable.encode_shift(action[1])
+                elif action[0] == 'reduce':
+                    code = ParseTable.encode_reduce(action[1])
+                else:
+                    code = ParseTable.ACCEPT
+                row.append((terminal_ids[terminal], code))
+            reduces = Counter(code for _, code in row if code < ParseTable.ACCEPT)
+            if reduces:
+                default = reduces.most_common(1)[0][0]
+                default_reductions[state] = default
+                row = [(column, code) for column, code in row if code != default]
+            action_rows.append(row)
+
+        # GOTO por coluna: cada não terminal é uma "linha" indexada pelo estado
+        goto_columns = [[] for _ in non_terminals]
+        for state in range(n_states):
+            for nt, target in goto_table.get(state, {}).items():
+                goto_columns[non_terminal_ids[nt]].append((state, target))
+        default_gotos = array('i', [0]) * len(non_terminals)
+        for nt_id, column in enumerate(goto_columns):
+            if column:
+                default = Counter(target for _, target in column).most_common(1)[0][0]
+                default_gotos[nt_id] = default
+                goto_columns[nt_id] = [(state, target) for state, target in column if target != default]
+
+        action_base, action_check, action_value = ParseTable._pack(action_rows, len(terminals))
+        goto_base, goto_check, goto_value = ParseTable._pack(goto_columns, n_states)
+
+        production_heads = array('i', [non_terminal_ids[head] for head, _ in productions])
+        production_lengths = array('i', [0 if tuple(body) == (epsilon,) else len(body) for _, body in productions])
+        return ParseTable(terminals, non_terminals, action_base, action_check, action_value, default_reductions,
+                          goto_base, goto_check, goto_value, default_gotos, production_heads, production_lengths)
+
+    @staticmethod
+    def _pack(rows, width):
+        """
+        Empacota linhas esparsas (listas de (coluna, valor), colunas < width) por
+        deslocamento. Linhas distintas, das mais cheias para as mais vazias, vão para o
+        primeiro deslocamento livre em que não colidem com as já colocadas; linhas iguais
+        reusam o deslocamento da primeira. Retorna (base, check, value), com check[i] a
+        coluna da entrada na posição i (FREE se nenhuma). Deslocamentos de linhas
+        distintas são diferentes, então check identifica a linha; as linhas vazias ficam
+        em uma faixa livre no fim. As tabelas têm folga para que base[r] + coluna nunca
+        passe do fim.
+        """
+        base = array('i', [0]) * len(rows)
+        distinct = {}  # linha (tupla ordenada) -> linhas iguais a ela
+        for r, row in enumerate(rows):
+            distinct.setdefault(tuple(sorted(row)), []).append(r)
+
+        # Bit i de occupied: posição i já tem entrada; bit o de used_bases: deslocamento o já usado
+        occupied = 0
+        used_bases = 0
+        placed = []  # (deslocamento, linha)
+        for row in sorted(distinct, key=lambda row: -len(row)):
+            if not row:
+                continue
+            # O deslocamento o colide se o + c está ocupado para alguma coluna c da linha:
+            # blocked junta todos eles, e o primeiro bit zero é o deslocamento escolhido
+            blocked = used_bases
+            for column, _ in row:
+                blocked |= occupied >> column
+            offset = (~blocked & (blocked + 1)).bit_length() - 1
+            for column, _ in row:
+                occupied |= 1 << (offset + column)
+            used_bases |= 1 << offset
+            placed.append((offset, row))
+            for r in distinct[row]:
+                base[r] = offset
+
+        if () in distinct:
+            # Uma faixa de largura width sem nenhuma entrada
+            empty_base = occupied.bit_length()
+            for r in distinct[()]:
+                base[r] = empty_base
+
+        size = max(base, default=0) + width
+        check = array('i', [ParseTable.FREE]) * size
+        value = array('i', [0]) * size
+        for offset, row in placed:
+            for column, code in row:
+                check[offset + column] = column
+                value[offset + column] = code
+        return base, check, value
+
+    def action(self, state: int, terminal_id: int) -> int:
+        """Ação codificada para o terminal de id terminal_id (None: terminal desconhecido) no estado."""
+        if terminal_id is not None:
+            i = self.action_base[state] + terminal_id
+            if self.action_check[i] == terminal_id:
+                return self.action_value[i]
+        return self.default_reductions[state]
+
+    def goto(self, state: int, non_terminal_id: int) -> int:
+        i = self.goto_base[non_terminal_id] + state
+        if self.goto_check[i] == state:
+            return self.goto_value[i]
+        return self.default_gotos[non_terminal_id]
+
+    def packed_size(self) -> int:
+        """Número de inteiros das tabelas compactadas."""
+        return (len(self.action_base) + len(self.action_check) + len(self.action_value) + len(self.default_reductions)
+                + len(self.goto_base) + len(self.goto_check) + len(self.goto_value) + len(self.default_gotos))
+
+    def dense_size(self) -> int:
+        """Número de células das tabelas ACTION e GOTO como matrizes estados x símbolos."""
+        return self.n_states * (len(self.terminals) + len(self.non_terminals))
+
+    def compression_ratio(self) -> float:
+        return self.dense_size() / max(1, self.packed_size())
+
+    def explicit_actions(self):
+        """Ações explícitas (fora as reduções padrão) por estado, decodificadas, para exibição."""
+        rows = {}
+        for state in range(self.n_states):
+            row = rows[state] = {}
+            base = self.action_base[state]
+            for terminal_id, terminal in enumerate(self.terminals):
+                if self.action_check[base + terminal_id] == terminal_id:
+                    row[terminal] = self.decode(self.action_value[base + terminal_id])
+        return rows
+
+    def explicit_gotos(self):
+        """Entradas GOTO fora do padrão do não terminal, por estado, para exibição."""
+        rows = {state: {} for state in range(self.n_states)}
+        for nt_id, nt in enumerate(self.non_terminals):
+            base = self.goto_base[nt_id]
+            for state in range(self.n_states):
+                if self.goto_check[base + state] == state:
+                    rows[state][nt] = self.goto_value[base + state]
+        return rows
@@ -2,6 +2,198 @@ from src.parser_framework.context_free_grammar import ContextFreeGrammar
 from src.parser_framework.slr_parser import SLRParser
 import src.parser_framework.config as config 
 
+
+class LRItems:
+    """
+    Itens LR(0) de uma gramática aumentada codificados como inteiros.
+
+    A produção p ocupa os itens base[p] .. base[p] + len(corpo): o item base[p] + k tem
+    o ponto antes do k-ésimo símbolo do corpo, então avançar o ponto é somar 1.
+    symbol[item] é o símbolo depois do ponto (None no fim do corpo) e production[item]
+    é o índice da produção em productions_list. Uma produção repetida na mesma cabeça
+    só tem itens iniciais na primeira ocorrência, cujo índice é o usado nas reduções.
+
+    Os não terminais alcançáveis a partir de cada não terminal pelo primeiro símbolo das
+    produções são calculados uma vez (por _digraph) como máscaras; o fecho de um kernel
+    junta as máscaras dos símbolos depois do ponto, e cada máscara distinta é expandida
+    em itens uma única vez, na ordem de position (pós-ordem reversa do mesmo grafo), que
+    o fecho LR(1) usa para propagar lookaheads em uma passada quando não há recursão.
+
+    Também guarda FIRST e anulabilidade como máscaras de terminais (ver _compute_first),
+    por não terminal e por sufixo de corpo: suffix_first[item] é o FIRST do corpo a partir
+    do ponto, calculado uma vez por posição.
+    """
+
+    def __init__(self, grammar: ContextFreeGrammar, productions_list):
+        self.productions_list = productions_list
+        self.nt_index = {}
+        for nt in list(grammar.productions) + sorted(grammar.non_terminals - grammar.productions.keys()):
+            self.nt_index.setdefault(nt, len(self.nt_index))
+
+        self.base = []
+        self.symbol = []
+        self.production = []
+        self.initial_items = [[] for _ in self.nt_index]  # itens com o ponto no início, por não terminal
+        seen = set()
+        for p, (head, body) in enumerate(productions_list):
+            self.base.append(len(self.symbol))
+            for dot_pos in range(len(body) + 1):
+                self.symbol.append(body[dot_pos] if dot_pos < len(body) else None)
+                self.production.append(p)
+            if (head, body) not in seen:
+                seen.add((head, body))
+                self.initial_items[self.nt_index[head]].append(self.base[p])
+
+        # Não terminais que aparecem no início de alguma produção de cada não terminal
+        leading = [[self.nt_index[self.symbol[item]] for item in items if self.symbol[item] in self.nt_index]
+                   for items in self.initial_items]
+        reach = ParserGenerator._digraph(leading, [1 << i for i in range(len(self.nt_index))])
+        self.closure_mask = [reach[self.nt_index[symbol]] if symbol in self.nt_index else 0
+                             for symbol in self.symbol]
+        self.position = self._leading_order(leading)
+        self._closure_non_terminals = {}  # máscara -> não terminais dela, ordenados por position
+        self._closure_items = {}  # máscara de não terminais -> itens iniciais deles
+
+        self.terminals, self.terminal_bit = ParserGenerator._terminal_bits(grammar)
+        self._compute_first()
+
+    def _compute_first(self):
+        """
+        Preenche nullable[nt] e first[nt] (indexados por nt_index) e suffix_first[item] /
+        suffix_nullable[item], sem iterar até um ponto fixo sobre todas as produções:
+          - anuláveis: cada produção conta os símbolos ainda não anuláveis do corpo, e um
+            não terminal que se torna anulável decrementa as produções onde aparece;
+          - FIRST(A) é a união dos terminais que começam A diretamente com os FIRST dos
+            não terminais que podem começá-la (A -> α B ... com α anulável), resolvida por
+            _digraph em uma única busca, com os ciclos tratados como componentes;
+          - os sufixos de cada corpo são percorridos uma vez, do fim para o início.
+        Um corpo (ε,) é tratado como vazio.
+        """
+        nt_index = self.nt_index
+        terminal_bit = self.terminal_bit
+        productions_list = self.productions_list
+
+        self.nullable = nullable = [False] * len(nt_index)
+        remaining = []  # por produção: não terminais do corpo ainda não anuláveis (None se há terminal)
+        occurrences = [[] for _ in nt_index]  # não terminal -> produções onde aparece, uma vez por ocorrência
+        worklist = []
+        for p, (head, body) in enumerate(productions_list):
+            if body == (config.EPSILON,):
+                body = ()
+            if all(symbol in nt_index for symbol in body):
+                remaining.append(len(body))
+                for symbol in body:
+                    occurrences[nt_index[symbol]].append(p)
+                if not body:
+                    worklist.append(nt_index[head])
+            else:
+                remaining.append(None)
+        while worklist:
+            nt = worklist.pop()
+            if nullable[nt]:
+                continue
+            nullable[nt] = True
+            for p in occurrences[nt]:
+                remaining[p] -= 1
+                if not remaining[p]:
+                    worklist.append(nt_index[productions_list[p][0]])
+
+        starts_with = [[] for _ in nt_index]
+        direct_first = [0] * len(nt_index)
+        for head, body in productions_list:
+            if body == (config.EPSILON,):
+                continue
+            head_idx = nt_index[head]
+            for symbol in body:
+                if symbol not in nt_index:
+                    direct_first[head_idx] |= terminal_bit[symbol]
+                    break
+                starts_with[head_idx].append(nt_index[symbol])
+                if not nullable[nt_index[symbol]]:
+                    break
+        self.first = first = ParserGenerator._digraph(starts_with, direct_first)
+
+        # O item no fim de cada corpo fica com o sufixo vazio: máscara 0, anulável
+        self.suffix_first = suffix_first = [0] * len(self.symbol)
+        self.suffix_nullable = suffix_nullable = [True] * len(self.symbol)
+        for p, (head, body) in enumerate(productions_list):
+            mask = 0
+            suffix_is_nullable = True
+            for k in range(len(body) - 1, -1, -1):
+                symbol = body[k]
+                if symbol not in nt_index:
+                    mask = terminal_bit[symbol]
+                    suffix_is_nullable = False
+                elif nullable[nt_index[symbol]]:
+                    mask |= first[nt_index[symbol]]
+                else:
+                    mask = first[nt_index[symbol]]
+                    suffix_is_nullable = False
+                suffix_first[self.base[p] + k] = mask
+                suffix_nullable[self.base[p] + k] = suffix_is_nullable
+
+    @staticmethod
+    def _leading_order(leading):
+        """
+        Posição de cada não terminal em uma pós-ordem reversa do grafo "A começa com B":
+        se A alcança B e B não alcança A, A vem antes de B.
+        """
+        n = len(leading)
+        visited = [False] * n
+        postorder = []
+        for root in range(n):
+            if visited[root]:
+                continue
+            visited[root] = True
+            work = [(root, 0)]
+            while work:
+                nt, i = work[-1]
+                if i < len(leading[nt]):
+                    work[-1] = (nt, i + 1)
+                    successor = leading[nt][i]
+                    if not visited[successor]:
+                        visited[successor] = True
+                        work.append((successor, 0))
+                else:
+                    work.pop()
+                    postorder.append(nt)
+        position = [0] * n
+        for i, nt in enumerate(reversed(postorder)):
+            position[nt] = i
+        return position
+
+    def closure_non_terminals(self, mask):
+        """Não terminais de uma máscara de fecho, em ordem de position."""
+        non_terminals = self._closure_non_terminals.get(mask)
+        if non_terminals is None:
+            non_terminals = []
+            remaining = mask
+            while remaining:
+                low = remaining & -remaining
+                non_terminals.append(low.bit_length() - 1)
+                remaining ^= low
+            non_terminals.sort(key=self.position.__getitem__)
+            non_terminals = self._closure_non_terminals[mask] = tuple(non_terminals)
+        return non_terminals
+
+    def closure(self, kernel):
+        """Fecho LR(0) de um kernel (tupla de itens): o kernel seguido dos itens que ele acrescenta."""
+        mask = 0
+        closure_mask = self.closure_mask
+        for item in kernel:
+            mask |= closure_mask[item]
+        if not mask:
+            return kernel
+
+        items = self._closure_items.get(mask)
+        if items is None:
+            items = []
+            for nt in self.closure_non_terminals(mask):
+                items.extend(self.initial_items[nt])
+            items = self._closure_items[mask] = tuple(items)
+        return kernel + items
+
+
 class ParserGenerator:
     @staticmethod
     def _parse_grammar_from_string(grammar_str: str) -> ContextFreeGrammar:
@@ -64,54 +256,86 @@ class ParserGenerator:
         )
 
     @staticmethod
-    def generate_parser(grammar: ContextFreeGrammar, name: str):
+    def generate_parser(grammar: ContextFreeGrammar, name: str, method: str = config.DEFAULT_TABLE_CONSTRUCTION):
         """
-        Gera um objeto de parser SLR completo a partir da gramática fornecida.
+        Gera um objeto de parser LR completo a partir da gramática fornecida.
+
+        method escolhe como os estados e os lookaheads das reduções são calculados:
+          config.SLR  - coleção LR(0) e FOLLOW(A) para toda redução A -> α;
+          config.LALR - a mesma coleção LR(0), com lookaheads LALR(1) (ver
+                        _compute_lalr_lookaheads), que resolvem conflitos que o SLR
+                        reporta em gramáticas LALR(1); as tabelas têm o mesmo tamanho;
+          config.LR1  - estados LR(1) com fusão de estados compatíveis (ver
+                        _build_lr1_collection): aceita toda gramática LR(1), com poucos
+                        estados a mais que o LALR.
+        O parser guarda o número de estados da coleção LR(0) (o do SLR) em lr0_states.
+        Levanta ValueError se a tabela tiver conflitos.
+        """
+        return SLRParser(ParserGenerator._build_parsing_table(grammar, method), name)
+
+    @staticmethod
+    def _build_parsing_table(grammar: ContextFreeGrammar, method: str):
         """
+        Tabelas de parsing de generate_parser, antes da compactação, no formato lido por
+        SLRParser: {'action', 'goto', 'productions', 'method', 'lr0_states'}.
+        Levanta ValueError se a tabela tiver conflitos.
+        """
+        if method not in config.TABLE_CONSTRUCTION_METHODS:
+            raise ValueError(f"Método de construção de tabela desconhecido: '{method}'.")
+
         # 1. Aumentar a gramática
         augmented_grammar, new_start_symbol = ParserGenerator._augment_grammar(grammar)
         productions_list = [(head, body) for head, bodies in augmented_grammar.productions.items() for body in bodies]
+        items = LRItems(augmented_grammar, productions_list)
 
-        # 2. Calcular conjuntos First e Follow
-        first_sets = ParserGenerator._compute_first_sets(augmented_grammar)
-        follow_sets = ParserGenerator._compute_follow_sets(augmented_grammar, first_sets)
+        # 2. Calcular conjuntos Follow (os First já estão em items)
+        if method == config.SLR:
+            follow_sets = ParserGenerator._compute_follow_sets(augmented_grammar, items)
 
-        # 3. Calcular coleção canônica de itens LR(0)
-        canonical_collection, goto_map = ParserGenerator._build_canonical_collection(augmented_grammar)
+        # 3. Calcular a coleção de estados: LR(0) canônica, ou LR(1) com fusão de estados.
+        # transitions[estado] mapeia símbolo -> próximo estado; reductions[estado] lista as
+        # produções com item completo no estado
+        if method == config.LR1:
+            transitions, reductions, lookaheads, lr0_state_count = ParserGenerator._build_lr1_collection(
+                augmented_grammar, items)
+        else:
+            transitions, reductions = ParserGenerator._build_canonical_collection(items)
+            lr0_state_count = len(transitions)
 
-        # 4. Construir a tabela de parsing SLR (como um dicionário intermediário)
+        if method == config.LALR:
+            lookaheads = ParserGenerator._compute_lalr_lookaheads(augmented_grammar, items, transitions)
+
+        # 4. Construir a tabela de parsing (como um dicionário intermediário)
         action_table = {}
         goto_table = {}
-        for i, item_set in enumerate(canonical_collection):
-            action_table[i] = {}
-            goto_table[i] = {}
-            for symbol in augmented_grammar.non_terminals:
-                if (i, symbol) in goto_map:
-                    goto_table[i][symbol] = goto_map[(i, symbol)]
-            for item in item_set:
-                head, body, dot_pos = item
-                if dot_pos < len(body):
-                    next_symbol = body[dot_pos]
-                    if next_symbol in augmented_grammar.terminals and (i, next_symbol) in goto_map:
-                        target_state = goto_map[(i, next_symbol)]
-                        if next_symbol in action_table[i] and action_table[i][next_symbol][0] == 'reduce':
-                            raise ValueError(f"Conflito Shift/Reduce no estado {i} para o símbolo '{next_symbol}'")
-                        action_table[i][next_symbol] = ('shift', target_state)
+        non_terminals = augmented_grammar.non_terminals
+        for i, state_transitions in enumerate(transitions):
+            actions = action_table[i] = {}
+            gotos = goto_table[i] = {}
+            for symbol, target_state in state_transitions.items():
+                if symbol in non_terminals:
+                    gotos[symbol] = target_state
                 else:
-                    if head == new_start_symbol:
-                        action_table[i][config.END_OF_INPUT] = ('accept',)
-                    else:
-                        prod_to_reduce = (head, body)
-                        prod_index = productions_list.index(prod_to_reduce)
-                        for terminal in follow_sets[head]:
-                            if terminal in action_table[i]:
-                                raise ValueError(f"Conflito no estado {i} para o símbolo '{terminal}'")
-                            action_table[i][terminal] = ('reduce', prod_index)
-        
-        parsing_table_dict = {'action': action_table, 'goto': goto_table, 'productions': productions_list}
-        
-        # 5. Criar e retornar a instância do parser
-        return SLRParser(parsing_table_dict, name)
+                    actions[symbol] = ('shift', target_state)
+
+            for prod_index in reductions[i]:
+                head = productions_list[prod_index][0]
+                if head == new_start_symbol:
+                    terminals = (config.END_OF_INPUT,)
+                    action = ('accept',)
+                else:
+                    terminals = follow_sets[head] if method == config.SLR else lookaheads.get((i, prod_index), ())
+                    action = ('reduce', prod_index)
+                for terminal in terminals:
+                    existing = actions.get(terminal)
+                    if existing is not None:
+                        if existing[0] == 'shift':
+                            raise ValueError(f"Conflito Shift/Reduce no estado {i} para o símbolo '{terminal}'")
+                        raise ValueError(f"Conflito no estado {i} para o símbolo '{terminal}'")
+                    actions[terminal] = action
+
+        return {'action': action_table, 'goto': goto_table, 'productions': productions_list,
+                'method': method, 'lr0_states': lr0_state_count}
 
     @staticmethod
     def _augment_grammar(grammar: ContextFreeGrammar):
@@ -132,171 +356,384 @@ class ParserGenerator:
         ), new_start_symbol
 
     @staticmethod
-    def _compute_first_sets(grammar: ContextFreeGrammar):
-        first = {nt: set() for nt in grammar.non_terminals}
-        changed = True
-        while changed:
-            changed = False
-            for head, bodies in grammar.productions.items():
-                for body in bodies:
-                    # Regra para produções com épsilon
-                    if body == (config.EPSILON,):
-                        if config.EPSILON not in first[head]:
-                            first[head].add(config.EPSILON)
-                            changed = True
-                        continue
-                    
-                    # Iterar sobre os símbolos da produção
-                    for symbol in body:
-                        # Se for um terminal, adicione-o ao conjunto First
-                        if symbol in grammar.terminals:
-                            if symbol not in first[head]:
-                                first[head].add(symbol)
-                                changed = True
-                            break # Para a próxima produção
-                        
-                        # Se for um não-terminal
-                        if symbol in grammar.non_terminals:
-                            first_of_symbol = first[symbol]
-                            # Adicionar tudo de First(symbol) exceto épsilon
-                            for f in first_of_symbol - {config.EPSILON}:
-                                if f not in first[head]:
-                                    first[head].add(f)
-                                    changed = True
-                            
-                            # Se épsilon não está em First(symbol), parar
-                            if config.EPSILON not in first_of_symbol:
-                                break
-                    else: # Loop completou sem break (todos os símbolos derivam épsilon)
-                        if config.EPSILON not in first[head]:
-                            first[head].add(config.EPSILON)
-                            changed = True
-        return first
+    def _compute_follow_sets(grammar: ContextFreeGrammar, items: LRItems):
+        """
+        FOLLOW de cada não terminal. Para cada A -> α B β, FOLLOW(B) recebe FIRST(β)
+        (items.suffix_first) e, se β é anulável, inclui FOLLOW(A); a relação é resolvida
+        por _digraph em uma única passada. Retorna um mapa não terminal -> conjunto de terminais.
+        """
+        nt_index = items.nt_index
+        includes = [[] for _ in nt_index]
+        direct_follow = [0] * len(nt_index)
+        direct_follow[nt_index[grammar.start_symbol]] = items.terminal_bit[config.END_OF_INPUT]
+        for p, (head, body) in enumerate(items.productions_list):
+            for k, symbol in enumerate(body):
+                if symbol in nt_index:
+                    beta = items.base[p] + k + 1
+                    direct_follow[nt_index[symbol]] |= items.suffix_first[beta]
+                    if items.suffix_nullable[beta]:
+                        includes[nt_index[symbol]].append(nt_index[head])
+        follow = ParserGenerator._digraph(includes, direct_follow)
+        return {nt: ParserGenerator._terminals_of_mask(follow[i], items.terminals) for nt, i in nt_index.items()}
 
     @staticmethod
-    def _get_first_of_sequence(sequence, first_sets, terminals):
-        """Calcula o conjunto First para uma sequência de símbolos."""
-        result = set()
-        for symbol in sequence:
-            if symbol in terminals:
-                result.add(symbol)
-                return result
-            
-            symbol_first = first_sets.get(symbol, set())
-            result.update(symbol_first - {config.EPSILON})
-            if config.EPSILON not in symbol_first:
-                return result
-        
-        result.add(config.EPSILON)
+    def _build_canonical_collection(items: LRItems):
+        """
+        Constrói a coleção canônica de conjuntos de itens LR(0).
+
+        Cada estado é identificado pelo seu kernel (tupla ordenada de itens). Os
+        sucessores de um estado saem de uma única passada pelo seu fecho, agrupando os
+        itens pelo símbolo depois do ponto, então só são visitados os símbolos que de
+        fato seguem um ponto.
+        Retorna (transitions, reductions): transitions[estado] mapeia símbolo -> estado
+        e reductions[estado] lista as produções reduzíveis no estado.
+        """
+        symbol_after_dot = items.symbol
+        production_of = items.production
+        closure = items.closure
+
+        # O estado inicial tem o kernel [S' -> .S]
+        kernels = [(items.base[0],)]
+        state_ids = {kernels[0]: 0}
+        transitions = []
+        reductions = []
+
+        state_idx = 0
+        while state_idx < len(kernels):
+            successors = {}
+            completed = []
+            for item in closure(kernels[state_idx]):
+                symbol = symbol_after_dot[item]
+                if symbol is None:
+                    completed.append(production_of[item])
+                else:
+                    successors.setdefault(symbol, []).append(item + 1)
+
+            state_transitions = {}
+            for symbol, next_kernel in successors.items():
+                next_kernel = tuple(sorted(next_kernel))
+                target = state_ids.get(next_kernel)
+                if target is None:
+                    # Novo estado encontrado
+                    target = state_ids[next_kernel] = len(kernels)
+                    kernels.append(next_kernel)
+                state_transitions[symbol] = target
+
+            transitions.append(state_transitions)
+            reductions.append(completed)
+            state_idx += 1
+
+        return transitions, reductions
+
+    @staticmethod
+    def _digraph(relation, initial):
+        """
+        Algoritmo Digraph de DeRemer e Pennello: calcula, para cada nó x de 0..n-1,
+            F(x) = initial[x] ∪ ⋃ { F(y) | y em relation[x] }
+        em uma única busca em profundidade (Tarjan), dando o mesmo F a todos os nós de um
+        componente fortemente conexo. Os conjuntos são máscaras de bits (int).
+        """
+        n = len(initial)
+        result = list(initial)
+        depth = [0] * n  # 0: não visitado; n + 1: componente já concluído
+        entry_depth = [0] * n  # altura da pilha quando o nó foi visitado
+        stack = []
+        completed = n + 1
+
+        for root in range(n):
+            if depth[root]:
+                continue
+            stack.append(root)
+            depth[root] = entry_depth[root] = len(stack)
+            work = [(root, 0)]  # (nó, próximo sucessor a visitar)
+            while work:
+                x, i = work[-1]
+                successors = relation[x]
+                if i < len(successors):
+                    work[-1] = (x, i + 1)
+                    y = successors[i]
+                    if not depth[y]:
+                        stack.append(y)
+                        depth[y] = entry_depth[y] = len(stack)
+                        work.append((y, 0))
+                        continue
+                    if depth[y] < depth[x]:
+                        depth[x] = depth[y]
+                    result[x] |= result[y]
+                    continue
+
+                work.pop()
+                if depth[x] == entry_depth[x]:
+                    # x é a raiz de um componente: todos os nós acima dele na pilha o compartilham
+                    while True:
+                        y = stack.pop()
+                        depth[y] = completed
+                        result[y] = result[x]
+                        if y == x:
+                            break
+                if work:
+                    parent = work[-1][0]
+                    if depth[x] < depth[parent]:
+                        depth[parent] = depth[x]
+                    result[parent] |= result[x]
         return result
 
     @staticmethod
-    def _compute_follow_sets(grammar: ContextFreeGrammar, first_sets):
-        follow = {nt: set() for nt in grammar.non_terminals}
-        follow[grammar.start_symbol].add(config.END_OF_INPUT)
-        
-        changed = True
-        while changed:
-            changed = False
-            for head, bodies in grammar.productions.items():
-                for body in bodies:
-                    for i, symbol in enumerate(body):
-                        if symbol in grammar.non_terminals:
-                            beta = body[i+1:]
-                            
-                            # Regra 2: A -> αBβ
-                            if beta:
-                                first_of_beta = ParserGenerator._get_first_of_sequence(
-                                    beta, first_sets, grammar.terminals
-                                )
-                                # Adicionar First(β) \ {ε} a Follow(B)
-                                for f in first_of_beta - {config.EPSILON}:
-                                    if f not in follow[symbol]:
-                                        follow[symbol].add(f)
-                                        changed = True
-                                
-                                # Se ε ∈ First(β), adicionar Follow(A) a Follow(B)
-                                if config.EPSILON in first_of_beta:
-                                    for f in follow[head]:
-                                        if f not in follow[symbol]:
-                                            follow[symbol].add(f)
-                                            changed = True
-                            
-                            # Regra 3: A -> αB
-                            else:
-                                for f in follow[head]:
-                                    if f not in follow[symbol]:
-                                        follow[symbol].add(f)
-                                        changed = True
-        return follow
+    def _compute_lalr_lookaheads(grammar: ContextFreeGrammar, items: LRItems, transitions):
+        """
+        Lookaheads LALR(1) pelo método de DeRemer e Pennello ("Efficient Computation of
+        LALR(1) Look-Ahead Sets", 1982), sobre a coleção LR(0) já construída.
+
+        Os nós são as transições (p, A) por não terminais. Read(p, A) são os terminais
+        lidos logo após a transição, também através de não terminais anuláveis (relação
+        reads); Follow(p, A) acrescenta os Follow das transições que a incluem (relação
+        includes: B -> β A γ com γ anulável e p' --β--> p). Cada relação é resolvida por
+        _digraph em tempo linear no tamanho do autômato. O lookahead de A -> ω no estado
+        q é a união dos Follow(p, A) com p --ω--> q (lookback).
+
+        Retorna um mapa (estado, índice da produção) -> conjunto de terminais.
+        """
+        non_terminals = grammar.non_terminals
+        nullable = {nt for nt, i in items.nt_index.items() if items.nullable[i]}
+        terminals, terminal_bit = items.terminals, items.terminal_bit
+        symbol_after_dot = items.symbol
+        # S' -> S: a entrada termina depois da transição (0, S)
+        original_start = symbol_after_dot[items.base[0]]
+
+        nt_transitions = [(state, symbol) for state, state_transitions in enumerate(transitions)
+                          for symbol in state_transitions if symbol in non_terminals]
+        transition_index = {transition: i for i, transition in enumerate(nt_transitions)}
+
+        # DR (terminais lidos diretamente) e reads
+        direct_reads = []
+        reads = []
+        for state, symbol in nt_transitions:
+            target = transitions[state][symbol]
+            mask = terminal_bit[config.END_OF_INPUT] if state == 0 and symbol == original_start else 0
+            read_transitions = []
+            for next_symbol in transitions[target]:
+                if next_symbol not in non_terminals:
+                    mask |= terminal_bit[next_symbol]
+                elif next_symbol in nullable:
+                    read_transitions.append(transition_index[(target, next_symbol)])
+            direct_reads.append(mask)
+            reads.append(read_transitions)
+        read_sets = ParserGenerator._digraph(reads, direct_reads)
+
+        # includes e lookback, percorrendo cada produção a partir de cada transição da sua cabeça
+        includes = [[] for _ in nt_transitions]
+        lookback = {}
+        for i, (state, head) in enumerate(nt_transitions):
+            for initial_item in items.initial_items[items.nt_index[head]]:
+                body = items.productions_list[items.production[initial_item]][1]
+                nullable_suffix_start = len(body)
+                while nullable_suffix_start > 0 and body[nullable_suffix_start - 1] in nullable:
+                    nullable_suffix_start -= 1
+
+                current = state
+                for pos, symbol in enumerate(body):
+                    if symbol in non_terminals and pos + 1 >= nullable_suffix_start:
+                        includes[transition_index[(current, symbol)]].append(i)
+                    current = transitions[current][symbol]
+                lookback.setdefault((current, items.production[initial_item]), []).append(i)
+        follow_sets = ParserGenerator._digraph(includes, read_sets)
+
+        lookaheads = {}
+        for key, lookback_transitions in lookback.items():
+            mask = 0
+            for i in lookback_transitions:
+                mask |= follow_sets[i]
+            lookaheads[key] = ParserGenerator._terminals_of_mask(mask, terminals)
+        return lookaheads
 
     @staticmethod
-    def _closure(items, grammar: ContextFreeGrammar):
-        """Calcula o fecho de um conjunto de itens LR(0)."""
-        closure_set = set(items)
-        worklist = list(items)
-        
-        while worklist:
-            item = worklist.pop(0)
-            head, body, dot_pos = item
-            
-            if dot_pos < len(body):
-                next_symbol = body[dot_pos]
-                if next_symbol in grammar.non_terminals:
-                    for prod_body in grammar.productions.get(next_symbol, []):
-                        new_item = (next_symbol, prod_body, 0)
-                        if new_item not in closure_set:
-                            closure_set.add(new_item)
-                            worklist.append(new_item)
-        return frozenset(closure_set)
+    def _terminal_bits(grammar: ContextFreeGrammar):
+        """Terminais (incluindo o fim da entrada) em ordem fixa e o bit de cada um nas máscaras de lookahead."""
+        terminals = list(dict.fromkeys(sorted(grammar.terminals) + [config.END_OF_INPUT]))
+        return terminals, {terminal: 1 << i for i, terminal in enumerate(terminals)}
 
     @staticmethod
-    def _goto(item_set, symbol, grammar: ContextFreeGrammar):
-        """Calcula a função GOTO."""
-        new_items = set()
-        for item in item_set:
-            head, body, dot_pos = item
-            if dot_pos < len(body) and body[dot_pos] == symbol:
-                new_items.add((head, body, dot_pos + 1))
-        return ParserGenerator._closure(new_items, grammar)
+    def _terminals_of_mask(mask, terminals):
+        result = set()
+        while mask:
+            low = mask & -mask
+            result.add(terminals[low.bit_length() - 1])
+            mask ^= low
+        return result
 
     @staticmethod
-    def _build_canonical_collection(grammar: ContextFreeGrammar):
-        """Constrói a coleção canônica de conjuntos de itens LR(0)."""
-        all_symbols = grammar.non_terminals.union(grammar.terminals)
-        
-        # O item inicial é (S' -> .S, 0)
-        initial_prod_body = grammar.productions[grammar.start_symbol][0]
-        initial_item = (grammar.start_symbol, initial_prod_body, 0)
-        
-        # I0 = CLOSURE({[S' -> .S]})
-        i0 = ParserGenerator._closure({initial_item}, grammar)
-        
-        states = [i0]
-        state_map = {i0: 0}
-        goto_map = {}
-        
-        worklist = [0] # Fila de trabalho com índices de estados
-        
+    def _lookaheads_compatible(kernel, other):
+        """
+        Compatibilidade fraca de Pager entre dois kernels LR(1) com o mesmo núcleo LR(0)
+        (mapas item -> máscara de lookaheads): fundi-los não cria conflito
+        reduce/reduce que não exista no LR(1) canônico. Para todo par de itens i != j,
+        exige que os lookaheads não se cruzem (L1[i] ∩ L2[j] e L2[i] ∩ L1[j] vazios) ou
+        que o par já compartilhe lookaheads em um dos dois kernels.
+        """
+        items = list(kernel)
+        for i in range(len(items)):
+            a1, a2 = kernel[items[i]], other[items[i]]
+            for j in range(i + 1, len(items)):
+                b1, b2 = kernel[items[j]], other[items[j]]
+                if (a1 & b2 or a2 & b1) and not (a1 & b1 or a2 & b2):
+                    return False
+        return True
+
+
+    @staticmethod
+    def _build_lr1_collection(grammar: ContextFreeGrammar, items: LRItems):
+        """
+        Coleção de conjuntos de itens LR(1) com fusão de estados compatíveis (Pager,
+        "A Practical General Method for Constructing LR(k) Parsers", 1977).
+
+        Cada estado é identificado pelo seu kernel: mapa item LR(0) -> máscara de
+        lookaheads. Um GOTO cujo kernel tem o mesmo núcleo LR(0) de um estado existente e
+        é fracamente compatível com ele (ver _lookaheads_compatible) é fundido nesse
+        estado em vez de criar outro; se a fusão acrescentou lookaheads, o estado é
+        processado de novo para propagá-los aos sucessores (que podem então ir para
+        outro estado, deixando estados inalcançáveis, descartados no final). Gramáticas
+        LR(1) ficam sem conflitos, com um número de estados próximo ao do LALR.
+
+        Retorna (transitions, reductions, lookaheads, lr0_states), com transitions e
+        reductions como em _build_canonical_collection, lookaheads mapeando
+        (estado, índice da produção) -> conjunto de terminais e lr0_states o número de
+        núcleos LR(0) distintos (o número de estados do SLR).
+        """
+        non_terminals = grammar.non_terminals
+        terminals, terminal_bit = items.terminals, items.terminal_bit
+        symbol_after_dot = items.symbol
+        production_of = items.production
+        nt_index = items.nt_index
+        initial_items = items.initial_items
+        suffix_first = items.suffix_first
+        suffix_nullable = items.suffix_nullable
+
+        # Fecho LR(1) sobre o grafo de não terminais: todos os itens iniciais de um não
+        # terminal B recebem os mesmos lookaheads, vindos de cada produção X -> B δ do fecho
+        # (FIRST(δ), mais os lookaheads de X se δ for anulável). edges[X] guarda essas
+        # arestas, menos as de X -> X δ, cujo FIRST(δ) fica em self_lookaheads[X]
+        edges = []
+        self_lookaheads = []
+        for nt, nt_items in enumerate(initial_items):
+            nt_edges = []
+            own = 0
+            for item in nt_items:
+                symbol = symbol_after_dot[item]
+                if symbol in non_terminals:
+                    mask, nullable = suffix_first[item + 1], suffix_nullable[item + 1]
+                    if nt_index[symbol] == nt:
+                        own |= mask
+                    else:
+                        nt_edges.append((nt_index[symbol], mask, nullable))
+            edges.append(nt_edges)
+            self_lookaheads.append(own)
+        position = items.position
+        closure_mask = items.closure_mask
+
+        def closure(kernel):
+            nt_lookaheads = {}
+            mask = 0
+            for item, lookahead in kernel.items():
+                next_symbol = symbol_after_dot[item]
+                if next_symbol in non_terminals:
+                    first_mask = suffix_first[item + 1]
+                    if suffix_nullable[item + 1]:
+                        first_mask |= lookahead
+                    nt = nt_index[next_symbol]
+                    nt_lookaheads[nt] = nt_lookaheads.get(nt, 0) | first_mask
+                    mask |= closure_mask[item]
+
+            # Em ordem de position uma passada basta, exceto quando uma aresta volta para
+            # um não terminal já visitado (recursão entre não terminais)
+            order = items.closure_non_terminals(mask)
+            repeat = True
+            while repeat:
+                repeat = False
+                for nt in order:
+                    lookahead = nt_lookaheads.get(nt, 0) | self_lookaheads[nt]
+                    nt_lookaheads[nt] = lookahead
+                    for target, first_mask, nullable in edges[nt]:
+                        new_mask = first_mask | lookahead if nullable else first_mask
+                        old_mask = nt_lookaheads.get(target, 0)
+                        if new_mask & ~old_mask:
+                            nt_lookaheads[target] = old_mask | new_mask
+                            if position[target] < position[nt]:
+                                repeat = True
+
+            closure_items = dict(kernel)
+            for nt in order:
+                lookahead = nt_lookaheads[nt]
+                for item in initial_items[nt]:
+                    closure_items[item] = lookahead
+            return closure_items
+
+        kernels = [{items.base[0]: terminal_bit[config.END_OF_INPUT]}]
+        states_by_core = {(items.base[0],): [0]}
+        state_transitions = [{}]
+        worklist = [0]
+        queued = {0}
+
         while worklist:
-            state_idx = worklist.pop(0)
-            current_state_items = states[state_idx]
-            
-            for symbol in all_symbols:
-                next_state_items = ParserGenerator._goto(current_state_items, symbol, grammar)
-                
-                if not next_state_items:
-                    continue
-                
-                if next_state_items not in state_map:
-                    # Novo estado encontrado
-                    new_state_idx = len(states)
-                    states.append(next_state_items)
-                    state_map[next_state_items] = new_state_idx
-                    worklist.append(new_state_idx)
-                    goto_map[(state_idx, symbol)] = new_state_idx
+            state_idx = worklist.pop()
+            queued.discard(state_idx)
+
+            successors = {}
+            for item, mask in closure(kernels[state_idx]).items():
+                symbol = symbol_after_dot[item]
+                if symbol is not None:
+                    successors.setdefault(symbol, {})[item + 1] = mask
+
+            for symbol, kernel in successors.items():
+                current = state_transitions[state_idx].get(symbol)
+                candidates = states_by_core.setdefault(tuple(sorted(kernel)), [])
+                if current is not None:
+                    candidates = [current] + [c for c in candidates if c != current]
+                target = None
+                for candidate in candidates:
+                    if ParserGenerator._lookaheads_compatible(kernels[candidate], kernel):
+                        target = candidate
+                        break
+
+                if target is None:
+                    target = len(kernels)
+                    kernels.append(kernel)
+                    state_transitions.append({})
+                    states_by_core[tuple(sorted(kernel))].append(target)
+                    changed = True
                 else:
-                    # Estado já existe
-                    goto_map[(state_idx, symbol)] = state_map[next_state_items]
-                    
-        return states, goto_map
+                    target_kernel = kernels[target]
+                    changed = False
+                    for item, mask in kernel.items():
+                        if mask & ~target_kernel[item]:
+                            target_kernel[item] |= mask
+                            changed = True
+                state_transitions[state_idx][symbol] = target
+                if changed and target not in queued:
+                    queued.add(target)
+                    worklist.append(target)
+
+        # Renumera apenas os estados alcançáveis a partir do inicial
+        order = [0]
+        new_index = {0: 0}
+        i = 0
+        while i < len(order):
+            for target in state_transitions[order[i]].values():
+                if target not in new_index:
+                    new_index[target] = len(order)
+                    order.append(target)
+            i += 1
+
+        transitions = []
+        reductions = []
+        lookaheads = {}
+        for state in order:
+            state_idx = new_index[state]
+            transitions.append({symbol: new_index[target] for symbol, target in state_transitions[state].items()})
+            completed = []
+            for item, mask in closure(kernels[state]).items():
+                if symbol_after_dot[item] is None:
+                    completed.append(production_of[item])
+                    lookaheads[(state_idx, production_of[item])] = ParserGenerator._terminals_of_mask(mask, terminals)
+            reductions.append(completed)
+        lr0_states = len({tuple(sorted(kernels[state])) for state in order})
+        return transitions, reductions, lookaheads, lr0_states
@@ -1,6 +1,6 @@
 from src.parser_framework.parser_generator import ParserGenerator
 import src.parser_framework.config as config
-from typing import List, Tuple
+from typing import Sequence
 from src.parser_framework.utils import read_file_as_string
 
 class PgFramework:
@@ -8,11 +8,12 @@ class PgFramework:
         self.application = application
         self.loaded_parsers = []
         self.current_parser = None
+        self.table_construction = config.DEFAULT_TABLE_CONSTRUCTION  # config.SLR, config.LALR ou config.LR1
 
     #     framework.select_parser("Parser")
     #     framework.parse(["id", "+", "id"], verbose=True)
     def generate(self, glc_filename: str, name=config.SYNTAX_ANALYZER_DEFAULT_NAME):
-        """Endpoint para gerar o parser SLR a partir de uma gramática e palavras reservadas."""
+        """Endpoint para gerar o parser LR (ver set_table_construction) a partir de uma gramática e palavras reservadas."""
 
         for p in self.loaded_parsers:
             if p.name == name:
@@ -24,23 +25,37 @@ class PgFramework:
         print("\n--- Gramática Carregada e Estruturada ---")
         print(grammar)
 
-        slr_parser = ParserGenerator.generate_parser(grammar, name)
+        slr_parser = ParserGenerator.generate_parser(grammar, name, self.table_construction)
 
-        print("\n--- Analisador SLR Gerado ---")
+        print(f"\n--- Analisador {self.table_construction.upper()} Gerado ---")
         print(slr_parser)
+        self.application.log(
+            f"Parser '{name}' ({slr_parser.method.upper()}): {slr_parser.n_states} estados "
+            f"(coleção LR(0)/SLR: {slr_parser.lr0_states} estados); tabelas compactadas "
+            f"{slr_parser.table.compression_ratio():.1f}x.")
 
         self.loaded_parsers.append(slr_parser)
         self.current_parser = slr_parser
 
         return self.current_parser.name 
 
-    def parse(self, tokens: List[Tuple[str, str]], verbose: bool = False):
+    def parse(self, tokens: Sequence, verbose: bool = False):
 
         if not self.current_parser:
             raise ValueError("Nenhum parser selecionado.")
 
         return self.current_parser.parse(tokens, verbose)
 
+    def set_table_construction(self, method: str) -> bool:
+        """Define como os próximos parsers constroem as tabelas: config.SLR, config.LALR ou config.LR1."""
+        if method not in config.TABLE_CONSTRUCTION_METHODS:
+            self.application.error(
+                f"Método de construção de tabela '{method}' desconhecido. Use um de: {', '.join(config.TABLE_CONSTRUCTION_METHODS)}.")
+            return False
+        self.table_construction = method
+        self.application.log(f"Construção de tabelas de parsing: {method.upper()}")
+        return True
+
     # métodos de manipulação do front-end
     def set_current_parser(self, analyzer_name: str) -> bool:
         for p in self.loaded_parsers:
@@ -1,11 +1,16 @@
 import pprint
-from typing import List, Tuple
+from typing import Sequence
 import src.parser_framework.config as config
+from src.parser_framework.parse_table import ParseTable
 
 class SLRParser:
     """
     Um analisador sintático SLR que utiliza uma tabela de parsing gerada
     para validar uma cadeia de tokens.
+
+    As tabelas ACTION/GOTO recebidas como dicionários são compactadas em um ParseTable
+    (reduções padrão e linhas deslocadas em arrays de inteiros), e a análise consulta
+    diretamente a forma compactada.
     """
     def __init__(self, parsing_table, name):
         """
@@ -16,27 +21,47 @@ class SLRParser:
         
         self.name = name
             
-        self.action_table = parsing_table['action']
-        self.goto_table = parsing_table['goto']
         self.productions = parsing_table['productions']
+        self.table = ParseTable.from_dicts(parsing_table['action'], parsing_table['goto'], self.productions,
+                                           config.EPSILON)
+        self.n_states = self.table.n_states
         self.start_state = 0
+        # Como a tabela foi construída (config.SLR, LALR ou LR1) e quantos estados a
+        # coleção LR(0) (a do SLR) teria, para comparação
+        self.method = parsing_table.get('method', config.SLR)
+        self.lr0_states = parsing_table.get('lr0_states', self.n_states)
 
-    def parse(self, tokens: List[Tuple[str, str]], verbose: bool = False):
+    def parse(self, tokens: Sequence, verbose: bool = False):
         """
-        Processa uma lista de tuplas (lexeme, token_type) de acordo com a gramática e a tabela SLR.
+        Processa uma sequência de tokens de acordo com a gramática e a tabela SLR.
         Retorna True se a cadeia for aceita, levanta um ValueError em caso de erro.
         
-        :param tokens: Uma lista de tuplas (lexeme, token_type) representando os tokens da entrada.
+        :param tokens: Uma lista de tuplas (lexeme, token_type) representando os tokens da entrada,
+                       ou um TokenBuffer do analisador léxico, lido diretamente sem ser convertido.
         :param verbose: Se True, imprime os passos da análise.
         """
         # --- ETAPA DE PRÉ-PROCESSAMENTO DA ENTRADA ---
-        # Extrai os tipos de token para usar na lógica do parser
-        token_types = [token[1] for token in tokens] + [config.END_OF_INPUT]
-        # Mantém os lexemas originais para logs e mensagens de erro
-        lexemes = [token[0] for token in tokens] + [config.END_OF_INPUT]
+        # Acesso ao TIPO (lógica do parser) e ao LEXEMA (logs e mensagens de erro) de cada
+        # token, sem copiar a entrada para listas auxiliares
+        n_tokens = len(tokens)
+        if hasattr(tokens, 'type_name'):
+            type_at = tokens.type_name
+            lexeme_at = tokens.lexeme
+        else:
+            def type_at(i): return tokens[i][1]
+            def lexeme_at(i): return tokens[i][0]
         
+        table = self.table
+        terminal_ids = table.terminal_ids
+        action_base, action_check, action_value = table.action_base, table.action_check, table.action_value
+        default_reductions = table.default_reductions
+        production_heads, production_lengths = table.production_heads, table.production_lengths
+
         stack = [self.start_state]
         input_ptr = 0
+        # Id do terminal atual (None se o tipo não aparece na gramática), atualizado a cada shift
+        current_token_type = type_at(input_ptr) if input_ptr < n_tokens else config.END_OF_INPUT
+        terminal_id = terminal_ids.get(current_token_type)
 
         if verbose:
             print(f"{'PILHA':<30} {'ENTRADA':<40} {'AÇÃO'}")
@@ -44,58 +69,57 @@ class SLRParser:
 
         while True:
             current_state = stack[-1]
-            # Usa o TIPO de token para a lógica da tabela
-            current_token_type = token_types[input_ptr]
-            
+
             if verbose:
                 stack_str = ' '.join(map(str, stack))
                 # Mostra os LEXEMAS originais na fita de entrada para melhor legibilidade
-                input_str = ' '.join(lexemes[input_ptr:])
+                input_str = ' '.join([lexeme_at(i) for i in range(input_ptr, n_tokens)] + [config.END_OF_INPUT])
                 print(f"{stack_str:<30} {input_str:<40}", end="")
 
-            # Consultar a tabela de ação usando o TIPO do token
-            action = self.action_table[current_state].get(current_token_type)
+            # Consultar a tabela de ação usando o TIPO do token; sem entrada explícita,
+            # vale a redução padrão do estado
+            action = default_reductions[current_state]
+            if terminal_id is not None:
+                i = action_base[current_state] + terminal_id
+                if action_check[i] == terminal_id:
+                    action = action_value[i]
 
-            if action is None:
+            if action == ParseTable.ERROR:
                 # --- MENSAGEM DE ERRO MELHORADA ---
                 # Usa o lexema original para uma mensagem mais clara
-                unexpected_lexeme = lexemes[input_ptr]
+                unexpected_lexeme = lexeme_at(input_ptr) if input_ptr < n_tokens else config.END_OF_INPUT
                 raise ValueError(
                     f"Erro de sintaxe: token inesperado '{unexpected_lexeme}' (tipo: {current_token_type}) no estado {current_state}."
                 )
 
             # --- Ação de SHIFT ---
-            if action[0] == 'shift':
-                _, next_state = action
+            if action > 0:
+                next_state = action - 1
                 stack.append(next_state)
                 input_ptr += 1
+                current_token_type = type_at(input_ptr) if input_ptr < n_tokens else config.END_OF_INPUT
+                terminal_id = terminal_ids.get(current_token_type)
                 if verbose: print(f" Shift para o estado {next_state}")
-            
-            # --- Ação de REDUCE ---
-            elif action[0] == 'reduce':
-                _, prod_index = action
-                head, body = self.productions[prod_index]
-                
-                # Pop da pilha (0 se for épsilon, len(body) caso contrário)
-                if body != (config.EPSILON,):
-                    for _ in body:
-                        stack.pop()
-                
-                state_after_pop = stack[-1]
-                # Consultar a tabela GOTO
-                goto_state = self.goto_table[state_after_pop][head]
-                stack.append(goto_state)
-                if verbose: print(f" Reduzir por {head} -> {' '.join(body)}")
 
             # --- Ação de ACCEPT ---
-            elif action[0] == 'accept':
+            elif action == ParseTable.ACCEPT:
                 if verbose: print(" Aceito! Análise concluída.")
                 return True
-            
+
+            # --- Ação de REDUCE ---
             else:
-                # Isso não deve acontecer
-                raise RuntimeError("Ação desconhecida na tabela de parsing.")
-            
+                prod_index = -action - 2
+                # Pop da pilha (0 se for épsilon, len(body) caso contrário)
+                length = production_lengths[prod_index]
+                if length:
+                    del stack[-length:]
+
+                # Consultar a tabela GOTO
+                stack.append(table.goto(stack[-1], production_heads[prod_index]))
+                if verbose:
+                    head, body = self.productions[prod_index]
+                    print(f" Reduzir por {head} -> {' '.join(body)}")
+
     def get_info(self):
         return f"Analisador Sintático: {self.name}\n{self.__repr__}"
 
@@ -107,14 +131,26 @@ class SLRParser:
         
         formatted_productions = "\n".join(prod_str_list)
 
+        table = self.table
+        default_reductions = {state: ParseTable.decode(code) for state, code in enumerate(table.default_reductions)
+                              if code != ParseTable.ERROR}
+        default_gotos = {nt: table.default_gotos[i] for i, nt in enumerate(table.non_terminals)}
+
         return (
-            f"<SLRParser com {len(self.action_table)} estados>\n"
+            f"<SLRParser com {self.n_states} estados ({self.method.upper()}; "
+            f"coleção LR(0): {self.lr0_states} estados)>\n"
             f"=========================================\n\n"
             f"--- PRODUÇÕES NUMERADAS ---\n"
             f"{formatted_productions}\n\n"
-            f"--- TABELA ACTION ---\n"
-            f"{pprint.pformat(self.action_table, indent=2, width=120)}\n\n"
-            f"--- TABELA GOTO ---\n"
-            f"{pprint.pformat(self.goto_table, indent=2, width=120)}\n"
+            f"--- TABELA ACTION (sem as reduções padrão) ---\n"
+            f"{pprint.pformat(table.explicit_actions(), indent=2, width=120)}\n\n"
+            f"--- REDUÇÕES PADRÃO ---\n"
+            f"{pprint.pformat(default_reductions, indent=2, width=120)}\n\n"
+            f"--- TABELA GOTO (sem os destinos padrão) ---\n"
+            f"{pprint.pformat(table.explicit_gotos(), indent=2, width=120)}\n\n"
+            f"--- GOTO PADRÃO ---\n"
+            f"{pprint.pformat(default_gotos, indent=2, width=120)}\n\n"
+            f"Tabelas compactadas: {table.packed_size()} inteiros "
+            f"(densas: {table.dense_size()}; compressão {table.compression_ratio():.1f}x)\n"
             f"========================================="
         )
@@ -6,6 +6,19 @@ class Automata:
         self.start_state = start_state
         self.accept_states = set(accept_states)
 
+    def symbol_for(self, char):
+        """
+        Returns the alphabet symbol that matches `char`: the character itself, or the
+        character range (lo, hi) that contains it. Returns None if there is none.
+        """
+        if char in self.alphabet:
+            return char
+        code = ord(char)
+        for symbol in self.alphabet:
+            if isinstance(symbol, tuple) and symbol[0] <= code <= symbol[1]:
+                return symbol
+        return None
+
     def is_accepting(self, state):
         return state in self.accept_states
 
@@ -1,4 +1,5 @@
 from src.scanner_framework.automatas.automata import Automata
+from src.scanner_framework.char_ranges import format_range
 
 class DeterministicFiniteAutomata(Automata):
     def __init__(self, states, alphabet, transitions, start_state, accept_states):
@@ -9,8 +10,9 @@ class DeterministicFiniteAutomata(Automata):
 
         self.reset()
 
-        for symbol in input_string:
-            if symbol not in self.alphabet:
+        for char in input_string:
+            symbol = self.symbol_for(char)
+            if symbol is None:
                 return False
 
             transition_key = (self.current_state, symbol)
@@ -21,6 +23,124 @@ class DeterministicFiniteAutomata(Automata):
 
         return self.is_accepting(self.current_state)
 
+    def states_in_order(self, alphabet=None):
+        """
+        States in breadth-first order from the start state, following symbols in sorted
+        order, then the unreachable ones sorted by name. Unlike iterating self.states,
+        the order does not depend on the hash seed.
+        """
+        if alphabet is None:
+            alphabet = sorted(self.alphabet)
+        order = [self.start_state]
+        seen = {self.start_state}
+        for state in order:
+            for symbol in alphabet:
+                target = self.transitions.get((state, symbol))
+                if target is not None and target not in seen:
+                    seen.add(target)
+                    order.append(target)
+        order.extend(sorted((state for state in self.states if state not in seen), key=str))
+        return order
+
+    def minimize(self, accept_labels=None):
+        """
+        Returns an equivalent minimal DFA, built with Hopcroft's partition refinement.
+
+        accept_labels: optional map accept state -> label. Accept states with different
+                       labels are never merged (e.g. different token types). By default
+                       all accept states share the same label.
+
+        Missing transitions go to an implicit dead state, whose block is dropped at the end.
+        Each merged state keeps the name of its first member in states_in_order (the start
+        state keeps its own), and transitions are added in that order, so the result does
+        not depend on the hash seed.
+        Returns (minimized_dfa, state_map), where state_map maps each original state to its
+        merged state; states equivalent to the dead state are absent from the map.
+        """
+        if accept_labels is None:
+            accept_labels = {state: True for state in self.accept_states}
+
+        alphabet = sorted(self.alphabet)
+        states = self.states_in_order(alphabet)
+        state_index = {state: i for i, state in enumerate(states)}
+        dead = len(states)
+        n_states = dead + 1
+
+        # inverse[symbol][q] = states that move to q on symbol (dead state included)
+        inverse = {symbol: [[] for _ in range(n_states)] for symbol in alphabet}
+        for symbol in alphabet:
+            inverse_symbol = inverse[symbol]
+            for i, state in enumerate(states):
+                target = self.transitions.get((state, symbol))
+                inverse_symbol[dead if target is None else state_index[target]].append(i)
+            inverse_symbol[dead].append(dead)
+
+        # Initial partition: non-accepting (+ dead) and one block per accept label
+        initial_blocks = {}
+        for i, state in enumerate(states):
+            label = accept_labels.get(state) if state in self.accept_states else None
+            initial_blocks.setdefault(label, set()).add(i)
+        initial_blocks.setdefault(None, set()).add(dead)
+
+        blocks = list(initial_blocks.values())
+        block_of = [0] * n_states
+        for b, block in enumerate(blocks):
+            for q in block:
+                block_of[q] = b
+
+        largest = max(range(len(blocks)), key=lambda b: len(blocks[b]))
+        worklist = {b for b in range(len(blocks)) if b != largest}
+
+        while worklist:
+            splitter = list(blocks[worklist.pop()])
+            for symbol in alphabet:
+                inverse_symbol = inverse[symbol]
+                touched = {}
+                for q in splitter:
+                    for p in inverse_symbol[q]:
+                        touched.setdefault(block_of[p], set()).add(p)
+
+                for b, inside in touched.items():
+                    block = blocks[b]
+                    if len(inside) == len(block):
+                        continue
+                    block -= inside
+                    new_b = len(blocks)
+                    blocks.append(inside)
+                    for q in inside:
+                        block_of[q] = new_b
+                    if b in worklist or len(inside) <= len(block):
+                        worklist.add(new_b)
+                    else:
+                        worklist.add(b)
+
+        # One state per block, named after its smallest member index
+        dead_block = block_of[dead]
+        representative = {b: states[min(block)] for b, block in enumerate(blocks) if b != dead_block}
+        state_map = {state: representative[block_of[i]]
+                     for i, state in enumerate(states) if block_of[i] != dead_block}
+
+        new_transitions = {}
+        for state in states:
+            if state_map.get(state) != state:
+                continue  # Not a representative: its block's moves are added by the representative
+            for symbol in alphabet:
+                target = self.transitions.get((state, symbol))
+                if target in state_map:
+                    new_transitions[(state, symbol)] = state_map[target]
+
+        minimized = DeterministicFiniteAutomata(
+            states=set(representative.values()),
+            alphabet=self.alphabet,
+            transitions=new_transitions,
+            start_state=state_map.get(self.start_state, self.start_state),
+            accept_states={state_map[s] for s in self.accept_states if s in state_map}
+        )
+        if self.start_state not in state_map:
+            # The language is empty: keep a lone, non-accepting start state
+            minimized.states.add(self.start_state)
+        return minimized, state_map
+
     def __str__(self):
         def fmt_state(s):
             if isinstance(s, frozenset):
@@ -30,10 +150,10 @@ class DeterministicFiniteAutomata(Automata):
         result = []
         result.append("DeterministicFiniteAutomata:")
         result.append(f"  States: {[fmt_state(s) for s in self.states]}")
-        result.append(f"  Alphabet: {sorted(self.alphabet)}")
+        result.append(f"  Alphabet: {[format_range(s) for s in sorted(self.alphabet)]}")
         result.append("  Transitions:")
         for (state, symbol), target in self.transitions.items():
-            result.append(f"    δ({fmt_state(state)}, '{symbol}') → {fmt_state(target)}")
+            result.append(f"    δ({fmt_state(state)}, '{format_range(symbol)}') → {fmt_state(target)}")
         result.append(f"  Start State: {fmt_state(self.start_state)}")
         result.append(f"  Accept States: {[fmt_state(s) for s in self.accept_states]}")
         return "\n".join(result)
@@ -46,16 +166,21 @@ class DeterministicFiniteAutomata(Automata):
 
     def to_file_format(self) -> str:
         lines = []
+        alphabet = sorted(self.alphabet)
+        states = self.states_in_order(alphabet)
 
         lines.append(str(len(self.states)))
 
         lines.append(str(self.start_state))
 
-        lines.append(','.join(str(state) for state in self.accept_states))
+        lines.append(','.join(str(state) for state in states if state in self.accept_states))
 
-        lines.append(','.join(str(symbol) for symbol in self.alphabet))
+        lines.append(','.join(format_range(symbol) for symbol in alphabet))
 
-        for (state, symbol), next_state in self.transitions.items():
-            lines.append(f"{state},{symbol},{next_state}")
+        for state in states:
+            for symbol in alphabet:
+                next_state = self.transitions.get((state, symbol))
+                if next_state is not None:
+                    lines.append(f"{state},{format_range(symbol)},{next_state}")
 
         return '\n'.join(lines)
@@ -1,4 +1,5 @@
 from src.scanner_framework.automatas.automata import Automata
+from src.scanner_framework.char_ranges import format_range
 
 class NonDeterministicFiniteAutomata(Automata):
     EPSILON = '&'  # Convention for representing epsilon transitions
@@ -20,10 +21,12 @@ class NonDeterministicFiniteAutomata(Automata):
         # NFA tracks a set of active states.
         self.active_states = set()
         # The self.current_state attribute from the base class is not used by this NFA's logic.
+        self._closures = None  # state -> epsilon closure, filled on first use
 
     def _epsilon_closure(self, input_states):
         """
-        Computes the epsilon closure for a given set of states.
+        Computes the epsilon closure for a given set of states, as the union of the
+        cached per-state closures (see _state_closures).
         Args:
             input_states (set): A set of states.
         Returns:
@@ -32,21 +35,95 @@ class NonDeterministicFiniteAutomata(Automata):
         if not isinstance(input_states, set):
             raise TypeError("Input states must be a set.")
 
-        closure = set(input_states)
-        worklist = list(input_states) # Use a list as a queue/stack
-
-        while worklist:
-            current_s = worklist.pop(0)  # Process states FIFO for clarity, though order doesn't strictly matter for closure
-            
-            # Get states reachable by an epsilon transition
-            epsilon_moves = self.transitions.get((current_s, self.EPSILON), set())
-            
-            for state in epsilon_moves:
-                if state not in closure:
-                    closure.add(state)
-                    worklist.append(state)
+        closures = self._state_closures()
+        closure = set()
+        for state in input_states:
+            state_closure = closures.get(state)
+            if state_closure is None:
+                closure.add(state)  # No epsilon moves: the state is its own closure
+            else:
+                closure |= state_closure
         return closure
 
+    def epsilon_closure_of(self, state):
+        """Cached epsilon closure of a single state (a frozenset)."""
+        return self._state_closures().get(state) or frozenset((state,))
+
+    def _state_closures(self):
+        """
+        Returns {state: frozenset} with the epsilon closure of every state that has
+        epsilon moves, computed once and cached on the automaton. The epsilon graph is
+        condensed into strongly connected components (iterative Tarjan): all states of
+        a component share one closure, and components are completed in reverse
+        topological order, so each closure is its component plus the already computed
+        closures of its successors. The cache assumes the transitions are not changed
+        after the first closure is requested.
+        """
+        if self._closures is not None:
+            return self._closures
+
+        epsilon_moves = {}
+        for (state, symbol), targets in self.transitions.items():
+            if symbol == self.EPSILON and targets:
+                epsilon_moves[state] = targets
+
+        closures = {}
+        index, low = {}, {}
+        stack, on_stack = [], set()
+
+        def visit(state):
+            index[state] = low[state] = len(index)
+            stack.append(state)
+            on_stack.add(state)
+            work.append((state, iter(epsilon_moves.get(state, ()))))
+
+        for root in epsilon_moves:
+            if root in index:
+                continue
+            work = []
+            visit(root)
+            while work:
+                state, successors = work[-1]
+                descended = False
+                for successor in successors:
+                    if successor not in index:
+                        visit(successor)
+                        descended = True
+                        break
+                    if successor in on_stack:
+                        low[state] = min(low[state], index[successor])
+                if descended:
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[state])
+
+                if low[state] == index[state]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == state:
+                            break
+
+                    closure = set(component)
+                    for member in component:
+                        for successor in epsilon_moves.get(member, ()):
+                            successor_closure = closures.get(successor)
+                            if successor_closure is not None:
+                                closure |= successor_closure
+                            else:
+                                closure.add(successor)  # Same component, or a state without epsilon moves
+                    closure = frozenset(closure)
+                    for member in component:
+                        closures[member] = closure
+
+        self._closures = closures
+        return closures
+
     def reset(self):
         """
         Resets the NFA to its initial configuration.
@@ -65,8 +142,9 @@ class NonDeterministicFiniteAutomata(Automata):
         """
         self.reset()  # Initialize active_states
 
-        for symbol in input_string:
-            if symbol not in self.alphabet:
+        for char in input_string:
+            symbol = self.symbol_for(char)
+            if symbol is None:
                 # Symbol is not in the NFA's input alphabet
                 # Note: self.EPSILON is not expected in the input_string
                 return False  # Reject the string
@@ -104,7 +182,7 @@ class NonDeterministicFiniteAutomata(Automata):
             lines = []
             for (state, symbol), targets in sorted(self.transitions.items(), key=lambda item: (fmt_state(item[0][0]), item[0][1])):
                 targets_str = ", ".join(sorted(targets))
-                lines.append(f"    δ({fmt_state(state)}, '{symbol}') → {{{targets_str}}}")
+                lines.append(f"    δ({fmt_state(state)}, '{format_range(symbol)}') → {{{targets_str}}}")
             return "\n".join(lines)
 
         lines = [
@@ -116,7 +194,7 @@ class NonDeterministicFiniteAutomata(Automata):
 
         lines.append("  Alphabet:")
         for symbol in sorted(self.alphabet):
-            lines.append(f"    '{symbol}'")
+            lines.append(f"    '{format_range(symbol)}'")
 
         lines.append("  Transitions:")
         lines.append(fmt_transitions())
@@ -0,0 +1,29 @@
+"""
+Conjuntos de inteiros pequenos representados como bitmasks (int do Python).
+
+O bit i de uma máscara indica que o elemento i pertence ao conjunto. União é `|`,
+interseção é `&` e a própria máscara serve de chave de dicionário, com hash barato.
+"""
+
+from typing import Iterable, Iterator
+
+
+def mask_of(elements: Iterable[int]) -> int:
+    """Máscara com os bits dos elementos dados."""
+    mask = 0
+    for element in elements:
+        mask |= 1 << element
+    return mask
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Elementos de uma máscara, em ordem crescente."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def lowest_bit(mask: int) -> int:
+    """Menor elemento de uma máscara não vazia."""
+    return (mask & -mask).bit_length() - 1
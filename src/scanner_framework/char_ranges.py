@@ -0,0 +1,79 @@
+"""
+Conjuntos de caracteres representados como intervalos fechados de code points.
+
+Um intervalo é uma tupla (lo, hi); um conjunto é uma tupla ordenada de intervalos
+disjuntos e não adjacentes. Os símbolos do alfabeto dos autômatos gerados a partir
+de expressões regulares são intervalos, de modo que classes como [a-zA-Z] ou [^"]
+não precisam ser expandidas caractere a caractere.
+"""
+
+from bisect import bisect_right
+from typing import Iterable, List, Sequence, Tuple
+
+MAX_CODE_POINT = 0x10FFFF
+
+CharRange = Tuple[int, int]
+RangeSet = Tuple[CharRange, ...]
+
+
+def normalize(ranges: Iterable[CharRange]) -> RangeSet:
+    """Ordena e funde intervalos sobrepostos ou adjacentes."""
+    merged: List[List[int]] = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], hi)
+        else:
+            merged.append([lo, hi])
+    return tuple((lo, hi) for lo, hi in merged)
+
+
+def complement(ranges: RangeSet) -> RangeSet:
+    """Complemento de um conjunto normalizado em relação a todos os code points."""
+    result = []
+    next_lo = 0
+    for lo, hi in ranges:
+        if lo > next_lo:
+            result.append((next_lo, lo - 1))
+        next_lo = hi + 1
+    if next_lo <= MAX_CODE_POINT:
+        result.append((next_lo, MAX_CODE_POINT))
+    return tuple(result)
+
+
+def split_into_atoms(range_sets: Sequence[RangeSet]) -> Tuple[List[CharRange], List[List[int]]]:
+    """
+    Divide a união dos conjuntos dados em intervalos elementares (átomos) disjuntos,
+    de forma que cada conjunto seja exatamente uma união de átomos.
+    Retorna (atoms, covers), com os átomos ordenados e covers[i] os índices dos
+    átomos contidos em range_sets[i].
+    """
+    points = sorted({p for ranges in range_sets for lo, hi in ranges for p in (lo, hi + 1)})
+    atom_index = {}
+    atoms: List[CharRange] = []
+    covers: List[List[int]] = []
+
+    for ranges in range_sets:
+        covered = []
+        for lo, hi in ranges:
+            k = bisect_right(points, lo) - 1
+            while points[k] <= hi:
+                atom = (points[k], points[k + 1] - 1)
+                if atom not in atom_index:
+                    atom_index[atom] = len(atoms)
+                    atoms.append(atom)
+                covered.append(atom_index[atom])
+                k += 1
+        covers.append(covered)
+
+    # Renumera os átomos em ordem crescente
+    order = sorted(range(len(atoms)), key=lambda i: atoms[i])
+    new_index = {old: new for new, old in enumerate(order)}
+    return [atoms[i] for i in order], [[new_index[i] for i in covered] for covered in covers]
+
+
+def format_range(symbol) -> str:
+    """Representação legível de um símbolo de alfabeto: 'a', 'a-z' ou o próprio símbolo."""
+    if isinstance(symbol, tuple) and len(symbol) == 2:
+        lo, hi = symbol
+        return chr(lo) if lo == hi else f"{chr(lo)}-{chr(hi)}"
+    return str(symbol)
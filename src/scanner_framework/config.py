@@ -1 +1,11 @@
-LEXICAL_ANALYZER_DEFAULT_NAME = "lexical_analyzer"
\ No newline at end of file
+LEXICAL_ANALYZER_DEFAULT_NAME = "lexical_analyzer"
+ERROR_TOKEN_TYPE = "erro!"  # token type given to unexpected characters
+STREAM_CHUNK_SIZE = 1 << 16  # characters read per chunk by LexicalAnalyzer.iter_tokens
+STREAM_LOOKAHEAD = 8  # tokens that TokenStream.peek can look ahead
+PARALLEL_CHUNK_SIZE = 1 << 20  # characters per chunk in SgFramework.analyze_parallel
+PARALLEL_OVERLAP = 1 << 12  # extra characters each worker may read past its chunk
+LAZY_DFA_MAX_STATES = 1 << 12  # DFA states kept in the LazyDFA cache before it is flushed
+LAZY_DFA_MIN_HITS_PER_MISS = 10  # below this cache hit rate between flushes, LazyDFA stops caching
+CHAR_CACHE_MAX_SIZE = 1 << 14  # characters kept in the char -> class/atom caches; others are looked up each time
+DFA_CACHE_DIR = "generated_afds/cache"  # content-addressed cache of compiled regex DFAs
+DFA_GENERATOR_VERSION = 2  # part of every DFA cache key: bump when regex -> DFA output changes
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Callable, Dict, Optional
+from src.scanner_framework.automatas.deterministic_automata import DeterministicFiniteAutomata
+from src.scanner_framework.regex_processor import RulePositions
+import src.scanner_framework.config as config
+
+
+class DfaCache:
+    """
+    Cache endereçado por conteúdo do que é gerado a partir de cada expressão regular:
+    o seu DFA (para os DFAs por regra) e os seus dados de posição (RulePositions, para a
+    construção combinada do DFA do analisador).
+
+    A chave é o hash SHA-256 da versão do gerador (config.DFA_GENERATOR_VERSION), do tipo
+    de entrada e da regex, então regras idênticas de analisadores diferentes compartilham
+    a mesma entrada, e mudar o gerador invalida todo o cache. Cada entrada fica em
+    <directory>/<chave>.json, escrita de forma atômica (arquivo temporário + os.replace);
+    as entradas já carregadas também ficam em memória. hits e misses contam as consultas.
+    """
+    DFA = "dfa"
+    POSITIONS = "positions"
+
+    def __init__(self, directory: str = config.DFA_CACHE_DIR):
+        self.directory = directory
+        self._memory: Dict[str, object] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(regex: str, kind: str = DFA) -> str:
+        content = f"{config.DFA_GENERATOR_VERSION}\0{kind}\0{regex}"
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, regex: str) -> Optional[DeterministicFiniteAutomata]:
+        """DFA da regex, se estiver no cache; None caso contrário (ou se a entrada estiver corrompida)."""
+        return self._load(regex, self.DFA, self._from_json)
+
+    def store(self, regex: str, dfa: DeterministicFiniteAutomata):
+        """Guarda o DFA da regex. Lança OSError se o arquivo não puder ser escrito."""
+        self._store(regex, self.DFA, dfa, self._to_json(dfa, regex))
+
+    def load_positions(self, regex: str) -> Optional[RulePositions]:
+        """Dados de posição da regex (ver RegexProcessor.rule_positions), se estiverem no cache."""
+        return self._load(regex, self.POSITIONS, self._positions_from_json)
+
+    def store_positions(self, regex: str, positions: RulePositions):
+        """Guarda os dados de posição da regex. Lança OSError se o arquivo não puder ser escrito."""
+        self._store(regex, self.POSITIONS, positions, self._positions_to_json(positions, regex))
+
+    def _load(self, regex: str, kind: str, from_json: Callable[[dict, str], Optional[object]]):
+        key = self.key(regex, kind)
+        value = self._memory.get(key)
+        if value is None:
+            try:
+                with open(self._path(key), 'r', encoding='utf-8') as f:
+                    value = from_json(json.load(f), regex)
+            except (OSError, ValueError, KeyError, TypeError):
+                value = None
+            if value is not None:
+                self._memory[key] = value
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def _store(self, regex: str, kind: str, value, data: dict):
+        key = self.key(regex, kind)
+        self._memory[key] = value
+
+        os.makedirs(self.directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @staticmethod
+    def _to_json(dfa: DeterministicFiniteAutomata, regex: str) -> dict:
+        return {
+            'version': config.DFA_GENERATOR_VERSION,
+            'regex': regex,
+            'start': dfa.start_state,
+            'states': sorted(dfa.states),
+            'accept': sorted(dfa.accept_states),
+            'alphabet': sorted(dfa.alphabet),
+            'transitions': [[state, lo, hi, target]
+                            for (state, (lo, hi)), target in sorted(dfa.transitions.items())],
+        }
+
+    @staticmethod
+    def _from_json(data: dict, regex: str) -> Optional[DeterministicFiniteAutomata]:
+        if data['version'] != config.DFA_GENERATOR_VERSION or data['regex'] != regex:
+            return None  # Colisão de hash ou arquivo de outra versão
+        return DeterministicFiniteAutomata(
+            states=set(data['states']),
+            alphabet={(lo, hi) for lo, hi in data['alphabet']},
+            transitions={(state, (lo, hi)): target for state, lo, hi, target in data['transitions']},
+            start_state=data['start'],
+            accept_states=set(data['accept'])
+        )
+
+    @staticmethod
+    def _positions_to_json(positions: RulePositions, regex: str) -> dict:
+        return {
+            'version': config.DFA_GENERATOR_VERSION,
+            'regex': regex,
+            'symbols': [[[lo, hi] for lo, hi in ranges] for ranges in positions.symbols],
+            'followpos': positions.followpos,
+            'firstpos': positions.firstpos,
+            'lastpos': positions.lastpos,
+            'nullable': positions.nullable,
+        }
+
+    @staticmethod
+    def _positions_from_json(data: dict, regex: str) -> Optional[RulePositions]:
+        if data['version'] != config.DFA_GENERATOR_VERSION or data['regex'] != regex:
+            return None  # Colisão de hash ou arquivo de outra versão
+        return RulePositions(
+            symbols=[tuple((lo, hi) for lo, hi in ranges) for ranges in data['symbols']],
+            followpos=list(data['followpos']),
+            firstpos=data['firstpos'],
+            lastpos=data['lastpos'],
+            nullable=bool(data['nullable'])
+        )
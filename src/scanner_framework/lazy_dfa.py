@@ -0,0 +1,490 @@
+from bisect import bisect_right
+from typing import Dict, List
+from src.scanner_framework.mapped_source import decode_char_at
+from src.scanner_framework.reserved_words import ReservedWordLookup
+from src.scanner_framework.bitsets import iter_bits, lowest_bit
+import src.scanner_framework.config as config
+
+
+class LazyDFA(ReservedWordLookup):
+    """
+    DFA do analisador léxico construído sob demanda a partir do autômato de posições
+    (ver RegexProcessor.rules_to_position_automaton), com a mesma interface de varredura
+    da TransitionTable. Nenhum estado é construído antecipadamente: cada estado (uma
+    máscara de posições) e cada transição são criados na primeira vez em que a entrada
+    passa por eles e ficam em um cache limitado a max_states estados.
+
+    Quando o cache enche, ele é esvaziado por completo. Se isso acontece com poucas
+    consultas ao cache entre um esvaziamento e outro (menos de min_hits_per_miss acertos
+    por falha), o cache não está ajudando e a varredura passa a simular o autômato de
+    posições diretamente, sem guardar estados. hits, misses, flushes e fallback
+    registram esse comportamento (ver stats).
+    """
+    DEAD_STATE = -1
+    NO_TOKEN = -1
+    NO_ATOM = -1
+
+    def __init__(self, position_automaton, token_types: List[str],
+                 max_states: int = config.LAZY_DFA_MAX_STATES,
+                 min_hits_per_miss: int = config.LAZY_DFA_MIN_HITS_PER_MISS):
+        super().__init__()
+        self.token_types = token_types
+        self.max_states = max_states
+        self.min_hits_per_miss = min_hits_per_miss
+
+        self.start_mask = position_automaton.start
+        self.followpos = position_automaton.followpos
+        self.atom_masks = position_automaton.atom_masks
+        self.n_atoms = len(position_automaton.atoms)
+        self.atom_starts = [lo for lo, _ in position_automaton.atoms]
+        self.atom_ends = [hi for _, hi in position_automaton.atoms]
+        token_ids = {token_type: i for i, token_type in enumerate(token_types)}
+        self.end_marker_tokens = {pos: token_ids[token_type]
+                                  for pos, token_type in position_automaton.end_markers.items()}
+        self.end_marker_mask = 0
+        for pos in self.end_marker_tokens:
+            self.end_marker_mask |= 1 << pos
+
+        # Cache caractere -> átomo (NO_ATOM se nenhum), com até config.CHAR_CACHE_MAX_SIZE caracteres
+        self.char_atoms: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+        self.fallback = False
+        self._flush()
+
+    def __getstate__(self):
+        # Cada processo (ver parallel_lexing) começa com o cache vazio
+        state = self.__dict__.copy()
+        state['char_atoms'] = {}
+        state['_masks'], state['_state_ids'], state['_accept'], state['_next'] = [], {}, [], {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.start_state = self._intern(self.start_mask)
+
+    def _flush(self):
+        """Esvazia o cache de estados e de transições."""
+        self._masks: List[int] = []  # id do estado -> máscara de posições
+        self._state_ids: Dict[int, int] = {}  # máscara de posições -> id do estado
+        self._accept: List[int] = []  # id do estado -> id do tipo de token ou NO_TOKEN
+        self._next: Dict[int, int] = {}  # state * n_atoms + atom -> próximo estado
+        self._hits_at_flush = self.hits
+        self._misses_at_flush = self.misses
+        self.start_state = self._intern(self.start_mask)
+
+    def _intern(self, mask: int) -> int:
+        state = self._state_ids.get(mask)
+        if state is None:
+            state = len(self._masks)
+            self._state_ids[mask] = state
+            self._masks.append(mask)
+            self._accept.append(self._token_of(mask))
+        return state
+
+    def _token_of(self, mask: int) -> int:
+        """Tipo de token de um conjunto de posições: o do marcador de fim de menor posição."""
+        markers = mask & self.end_marker_mask
+        if not markers:
+            return self.NO_TOKEN
+        return self.end_marker_tokens[lowest_bit(markers)]
+
+    def _step(self, mask: int, atom: int) -> int:
+        """Próximo conjunto de posições: união dos followpos das posições que reconhecem o átomo."""
+        followpos = self.followpos
+        next_mask = 0
+        for pos in iter_bits(mask & self.atom_masks[atom]):
+            next_mask |= followpos[pos]
+        return next_mask
+
+    def _transition(self, state: int, atom: int) -> int:
+        """
+        Transição que ainda não está no cache: constrói o próximo estado (DEAD_STATE se
+        não houver) e a guarda. Se o cache estiver cheio, ele é esvaziado antes; o id
+        retornado continua válido, mas ids obtidos antes do esvaziamento não.
+        """
+        self.misses += 1
+        next_mask = self._step(self._masks[state], atom)
+        if not next_mask:
+            self._next[state * self.n_atoms + atom] = self.DEAD_STATE
+            return self.DEAD_STATE
+
+        next_state = self._state_ids.get(next_mask)
+        if next_state is None and len(self._masks) >= self.max_states:
+            self.flushes += 1
+            hits = self.hits - self._hits_at_flush
+            misses = self.misses - self._misses_at_flush
+            if hits < misses * self.min_hits_per_miss:
+                self.fallback = True  # O cache não compensa: simula o autômato de posições
+            self._flush()
+            return self._intern(next_mask)
+
+        if next_state is None:
+            next_state = self._intern(next_mask)
+        self._next[state * self.n_atoms + atom] = next_state
+        return next_state
+
+    def _advance_mask(self, mask: int, atom: int):
+        """
+        Um passo a partir do conjunto de posições `mask`, pelo cache ou, no modo sem
+        cache, pelo autômato de posições. Retorna (próxima máscara, tipo de token), com
+        máscara 0 se não houver transição.
+        """
+        if self.fallback:
+            next_mask = self._step(mask, atom)
+            return next_mask, self._token_of(next_mask) if next_mask else self.NO_TOKEN
+
+        state = self._intern(mask)
+        next_state = self._next.get(state * self.n_atoms + atom)
+        if next_state is None:
+            next_state = self._transition(state, atom)
+        else:
+            self.hits += 1
+        if next_state == self.DEAD_STATE:
+            return 0, self.NO_TOKEN
+        return self._masks[next_state], self._accept[next_state]
+
+    def atom_of(self, char: str) -> int:
+        """Átomo do alfabeto que contém o caractere (NO_ATOM se nenhum), guardado em char_atoms se houver espaço."""
+        code = ord(char)
+        i = bisect_right(self.atom_starts, code) - 1
+        atom = i if i >= 0 and code <= self.atom_ends[i] else self.NO_ATOM
+        if len(self.char_atoms) < config.CHAR_CACHE_MAX_SIZE:
+            self.char_atoms[char] = atom
+        return atom
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores do cache: acertos, falhas, esvaziamentos, estados atuais e se está em fallback."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'flushes': self.flushes,
+            'cached_states': len(self._masks),
+            'fallback': self.fallback,
+        }
+
+    def longest_match(self, input_stream, current_pos, input_len):
+        """
+        Maximal Munch sobre o DFA construído sob demanda; mesma interface de
+        TransitionTable.longest_match. Returns (token_type_id, position_after_lexeme, reached_end).
+        """
+        if self.fallback:
+            return self._simulate(input_stream, current_pos, input_len)
+
+        char_atoms = self.char_atoms
+        atom_of = self.atom_of
+        transitions = self._next
+        n_atoms = self.n_atoms
+        NO_TOKEN = self.NO_TOKEN
+        DEAD_STATE = self.DEAD_STATE
+
+        state = self.start_state
+        last_token_type_id = None
+        last_end = None
+
+        reached_end = False
+        scan_pos = current_pos
+        while scan_pos < input_len:
+            char = input_stream[scan_pos]
+            atom = char_atoms.get(char)
+            if atom is None:
+                atom = atom_of(char)
+            if atom < 0:
+                break
+
+            next_state = transitions.get(state * n_atoms + atom)
+            if next_state is None:
+                next_state = self._transition(state, atom)
+                transitions = self._next  # May have been flushed
+            else:
+                self.hits += 1
+            if next_state == DEAD_STATE:
+                break
+
+            state = next_state
+            scan_pos += 1
+            token_type_id = self._accept[state]
+            if token_type_id != NO_TOKEN:
+                last_token_type_id = token_type_id
+                last_end = scan_pos
+        else:
+            reached_end = True
+
+        if last_token_type_id in self.reserved_hosts:
+            last_token_type_id = self.reserved_words.get(input_stream[current_pos:last_end], last_token_type_id)
+        return last_token_type_id, last_end, reached_end
+
+    def _simulate(self, input_stream, current_pos, input_len):
+        """longest_match sem cache: caminha pelos conjuntos de posições diretamente."""
+        char_atoms = self.char_atoms
+        atom_of = self.atom_of
+        step = self._step
+        token_of = self._token_of
+        NO_TOKEN = self.NO_TOKEN
+
+        mask = self.start_mask
+        last_token_type_id = None
+        last_end = None
+
+        reached_end = False
+        scan_pos = current_pos
+        while scan_pos < input_len:
+            char = input_stream[scan_pos]
+            atom = char_atoms.get(char)
+            if atom is None:
+                atom = atom_of(char)
+            if atom < 0:
+                break
+
+            mask = step(mask, atom)
+            if not mask:
+                break
+
+            scan_pos += 1
+            token_type_id = token_of(mask)
+            if token_type_id != NO_TOKEN:
+                last_token_type_id = token_type_id
+                last_end = scan_pos
+        else:
+            reached_end = True
+
+        if last_token_type_id in self.reserved_hosts:
+            last_token_type_id = self.reserved_words.get(input_stream[current_pos:last_end], last_token_type_id)
+        return last_token_type_id, last_end, reached_end
+
+    def advance(self, state, input_stream, scan_pos, input_len):
+        """
+        Varredura retomável, com a mesma interface de TransitionTable.advance. O estado
+        devolvido é a máscara de posições, e não o id no cache, para continuar válido se
+        o cache for esvaziado antes da próxima chamada.
+        """
+        char_atoms = self.char_atoms
+        atom_of = self.atom_of
+        NO_TOKEN = self.NO_TOKEN
+
+        mask = self.start_mask if state is None else state
+        last_token_type_id = None
+        last_end = None
+
+        while scan_pos < input_len:
+            char = input_stream[scan_pos]
+            atom = char_atoms.get(char)
+            if atom is None:
+                atom = atom_of(char)
+            if atom < 0:
+                return None, last_token_type_id, last_end
+
+            if self.fallback:
+                mask = self._step(mask, atom)
+                if not mask:
+                    return None, last_token_type_id, last_end
+                token_type_id = self._token_of(mask)
+            else:
+                current = self._intern(mask)
+                next_state = self._next.get(current * self.n_atoms + atom)
+                if next_state is None:
+                    next_state = self._transition(current, atom)
+                else:
+                    self.hits += 1
+                if next_state == self.DEAD_STATE:
+                    return None, last_token_type_id, last_end
+                mask = self._masks[next_state]
+                token_type_id = self._accept[next_state]
+
+            scan_pos += 1
+            if token_type_id != NO_TOKEN:
+                last_token_type_id = token_type_id
+                last_end = scan_pos
+
+        return mask, last_token_type_id, last_end
+
+    def longest_match_memoized(self, input_stream, current_pos, input_len, failed):
+        """
+        Mesmo que TransitionTable.longest_match_memoized. Os ids de estado mudam quando o
+        cache é esvaziado, então `failed` guarda pares (máscara de posições, posição), que
+        continuam válidos depois de um esvaziamento e também no modo sem cache.
+        """
+        char_atoms = self.char_atoms
+        atom_of = self.atom_of
+        advance_mask = self._advance_mask
+        NO_TOKEN = self.NO_TOKEN
+
+        mask = self.start_mask
+        last_token_type_id = None
+        last_end = None
+        visited_since_accept = []
+
+        reached_end = False
+        scan_pos = current_pos
+        while scan_pos < input_len:
+            char = input_stream[scan_pos]
+            atom = char_atoms.get(char)
+            if atom is None:
+                atom = atom_of(char)
+            if atom < 0:
+                break
+
+            mask, token_type_id = advance_mask(mask, atom)
+            if not mask:
+                break
+
+            scan_pos += 1
+            key = (mask, scan_pos)
+            if key in failed:
+                break
+
+            if token_type_id != NO_TOKEN:
+                last_token_type_id = token_type_id
+                last_end = scan_pos
+                visited_since_accept.clear()
+            else:
+                visited_since_accept.append(key)
+        else:
+            reached_end = True
+
+        failed.update(visited_since_accept)
+        if last_token_type_id in self.reserved_hosts:
+            last_token_type_id = self.reserved_words.get(input_stream[current_pos:last_end], last_token_type_id)
+        return last_token_type_id, last_end, reached_end
+
+    def advance_memoized(self, state, input_stream, scan_pos, input_len, failed, visited, offset):
+        """
+        Mesmo que TransitionTable.advance_memoized, com pares (máscara de posições,
+        posição absoluta) em `failed` e `visited`.
+        """
+        char_atoms = self.char_atoms
+        atom_of = self.atom_of
+        advance_mask = self._advance_mask
+        NO_TOKEN = self.NO_TOKEN
+
+        if state is None:
+            mask = self.start_mask
+            visited.clear()
+        else:
+            mask = state
+        last_token_type_id = None
+        last_end = None
+
+        while scan_pos < input_len:
+            char = input_stream[scan_pos]
+            atom = char_atoms.get(char)
+            if atom is None:
+                atom = atom_of(char)
+            if atom < 0:
+                break
+
+            mask, token_type_id = advance_mask(mask, atom)
+            if not mask:
+                break
+
+            scan_pos += 1
+            key = (mask, offset + scan_pos)
+            if key in failed:
+                break
+
+            if token_type_id != NO_TOKEN:
+                last_token_type_id = token_type_id
+                last_end = scan_pos
+                visited.clear()
+            else:
+                visited.append(key)
+        else:
+            return mask, last_token_type_id, last_end
+
+        failed.update(visited)
+        visited.clear()
+        return None, last_token_type_id, last_end
+
+    def longest_match_bytes(self, buffer, current_pos, input_len):
+        """
+        Same as longest_match, but walks UTF-8 bytes in place (e.g. an mmap).
+        Returns (token_type_id, position_after_lexeme), or (None, None).
+        """
+        last_token_type_id = None
+        last_end = None
+
+        mask = self.start_mask
+        scan_pos = current_pos
+        while scan_pos < input_len:
+            char, width = decode_char_at(buffer, scan_pos, input_len)
+            if char is None:
+                break  # Invalid UTF-8
+            atom = self.char_atoms.get(char)
+            if atom is None:
+                atom = self.atom_of(char)
+            if atom < 0:
+                break
+
+            if self.fallback:
+                mask = self._step(mask, atom)
+                if not mask:
+                    break
+                token_type_id = self._token_of(mask)
+            else:
+                state = self._state_ids[mask]
+                next_state = self._next.get(state * self.n_atoms + atom)
+                if next_state is None:
+                    next_state = self._transition(state, atom)
+                else:
+                    self.hits += 1
+                if next_state == self.DEAD_STATE:
+                    break
+                mask = self._masks[next_state]
+                token_type_id = self._accept[next_state]
+
+            scan_pos += width
+            if token_type_id != self.NO_TOKEN:
+                last_token_type_id = token_type_id
+                last_end = scan_pos
+
+        if last_token_type_id in self.reserved_hosts:
+            last_token_type_id = self.reserved_words_bytes.get(bytes(buffer[current_pos:last_end]), last_token_type_id)
+        return last_token_type_id, last_end
+
+    def longest_match_bytes_memoized(self, buffer, current_pos, input_len, failed):
+        """
+        Mesmo que longest_match_bytes, com o memo de longest_match_memoized (as posições
+        em `failed` são offsets em bytes). Returns (token_type_id, position_after_lexeme).
+        """
+        advance_mask = self._advance_mask
+        last_token_type_id = None
+        last_end = None
+        visited_since_accept = []
+
+        mask = self.start_mask
+        scan_pos = current_pos
+        while scan_pos < input_len:
+            char, width = decode_char_at(buffer, scan_pos, input_len)
+            if char is None:
+                break  # Invalid UTF-8
+            atom = self.char_atoms.get(char)
+            if atom is None:
+                atom = self.atom_of(char)
+            if atom < 0:
+                break
+
+            mask, token_type_id = advance_mask(mask, atom)
+            if not mask:
+                break
+
+            scan_pos += width
+            key = (mask, scan_pos)
+            if key in failed:
+                break
+
+            if token_type_id != self.NO_TOKEN:
+                last_token_type_id = token_type_id
+                last_end = scan_pos
+                visited_since_accept.clear()
+            else:
+                visited_since_accept.append(key)
+
+        failed.update(visited_since_accept)
+        if last_token_type_id in self.reserved_hosts:
+            last_token_type_id = self.reserved_words_bytes.get(bytes(buffer[current_pos:last_end]), last_token_type_id)
+        return last_token_type_id, last_end
+
+    def __repr__(self):
+        return (f"<LazyDFA com {len(self._masks)}/{self.max_states} estados em cache, "
+                f"{self.n_atoms} átomos, {len(self.token_types)} tipos de token>")
@@ -0,0 +1,146 @@
+"""
+Imagem binária de um analisador léxico compilado (TransitionTable), para ser salva uma
+vez e carregada com mmap, sem reconstruir o DFA.
+
+Formato (versão 1, inteiros little-endian; as seções int32 começam alinhadas em 4 bytes):
+
+    cabeçalho  HEADER: magic b"SGLX", versão, flags (reservado, 0), n_states, n_classes,
+               n_ranges, n_token_types, n_reserved_words, n_reserved_hosts
+    rows           int32[n_states * n_classes]   tabela de transições
+    accept         int32[n_states]               id do tipo de token ou -1
+    range_starts   int32[n_ranges]               classes de caracteres: intervalos
+    range_ends     int32[n_ranges]               disjuntos e ordenados de code points
+    range_classes  int32[n_ranges]
+    reserved_hosts int32[n_reserved_hosts]       tipos de token reclassificáveis (ex.: ID)
+    token_types    n_token_types x (uint32 tamanho, bytes UTF-8)
+    reserved       n_reserved_words x (uint32 id do tipo de token, uint32 tamanho, bytes UTF-8)
+
+As tabelas inteiras são usadas diretamente como memoryviews sobre o mmap; só os nomes
+dos tipos de token e as palavras reservadas são decodificados.
+"""
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from src.scanner_framework.transition_table import TransitionTable
+
+MAGIC = b"SGLX"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHIIIIII")
+LENGTH = struct.Struct("<I")
+RESERVED_ENTRY = struct.Struct("<II")
+
+
+class LexerImageError(ValueError):
+    """Arquivo que não é uma imagem de analisador léxico válida nesta versão."""
+
+
+def _int32_bytes(values) -> bytes:
+    data = array('i', values)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data.tobytes()
+
+
+def _encode_string(text: str) -> bytes:
+    data = text.encode('utf-8')
+    return LENGTH.pack(len(data)) + data
+
+
+def write_image(table: TransitionTable, path: str):
+    """Salva a tabela em `path` de forma atômica (arquivo temporário + os.replace)."""
+    n_ranges = len(table.range_starts)
+    parts = [
+        HEADER.pack(MAGIC, FORMAT_VERSION, 0, table.n_states, table.n_classes, n_ranges,
+                    len(table.token_types), len(table.reserved_words), len(table.reserved_hosts)),
+        _int32_bytes(table.rows),
+        _int32_bytes(table.accept),
+        _int32_bytes(table.range_starts),
+        _int32_bytes(table.range_ends),
+        _int32_bytes(table.range_classes),
+        _int32_bytes(sorted(table.reserved_hosts)),
+    ]
+    parts.extend(_encode_string(token_type) for token_type in table.token_types)
+    for word, token_type_id in sorted(table.reserved_words.items()):
+        data = word.encode('utf-8')
+        parts.append(RESERVED_ENTRY.pack(token_type_id, len(data)) + data)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".lexer.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b"".join(parts))
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def read_image(path: str) -> TransitionTable:
+    """
+    Carrega uma imagem salva por write_image. O arquivo fica mapeado em memória enquanto
+    a tabela existir. Lança LexerImageError se o arquivo não for uma imagem válida.
+    """
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+
+    if len(buffer) < HEADER.size:
+        raise LexerImageError(f"'{path}' não é uma imagem de analisador léxico.")
+    magic, version, _, n_states, n_classes, n_ranges, n_token_types, n_reserved, n_hosts = \
+        HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise LexerImageError(f"'{path}' não é uma imagem de analisador léxico.")
+    if version != FORMAT_VERSION:
+        raise LexerImageError(f"Versão {version} da imagem '{path}' não é suportada (esperada {FORMAT_VERSION}).")
+
+    view = memoryview(buffer)
+    offset = HEADER.size
+
+    def int32_section(count):
+        nonlocal offset
+        end = offset + 4 * count
+        if end > len(buffer):
+            raise LexerImageError(f"Imagem '{path}' truncada.")
+        section = view[offset:end]
+        offset = end
+        if sys.byteorder == 'big':
+            data = array('i', section.tobytes())
+            data.byteswap()
+            return data
+        return section.cast('i')
+
+    rows = int32_section(n_states * n_classes)
+    accept = int32_section(n_states)
+    range_starts = int32_section(n_ranges)
+    range_ends = int32_section(n_ranges)
+    range_classes = int32_section(n_ranges)
+    reserved_hosts = int32_section(n_hosts)
+
+    def read_bytes(size):
+        nonlocal offset
+        end = offset + size
+        if end > len(buffer):
+            raise LexerImageError(f"Imagem '{path}' truncada.")
+        data = bytes(view[offset:end])
+        offset = end
+        return data
+
+    token_types = []
+    for _ in range(n_token_types):
+        (size,) = LENGTH.unpack(read_bytes(LENGTH.size))
+        token_types.append(read_bytes(size).decode('utf-8'))
+
+    reserved_words = {}
+    for _ in range(n_reserved):
+        token_type_id, size = RESERVED_ENTRY.unpack(read_bytes(RESERVED_ENTRY.size))
+        reserved_words[read_bytes(size).decode('utf-8')] = token_type_id
+
+    table = TransitionTable.from_arrays(range_starts, range_ends, range_classes, n_classes,
+                                        rows, accept, token_types)
+    table.set_reserved_words(reserved_words, reserved_hosts)
+    table.image = buffer  # Mantém o mmap aberto enquanto a tabela existir
+    return table
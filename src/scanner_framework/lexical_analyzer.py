@@ -1,7 +1,17 @@
+import os
 from src.scanner_framework.automatas.non_deterministic_automata import NonDeterministicFiniteAutomata
 from src.scanner_framework.automatas.deterministic_automata import DeterministicFiniteAutomata
-from typing import List, Tuple
-
+from src.scanner_framework.transition_table import TransitionTable
+from src.scanner_framework.regex_processor import RegexProcessor
+from src.scanner_framework.lazy_dfa import LazyDFA
+from src.scanner_framework.lexer_image import write_image, read_image, LexerImageError
+from src.scanner_framework.scanner_codegen import write_scanner_module
+import src.scanner_framework.char_ranges as char_ranges
+from src.scanner_framework.bitsets import mask_of, iter_bits
+from src.scanner_framework.token_stream import TokenStream
+from src.scanner_framework.tokens import Token, TokenBuffer
+from src.scanner_framework.mapped_source import MappedSource, MappedToken, ASCII_WHITESPACE, decode_char_at
+import src.scanner_framework.config as config
 
 
 class LexicalAnalyzer():
@@ -11,9 +21,17 @@ class LexicalAnalyzer():
         self.name = name
         self.application = application
         self.dfas = {}
+        self.rules = {}  # token type -> regex, for the combined followpos construction
+        self.rule_positions = {}  # token type -> RulePositions already compiled for a rule
+        self.reserved_words = {}  # token type -> word, kept out of the automaton
+        self.token_order = []  # every token type, in priority order
         self.nfa = None
         self.dfa = None
         self.dfa_accept_state_to_token_type_map = {}
+        self.char_classes = {}
+        self.table = None
+        self.linear_time = False  # when set, the scanners memoize failed (state, position) pairs
+        self.lazy = False  # generate() builds a LazyDFA instead of the full DFA
         self.has_errors = False
 
     def add_dfa(self, key, dfa):
@@ -27,30 +45,102 @@ class LexicalAnalyzer():
             return
 
         self.dfas[key] = dfa
+        self.token_order.append(key)
+
+    def add_rule(self, key, regex, positions=None):
+        """
+        Adds a token pattern by its regular expression. When rules are registered,
+        generate() builds the final DFA directly from one combined syntax tree
+        instead of uniting per-rule DFAs. Rules are prioritized in insertion order.
+        positions: the rule's RulePositions (see RegexProcessor.rule_positions), if the
+        caller already compiled it; otherwise it is compiled by generate().
+        """
+        if key in self.rules:
+            self.application.error(f"Regra com key {key} já existe.")
+            return
+
+        self.rules[key] = regex
+        if positions is not None:
+            self.rule_positions[key] = positions
+        self.token_order.append(key)
+
+    def add_reserved_word(self, key, word):
+        """
+        Adds a token pattern that matches exactly one fixed word (e.g. "IF": "if").
+        Reserved words are not part of the automaton: a lexeme matched by another
+        rule (such as ID) is reclassified through the transition table's reserved-word
+        lookup. The word must be matched by some other rule, or it is never recognized.
+        """
+        if key in self.reserved_words:
+            self.application.error(f"Palavra reservada com key {key} já existe.")
+            return
+
+        self.reserved_words[key] = word
+        self.token_order.append(key)
+
+    def token_types(self):
+        """Token types in priority order (the order they were added)."""
+        return list(self.token_order)
 
     def generate(self):
         """
-        Generates the final DFA for the lexical analyzer by:
-        1. Uniting all registered DFAs into a single NFA using epsilon transitions.
-        2. Determinizing the resulting NFA.
+        In lazy mode (self.lazy, registered rules only) the table is a LazyDFA over the
+        rules' position automaton and no DFA state is built in advance. Otherwise,
+        generates the final DFA for the lexical analyzer by:
+        1. Building a DFA over character ranges, either
+           a. directly from the registered rules, with one followpos construction
+              over a combined syntax tree (see build_combined_dfa), or
+           b. by uniting all registered DFAs into a single NFA using epsilon
+              transitions and determinizing it.
+        2. Partitioning the alphabet into character equivalence classes.
+        3. Minimizing the DFA, keeping accept states of different token types apart.
+        4. Compiling the DFA into an integer transition table.
         """
         try:
-            if not self.dfas:
+            if not self.dfas and not self.rules:
                 self.application.error(
                     "Nenhum DFA foi adicionado para gerar o analisador léxico.")
                 self.has_errors = True
                 return
 
-            self.unite_by_epsilon()
+            if self.lazy and self.rules:
+                self.build_lazy_dfa()
+                return
+
+            if self.rules:
+                self.build_combined_dfa()
+                if self.has_errors:
+                    return
+
+                self.compute_char_classes()
+                if self.has_errors:
+                    return
+
+                self.relabel_by_char_classes()
+                if self.has_errors:
+                    return
+            else:
+                self.unite_by_epsilon()
+                if self.has_errors:
+                    return
+
+                self.compute_char_classes()
+                if self.has_errors:
+                    return
+
+                self.determinize()
+                if self.has_errors:
+                    return
+
+            self.minimize()
             if self.has_errors:
                 return
 
-            self.determinize()
+            self.compile()
             if self.has_errors:
                 return
 
-            print("DFA Final Gerado:")
-            print(self.dfa)
+            self.application.log(f"DFA final gerado: {self.table}")
 
         except Exception as e:
             self.application.error(
@@ -62,6 +152,9 @@ class LexicalAnalyzer():
         Unites all DFAs in self.dfas into a single NFA (self.nfa)
         using a new start state and epsilon transitions to the start states
         of the original DFAs. States are renamed to ensure uniqueness.
+        The rule DFAs are labelled with character ranges that may overlap across
+        rules, so the ranges are first split into disjoint atoms; each rule
+        transition becomes one NFA transition per atom it covers.
         """
         new_states = set()
         new_alphabet = set()
@@ -76,6 +169,11 @@ class LexicalAnalyzer():
             self.has_errors = True
             return
 
+        all_ranges = sorted({symbol for dfa_orig in self.dfas.values()
+                             if dfa_orig and hasattr(dfa_orig, 'alphabet') for symbol in dfa_orig.alphabet})
+        atoms, covers = char_ranges.split_into_atoms([(symbol,) for symbol in all_ranges])
+        atoms_of_range = {symbol: [atoms[a] for a in covered] for symbol, covered in zip(all_ranges, covers)}
+
         for key, dfa_orig in self.dfas.items():
             if not dfa_orig or not hasattr(dfa_orig, 'states'):
                 self.application.error(
@@ -90,18 +188,18 @@ class LexicalAnalyzer():
             renamed_dfa_states = set(state_mapping.values())
             new_states.update(renamed_dfa_states)
 
-            new_alphabet.update(dfa_orig.alphabet)
-
             for acc_state in dfa_orig.accept_states:
                 new_accept_states.add(state_mapping[acc_state])
 
-            for (from_state_orig, symbol), target_state_orig in dfa_orig.transitions.items():
+            for (from_state_orig, char_range), target_state_orig in dfa_orig.transitions.items():
                 renamed_from = state_mapping[from_state_orig]
                 renamed_target = state_mapping[target_state_orig]
 
-                if (renamed_from, symbol) not in new_transitions:
-                    new_transitions[(renamed_from, symbol)] = set()
-                new_transitions[(renamed_from, symbol)].add(renamed_target)
+                for symbol in atoms_of_range[char_range]:
+                    new_alphabet.add(symbol)
+                    if (renamed_from, symbol) not in new_transitions:
+                        new_transitions[(renamed_from, symbol)] = set()
+                    new_transitions[(renamed_from, symbol)].add(renamed_target)
 
             renamed_dfa_start_state = state_mapping[dfa_orig.start_state]
             if (new_start_state, NonDeterministicFiniteAutomata.EPSILON) not in new_transitions:
@@ -118,10 +216,93 @@ class LexicalAnalyzer():
             accept_states=new_accept_states
         )
 
+    def build_combined_dfa(self):
+        """
+        Builds self.dfa (over disjoint character ranges) from all registered rules
+        with a single followpos construction: the rules' position data (compiled per
+        rule, see add_rule) are joined under one union, each rule ending in its own end
+        marker, so no intermediate NFA or second subset construction is needed. Populates dfa_accept_state_to_token_type_map;
+        token priority is resolved from the end markers. Invalid rules are reported
+        and left out.
+        """
+        dfa, accept_map, failed = RegexProcessor.rules_to_dfa(self.rules, self.rule_positions)
+
+        for key, message in failed.items():
+            self.application.error(f"Não foi possível processar a expressão regular: {message}")
+            del self.rules[key]
+            self.token_order.remove(key)
+
+        if dfa is None:
+            self.application.error("Nenhuma expressão regular válida para gerar o analisador léxico.")
+            self.has_errors = True
+            return
+
+        self.dfa = dfa
+        self.dfa_accept_state_to_token_type_map = accept_map
+
+    def compute_char_classes(self):
+        """
+        Partitions the alphabet (disjoint character ranges) of the automaton being
+        built -- self.nfa, or self.dfa when it was built directly from the rules --
+        into equivalence classes: two ranges belong to the same class when every
+        state moves to the same targets on both. Populates self.char_classes
+        (range -> class id). Class ids are assigned in order of each class's lowest
+        range, so the numbering is deterministic.
+        """
+        automaton = self.nfa or self.dfa
+        if not automaton:
+            self.application.error("Autômato não existe para o cálculo das classes de caracteres.")
+            self.has_errors = True
+            return
+
+        signatures = {symbol: set() for symbol in automaton.alphabet if symbol != NonDeterministicFiniteAutomata.EPSILON}
+        for (state, symbol), targets in automaton.transitions.items():
+            if symbol != NonDeterministicFiniteAutomata.EPSILON:
+                if isinstance(targets, set):
+                    targets = frozenset(targets)
+                signatures[symbol].add((state, targets))
+
+        class_by_signature = {}
+        self.char_classes = {}
+        for symbol in sorted(signatures):
+            signature = frozenset(signatures[symbol])
+            if signature not in class_by_signature:
+                class_by_signature[signature] = len(class_by_signature)
+            self.char_classes[symbol] = class_by_signature[signature]
+
+    def relabel_by_char_classes(self):
+        """
+        Replaces the character-range symbols of self.dfa by their class ids
+        (see compute_char_classes). Ranges of the same class have identical
+        transitions, so they collapse into a single transition per class.
+        """
+        dfa = self.dfa
+        if not dfa:
+            self.application.error("DFA não existe para a troca do alfabeto pelas classes de caracteres.")
+            self.has_errors = True
+            return
+
+        transitions = {}
+        for (state, symbol), target in dfa.transitions.items():
+            transitions[(state, self.char_classes[symbol])] = target
+
+        self.dfa = DeterministicFiniteAutomata(
+            states=dfa.states,
+            alphabet=set(self.char_classes.values()),
+            transitions=transitions,
+            start_state=dfa.start_state,
+            accept_states=dfa.accept_states
+        )
+
     def determinize(self):
         """
         Converts the NFA (self.nfa) to an equivalent DFA (self.dfa)
         using the subset construction algorithm.
+        NFA states are numbered and each DFA state is the bitmask of its NFA states,
+        so a move is a union of precomputed per-state target closures and a DFA
+        state is identified by a single int.
+        The DFA alphabet is the set of character class ids (see compute_char_classes);
+        one representative character per class drives the NFA moves.
         It also populates self.dfa_accept_state_to_token_type_map.
         """
         nfa = self.nfa
@@ -130,86 +311,173 @@ class LexicalAnalyzer():
             self.has_errors = True
             return
 
-        start_closure = frozenset(nfa._epsilon_closure({nfa.start_state}))
+        nfa_states = sorted(nfa.states)
+        state_index = {state: i for i, state in enumerate(nfa_states)}
+        closure_masks = [mask_of(state_index[q] for q in nfa.epsilon_closure_of(state))
+                         for state in nfa_states]
 
-        dfa_states = {start_closure}
-        dfa_transitions = {}
+        def closure_of(states):
+            mask = 0
+            for state in states:
+                mask |= closure_masks[state_index[state]]
+            return mask
 
         self.dfa_accept_state_to_token_type_map.clear()
 
-        token_type_priority = {key: i for i,
-                               key in enumerate(self.dfas.keys())}
-
-        unmarked_dfa_states = [start_closure]
-
-        while unmarked_dfa_states:
-            current_dfa_state_T = unmarked_dfa_states.pop(0)
+        # Accept states of each token type, in priority order
+        token_masks = {key: 0 for key in self.dfas}
+        for state in nfa.accept_states:
+            token_key = state.split(self.DEFAULT_PREFIX_SEPARATOR, 1)[0]
+            if token_key in token_masks:
+                token_masks[token_key] |= 1 << state_index[state]
+        token_masks = [(key, mask) for key, mask in token_masks.items() if mask]
+
+        class_representatives = {}
+        for symbol, class_id in self.char_classes.items():
+            class_representatives.setdefault(class_id, symbol)
+
+        # class id -> (mask of NFA states with a move on the class, closed targets per NFA state)
+        class_moves = {}
+        for class_id, symbol in class_representatives.items():
+            sources, targets_by_state = 0, {}
+            for state in nfa_states:
+                targets = nfa.transitions.get((state, symbol))
+                if targets:
+                    i = state_index[state]
+                    sources |= 1 << i
+                    targets_by_state[i] = closure_of(targets)
+            class_moves[class_id] = (sources, targets_by_state)
+
+        dfa_state_names = {}
+        unmarked_dfa_states = []
+
+        def get_dfa_name(mask):
+            name = dfa_state_names.get(mask)
+            if name is None:
+                name = f"D{len(dfa_state_names)}"
+                dfa_state_names[mask] = name
+                unmarked_dfa_states.append(mask)
+            return name
+
+        start_state = get_dfa_name(closure_masks[state_index[nfa.start_state]])
+        dfa_transitions = {}
 
-            possible_tokens_for_T = {}
-            for nfa_state_name in current_dfa_state_T:
-                if nfa_state_name in nfa.accept_states:
-                    token_key = nfa_state_name.split(
-                        self.DEFAULT_PREFIX_SEPARATOR, 1)[0]
-                    if token_key in self.dfas:
-                        priority = token_type_priority.get(
-                            token_key, float('inf'))
-                        if token_key not in possible_tokens_for_T or priority < possible_tokens_for_T[token_key]:
-                            possible_tokens_for_T[token_key] = priority
+        next_unmarked = 0
+        while next_unmarked < len(unmarked_dfa_states):
+            current_mask = unmarked_dfa_states[next_unmarked]
+            next_unmarked += 1
+            current_name = dfa_state_names[current_mask]
 
-            if possible_tokens_for_T:
-                best_token_key = min(possible_tokens_for_T,key=possible_tokens_for_T.get)
-                self.dfa_accept_state_to_token_type_map[current_dfa_state_T] = best_token_key
+            for token_key, token_mask in token_masks:
+                if current_mask & token_mask:
+                    self.dfa_accept_state_to_token_type_map[current_name] = token_key
+                    break
 
-            for symbol in nfa.alphabet:
-                if symbol == NonDeterministicFiniteAutomata.EPSILON:
+            for class_id, (sources, targets_by_state) in class_moves.items():
+                moving = current_mask & sources
+                if not moving:
                     continue
 
-                nfa_states_after_move = set()
-                for q_nfa in current_dfa_state_T:
-                    nfa_states_after_move.update(
-                        nfa.transitions.get((q_nfa, symbol), set()))
+                target_mask = 0
+                for i in iter_bits(moving):
+                    target_mask |= targets_by_state[i]
 
-                if not nfa_states_after_move:
-                    continue
+                dfa_transitions[(current_name, class_id)] = get_dfa_name(target_mask)
 
-                target_dfa_state_U = frozenset(
-                    nfa._epsilon_closure(nfa_states_after_move))
-                if not target_dfa_state_U:
-                    continue
+        self.dfa = DeterministicFiniteAutomata(
+            states=set(dfa_state_names.values()),
+            alphabet=set(class_representatives.keys()),
+            transitions=dfa_transitions,
+            start_state=start_state,
+            accept_states=set(self.dfa_accept_state_to_token_type_map.keys())
+        )
 
-                dfa_transitions[(current_dfa_state_T, symbol)
-                                ] = target_dfa_state_U
+    def minimize(self):
+        """
+        Minimizes self.dfa (see DeterministicFiniteAutomata.minimize).
+        Accept states are labelled with their winning token type from
+        dfa_accept_state_to_token_type_map, so the initial partition keeps states of
+        different token types apart and token priorities are preserved.
+        Returns (states_before, states_after).
+        """
+        if not self.dfa:
+            self.application.error("DFA não existe para minimização.")
+            self.has_errors = True
+            return
 
-                if target_dfa_state_U not in dfa_states:
-                    dfa_states.add(target_dfa_state_U)
-                    unmarked_dfa_states.append(target_dfa_state_U)
+        states_before = len(self.dfa.states)
+        self.dfa, state_map = self.dfa.minimize(self.dfa_accept_state_to_token_type_map)
+        self.dfa_accept_state_to_token_type_map = {
+            state_map[state]: token_type
+            for state, token_type in self.dfa_accept_state_to_token_type_map.items()
+        }
+        states_after = len(self.dfa.states)
 
-        dfa_actual_accept_states = set(
-            self.dfa_accept_state_to_token_type_map.keys())
+        self.application.log(f"DFA minimizado: {states_before} -> {states_after} estados.")
+        return states_before, states_after
 
-        dfa_alphabet = {s for s in nfa.alphabet if s !=
-                        NonDeterministicFiniteAutomata.EPSILON}
+    def compile(self):
+        """
+        Compiles the determinized DFA (self.dfa) into a TransitionTable (self.table):
+        dense integer states, small integer symbols and array-backed transition rows.
+        """
+        if not self.dfa:
+            self.application.error("DFA não existe para compilação.")
+            self.has_errors = True
+            return
 
-        self.dfa = DeterministicFiniteAutomata(
-            states=dfa_states,
-            alphabet=dfa_alphabet,
-            transitions=dfa_transitions,
-            start_state=start_closure,
-            accept_states=dfa_actual_accept_states
-        )
+        token_types = self.token_types()
+        self.table = TransitionTable.from_dfa(
+            self.dfa, self.dfa_accept_state_to_token_type_map, token_types, self.char_classes)
+        self._add_reserved_words()
 
-    def process(self, input_stream) -> List[Tuple[str, str]]:
+    def build_lazy_dfa(self):
         """
-        Processes the input_stream using the generated DFA to produce a list of tokens.
-        Each token is a tuple: (lexeme, token_type) or (lexeme, "erro!").
-        Whitespace between tokens is skipped unless defined as a token itself.
+        Builds self.table as a LazyDFA over the position automaton of all registered
+        rules: DFA states are built on demand while scanning, in a bounded cache.
+        Invalid rules are reported and left out.
         """
-        if self.has_errors or not self.dfa:
+        position_automaton, failed = RegexProcessor.rules_to_position_automaton(self.rules, self.rule_positions)
+
+        for key, message in failed.items():
+            self.application.error(f"Não foi possível processar a expressão regular: {message}")
+            del self.rules[key]
+            self.token_order.remove(key)
+
+        if position_automaton is None:
+            self.application.error("Nenhuma expressão regular válida para gerar o analisador léxico.")
+            self.has_errors = True
+            return
+
+        self.table = LazyDFA(position_automaton, self.token_types())
+        self._add_reserved_words()
+        self.application.log(f"DFA sob demanda criado: {self.table}")
+
+    def _add_reserved_words(self):
+        if not self.reserved_words:
+            return
+
+        token_types = self.token_types()
+        words = {}
+        for key, word in self.reserved_words.items():
+            words.setdefault(word, token_types.index(key))
+        for word in self.table.add_reserved_words(words):
+            self.application.warning(
+                f"Palavra reservada '{word}' nunca será reconhecida: outra regra de maior prioridade a reconhece.")
+
+    def lazy_dfa_stats(self):
+        """Hit/miss counters of the LazyDFA cache (see LazyDFA.stats), or None outside lazy mode."""
+        if isinstance(self.table, LazyDFA):
+            return self.table.stats()
+        return None
+
+    def _can_process(self) -> bool:
+        if self.has_errors or not self.table:
             self.application.error(
                 "Analisador léxico não foi gerado ou contém erros. Não é possível processar.")
-            return []
+            return False
 
-        if not self.dfa_accept_state_to_token_type_map:
+        if self.dfa is not None and not self.dfa_accept_state_to_token_type_map:
 
             if self.dfa.accept_states:
                 self.application.error(
@@ -217,8 +485,29 @@ class LexicalAnalyzer():
 
             self.application.warning(
                 "Aviso: Mapa de estados de aceitação para tipos de token está vazio.")
+        return True
+
+    def process(self, input_stream) -> TokenBuffer:
+        """
+        Processes the input_stream using the generated DFA and returns its tokens in a
+        TokenBuffer: token type ids and [start, end) spans kept in compact arrays, with
+        lexemes sliced from input_stream only when a token is read. Reading the buffer
+        yields Token(lexeme, token_type, start, end) values, with token_type "erro!"
+        for unexpected characters.
+        Whitespace between tokens is skipped unless defined as a token itself.
+        When self.linear_time is set, the scan runs in linear time even for rule sets
+        that would otherwise rescan the same input quadratically (e.g. `a` and `a*b`
+        on a long run of a's); the tokens are the same.
+        """
+        if not self._can_process():
+            return TokenBuffer(input_stream, [])
+
+        failed = set() if self.linear_time else None
 
-        tokens = []
+        token_types = self.table.token_types
+        error_type_id = len(token_types)
+        tokens = TokenBuffer(input_stream, token_types + [config.ERROR_TOKEN_TYPE])
+        append_token = tokens.append
         current_pos = 0
         input_len = len(input_stream)
 
@@ -226,87 +515,241 @@ class LexicalAnalyzer():
             # 1. Skip inter-token whitespace (if whitespace is not a token itself)
             # This assumes whitespace is not part of any token definition.
             # If 'WS' is a token type, this explicit skip should be removed or conditional.
-            start_of_potential_token = current_pos
             while current_pos < input_len and input_stream[current_pos].isspace():
                 current_pos += 1
 
-            if current_pos == start_of_potential_token and current_pos == input_len:  # Only whitespace and now EOF
-                break
-            if current_pos == input_len and current_pos > start_of_potential_token:  # Skipped whitespace to EOF
+            if current_pos == input_len:  # Only whitespace up to EOF
                 break
 
             # 2. Maximal Munch: Find the longest possible lexeme from current_pos
-            current_dfa_state = self.dfa.start_state
-            current_lexeme_scan = ""
-
-            # Store the last recognized valid lexeme and its state info
-            # (lexeme_str, dfa_accept_state_frozenset, position_after_lexeme)
-            last_accepted_lexeme_info = None
-
-            scan_pos = current_pos
-            while scan_pos < input_len:
-                char = input_stream[scan_pos]
-
-                # If char is whitespace and we are configured to stop tokens at whitespace
-                # (and whitespace is not part of the current token pattern e.g. string literal)
-                # For simplicity, this example assumes patterns don't cross whitespace unless whitespace is in their alphabet.
-                # The DFA transition handles this naturally if whitespace is in alphabet.
-                # If not, and a pattern could accept whitespace, this logic might be too simple.
-
-                next_dfa_state = self.dfa.transitions.get(
-                    (current_dfa_state, char))
-
-                if next_dfa_state is not None:
-                    current_lexeme_scan += char
-                    current_dfa_state = next_dfa_state
-                    scan_pos += 1
-
-                    # Check if the current_dfa_state is an accept state
-                    if current_dfa_state in self.dfa.accept_states:  # dfa.accept_states are frozensets
-                        last_accepted_lexeme_info = (
-                            current_lexeme_scan, current_dfa_state, scan_pos)
-                else:
-                    # No transition for 'char' from 'current_dfa_state'
-                    break  # End of current scan for maximal munch
+            if failed is None:
+                token_type_id, next_pos_after_lexeme, _ = \
+                    self.table.longest_match(input_stream, current_pos, input_len)
+            else:
+                token_type_id, next_pos_after_lexeme, _ = \
+                    self.table.longest_match_memoized(input_stream, current_pos, input_len, failed)
 
             # 3. Process the found lexeme or handle error
-            if last_accepted_lexeme_info:
-                final_lexeme, final_dfa_accept_state, next_pos_after_lexeme = last_accepted_lexeme_info
-
-                # Determine base token type from the DFA accept state map
-                base_token_type = self.dfa_accept_state_to_token_type_map.get(
-                    final_dfa_accept_state)
-
-                if not base_token_type:
-                    # This is a serious issue if an accept state is not in the map.
-                    # It implies a flaw in the determinize/map population logic.
-                    tokens.append(
-                        (final_lexeme, "erro!_TIPO_INTERNO_DESCONHECIDO"))
-                    self.application.error(
-                        f"Erro Interno: Lexema '{final_lexeme}' aceito pelo estado {final_dfa_accept_state} que não está no mapa de tipos.")
-                else:
-                    # # Check symbol table for reserved words/specific lexemes
-                    # # This allows "if" (base_token_type 'ID') to become 'PR_IF'
-                    # overriding_token_type = self.application.symbol_table.lookup(final_lexeme)
-                    # if overriding_token_type:
-                    #     # Potentially add a check: is base_token_type compatible with being overridden?
-                    #     # e.g., an 'ID' can be a keyword, a 'NUMBER' typically cannot.
-                    #     # For now, assume symbol table lookup takes precedence if valid.
-                    #     tokens.append((final_lexeme, overriding_token_type))
-                    # else:
-                    tokens.append((final_lexeme, base_token_type))
+            if token_type_id is not None:
+                # Reserved words (e.g. "if" matched as ID) were already reclassified by the table
+                append_token(token_type_id, current_pos, next_pos_after_lexeme)
 
                 current_pos = next_pos_after_lexeme  # Advance main pointer
 
             else:  # nenhum lexema válido encontrado começando de current_pos
-                if current_pos < input_len:  # ter certeza de que ainda há caracteres para processar
-                    error_char = input_stream[current_pos]
-                    tokens.append((error_char, "erro!"))
-                    self.application.log(
-                        f"Erro Léxico: Caractere inesperado '{error_char}' na posição {current_pos}.")
-                    current_pos += 1  # ignora o caractere inválido e avança
+                append_token(error_type_id, current_pos, current_pos + 1)
+                self.application.log(
+                    f"Erro Léxico: Caractere inesperado '{input_stream[current_pos]}' na posição {current_pos}.")
+                current_pos += 1  # ignora o caractere inválido e avança
 
         return tokens
 
+    def iter_tokens(self, source, chunk_size: int = config.STREAM_CHUNK_SIZE,
+                    lookahead: int = config.STREAM_LOOKAHEAD) -> TokenStream:
+        """
+        Streaming version of process(): reads `source` in chunks and yields the same
+        Tokens (with absolute offsets) without holding the whole input or token list.
+        `source` may be a str, a file object (anything with read()) or an iterable of
+        str chunks. Only the unconsumed tail of the current chunk is kept in memory;
+        the scan of a token that crosses chunk boundaries resumes on each new chunk from
+        the DFA state where it stopped (see TransitionTable.advance), so a long token costs
+        time linear in its length and maximal munch gives the same result as process().
+        Returns a TokenStream, which also offers peek() over a small lookahead buffer.
+        """
+        return TokenStream(self._generate_tokens(source, chunk_size), lookahead)
+
+    @staticmethod
+    def _iter_chunks(source, chunk_size):
+        if isinstance(source, str):
+            yield source
+        elif hasattr(source, 'read'):
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+        else:
+            for chunk in source:
+                if chunk:
+                    yield chunk
+
+    def _generate_tokens(self, source, chunk_size):
+        if not self._can_process():
+            return
+
+        table = self.table
+        token_types = table.token_types
+        chunks = self._iter_chunks(source, chunk_size)
+        buffer = ""
+        buffer_offset = 0  # absolute position of buffer[0] in the input
+        current_pos = 0
+        eof = False
+        # Linear-time memo (see process); the pairs hold absolute positions
+        failed = set() if self.linear_time else None
+        visited = []
+
+        while True:
+            buffer_len = len(buffer)
+            while current_pos < buffer_len and buffer[current_pos].isspace():
+                current_pos += 1
+
+            if current_pos == buffer_len:
+                if eof:
+                    return
+                # Buffer exhausted: drop it and read the next chunk
+                buffer_offset += buffer_len
+                buffer, current_pos = next(chunks, ""), 0
+                eof = not buffer
+                if failed is not None:
+                    failed.clear()  # Later scans never revisit positions before the new chunk
+                continue
+
+            if failed is None:
+                state, token_type_id, next_pos_after_lexeme = table.advance(None, buffer, current_pos, buffer_len)
+            else:
+                state, token_type_id, next_pos_after_lexeme = \
+                    table.advance_memoized(None, buffer, current_pos, buffer_len, failed, visited, buffer_offset)
+
+            if state is not None and not eof:
+                # The lexeme may continue in the next chunks: keep scanning them from the
+                # same DFA state, without rescanning the token, and join the pieces once
+                pieces = [buffer[current_pos:]]
+                token_len = buffer_len - current_pos  # characters in pieces so far
+                if next_pos_after_lexeme is not None:
+                    next_pos_after_lexeme -= current_pos
+                while state is not None:
+                    chunk = next(chunks, "")
+                    if not chunk:
+                        eof = True
+                        break
+                    if failed is None:
+                        state, chunk_type_id, chunk_end = table.advance(state, chunk, 0, len(chunk))
+                    else:
+                        state, chunk_type_id, chunk_end = table.advance_memoized(
+                            state, chunk, 0, len(chunk), failed, visited, buffer_offset + current_pos + token_len)
+                    if chunk_type_id is not None:
+                        token_type_id, next_pos_after_lexeme = chunk_type_id, token_len + chunk_end
+                    pieces.append(chunk)
+                    token_len += len(chunk)
+                buffer_offset += current_pos
+                buffer, current_pos = "".join(pieces), 0
+
+            if state is not None and failed is not None:
+                failed.update(visited)  # End of input: the pending pairs reach no accept state
+
+            if token_type_id is not None:
+                lexeme = buffer[current_pos:next_pos_after_lexeme]
+                yield Token(lexeme, token_types[table.reserved_type(token_type_id, lexeme)],
+                            buffer_offset + current_pos, buffer_offset + next_pos_after_lexeme)
+                current_pos = next_pos_after_lexeme
+            else:
+                error_char = buffer[current_pos]
+                yield Token(error_char, config.ERROR_TOKEN_TYPE, buffer_offset + current_pos, buffer_offset + current_pos + 1)
+                self.application.log(
+                    f"Erro Léxico: Caractere inesperado '{error_char}' na posição {buffer_offset + current_pos}.")
+                current_pos += 1
+
+    def iter_mapped(self, source: MappedSource):
+        """
+        Tokenizes a MappedSource without copying it into a string.
+        Yields MappedToken objects carrying byte offsets; lexemes are decoded lazily.
+        """
+        if not self._can_process():
+            return
+
+        token_types = self.table.token_types
+        buffer = source.buffer
+        input_len = len(buffer)
+        current_pos = 0
+        failed = set() if self.linear_time else None
+
+        while current_pos < input_len:
+            byte = buffer[current_pos]
+            if byte in ASCII_WHITESPACE:
+                current_pos += 1
+                continue
+            if byte >= 0x80:
+                char, width = decode_char_at(buffer, current_pos, input_len)
+                if char is not None and char.isspace():
+                    current_pos += width
+                    continue
+
+            if failed is None:
+                token_type_id, next_pos_after_lexeme = \
+                    self.table.longest_match_bytes(buffer, current_pos, input_len)
+            else:
+                token_type_id, next_pos_after_lexeme = \
+                    self.table.longest_match_bytes_memoized(buffer, current_pos, input_len, failed)
+
+            if token_type_id is not None:
+                yield MappedToken(source, token_types[token_type_id], current_pos, next_pos_after_lexeme)
+                current_pos = next_pos_after_lexeme
+            else:
+                _, width = decode_char_at(buffer, current_pos, input_len)
+                error_token = MappedToken(source, config.ERROR_TOKEN_TYPE, current_pos, current_pos + width)
+                yield error_token
+                self.application.log(
+                    f"Erro Léxico: Caractere inesperado '{error_token.lexeme}' no byte {current_pos}.")
+                current_pos += width
+
+    def save(self, path):
+        """
+        Saves the compiled transition table, token types and reserved words to a binary
+        image (see lexer_image) that load() can map back without rebuilding the DFA.
+        Returns True on success.
+        """
+        if not isinstance(self.table, TransitionTable):
+            self.application.error(
+                "Apenas analisadores léxicos compilados podem ser salvos (não gerado, com erros ou em modo sob demanda).")
+            return False
+
+        try:
+            write_image(self.table, path)
+        except OSError as e:
+            self.application.error(f"Erro ao salvar o analisador léxico em '{path}': {e}")
+            return False
+
+        self.application.log(f"Analisador léxico '{self.name}' salvo em: {path}")
+        return True
+
+    def export_module(self, path):
+        """
+        Writes a standalone Python module with this analyzer's tables and a specialized
+        tokenize(text) function (see scanner_codegen); the module does not import
+        src.scanner_framework. Returns True on success.
+        """
+        if not isinstance(self.table, TransitionTable):
+            self.application.error(
+                "Apenas analisadores léxicos compilados podem ser exportados (não gerado, com erros ou em modo sob demanda).")
+            return False
+
+        try:
+            write_scanner_module(self.table, path, self.name)
+        except OSError as e:
+            self.application.error(f"Erro ao exportar o analisador léxico para '{path}': {e}")
+            return False
+
+        self.application.log(f"Analisador léxico '{self.name}' exportado como módulo Python em: {path}")
+        return True
+
+    @staticmethod
+    def load(path, application, name=None):
+        """
+        Loads a lexical analyzer saved by save(). The transition table is memory-mapped
+        and used in place; no DFA is rebuilt. Returns None on error.
+        """
+        try:
+            table = read_image(path)
+        except (OSError, LexerImageError) as e:
+            application.error(f"Erro ao carregar o analisador léxico de '{path}': {e}")
+            return None
+
+        lexical_analyzer = LexicalAnalyzer(name or os.path.splitext(os.path.basename(path))[0], application)
+        lexical_analyzer.table = table
+        lexical_analyzer.token_order = list(table.token_types)
+        for word, token_type_id in table.reserved_words.items():
+            lexical_analyzer.reserved_words[table.token_types[token_type_id]] = word
+        return lexical_analyzer
+
     def get_info(self):
-        return f"Analisador Léxico: {self.name}, DFAs Registrados: {len(self.dfas)}"
+        return f"Analisador Léxico: {self.name}, DFAs Registrados: {len(self.rules or self.dfas)}, Palavras Reservadas: {len(self.reserved_words)}"
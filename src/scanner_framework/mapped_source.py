@@ -0,0 +1,124 @@
+import mmap
+from typing import Iterator, Optional, Tuple
+
+ENCODING = 'utf-8'
+
+# Bytes ASCII para os quais str.isspace() é verdadeiro
+ASCII_WHITESPACE = frozenset(b for b in range(0x80) if chr(b).isspace())
+
+
+def decode_char_at(buffer, pos: int, end: int) -> Tuple[Optional[str], int]:
+    """
+    Decodifica o caractere UTF-8 que começa em buffer[pos].
+    Retorna (caractere, largura em bytes), ou (None, 1) se a sequência for inválida.
+    """
+    lead = buffer[pos]
+    if lead < 0x80:
+        return chr(lead), 1
+    if lead >> 5 == 0b110:
+        width = 2
+    elif lead >> 4 == 0b1110:
+        width = 3
+    elif lead >> 3 == 0b11110:
+        width = 4
+    else:
+        return None, 1
+    if pos + width > end:
+        return None, 1
+    try:
+        return buffer[pos:pos + width].decode(ENCODING), width
+    except UnicodeDecodeError:
+        return None, 1
+
+
+class MappedSource:
+    """
+    Arquivo de entrada mapeado em memória (somente leitura) para ser analisado
+    sem carregá-lo em uma string. As posições são offsets em bytes do arquivo UTF-8.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            # mmap não aceita arquivos vazios
+            self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self._size() else b""
+        except Exception:
+            self._file.close()
+            raise
+
+    def _size(self) -> int:
+        self._file.seek(0, 2)
+        return self._file.tell()
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def lexeme(self, start: int, end: int) -> str:
+        """Decodifica apenas o trecho [start, end) do arquivo."""
+        return self.buffer[start:end].decode(ENCODING, errors='replace')
+
+    def __getitem__(self, key: slice) -> str:
+        if not isinstance(key, slice):
+            raise TypeError("MappedSource só aceita fatias (source[start:end]).")
+        return self.lexeme(key.start or 0, len(self.buffer) if key.stop is None else key.stop)
+
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class MappedToken:
+    """
+    Token produzido a partir de um MappedSource: guarda apenas o tipo e os offsets.
+    O lexema é decodificado sob demanda, enquanto o arquivo ainda estiver mapeado.
+    """
+    __slots__ = ('source', 'token_type', 'start', 'end')
+
+    def __init__(self, source: MappedSource, token_type: str, start: int, end: int):
+        self.source = source
+        self.token_type = token_type
+        self.start = start
+        self.end = end
+
+    @property
+    def lexeme(self) -> str:
+        return self.source.lexeme(self.start, self.end)
+
+    def __repr__(self):
+        return f"MappedToken({self.token_type}, {self.start}:{self.end})"
+
+
+class MappedTokens:
+    """
+    Tokens de um arquivo mapeado em memória (ver SgFramework.analyze_file), produzidos
+    sob demanda. É dono do MappedSource: o arquivo continua mapeado, e os lexemas dos
+    tokens legíveis, até close() ou o fim de um bloco with, mesmo depois de a iteração
+    terminar; sem close(), o mapeamento é liberado junto com o objeto.
+    """
+
+    def __init__(self, source: MappedSource, tokens: Iterator[MappedToken]):
+        self.source = source
+        self._tokens = tokens
+
+    def __iter__(self) -> Iterator[MappedToken]:
+        return self
+
+    def __next__(self) -> MappedToken:
+        return next(self._tokens)
+
+    def close(self):
+        self.source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,133 @@
+"""
+Análise léxica paralela de entradas grandes.
+
+A entrada é dividida em pedaços e cada pedaço é tokenizado especulativamente em um
+processo separado, como se um token começasse exatamente no seu início. Na junção,
+o fluxo verdadeiro (sequencial) é reconstruído pedaço a pedaço: enquanto o próximo
+token verdadeiro não começar em uma posição onde o fluxo especulativo também começa
+um token, o processo principal reanalisa sequencialmente; assim que os dois fluxos
+se sincronizam, os tokens especulativos restantes do pedaço são aproveitados.
+Como o analisador não guarda estado entre tokens, o resultado é idêntico ao de
+LexicalAnalyzer.process.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from array import array
+from src.scanner_framework.tokens import TokenBuffer
+import src.scanner_framework.config as config
+
+_worker_table = None
+_worker_linear_time = False
+
+
+def _init_worker(table, linear_time):
+    global _worker_table, _worker_linear_time
+    _worker_table = table
+    _worker_linear_time = linear_time
+
+
+def _scan_window(window):
+    """
+    Tokeniza um pedaço no processo trabalhador.
+    window: (text, offset, region_end, is_last) — `text` é a entrada a partir de `offset`,
+    incluindo uma sobra após o fim da região para que tokens possam atravessá-lo.
+    Só são produzidos tokens que começam antes de region_end; a varredura para
+    no primeiro token cujo resultado dependeria de texto além da janela.
+    Retorna arrays (type_ids, starts, ends) com offsets absolutos.
+    No modo de tempo linear, a janela tem o seu próprio memo de pares que falharam. Só a
+    última varredura pode chegar ao fim do texto da janela, onde um par pode falhar apenas
+    por falta de texto, então os pares guardados valem para todas as anteriores.
+    """
+    text, offset, region_end, is_last = window
+    table = _worker_table
+    failed = set() if _worker_linear_time else None
+    error_type_id = len(table.token_types)
+    type_ids, starts, ends = array('i'), array('q'), array('q')
+
+    text_len = len(text)
+    local_region_end = region_end - offset
+    current_pos = 0
+    while True:
+        while current_pos < text_len and text[current_pos].isspace():
+            current_pos += 1
+        if current_pos >= local_region_end or current_pos >= text_len:
+            break
+
+        if failed is None:
+            token_type_id, next_pos_after_lexeme, reached_end = table.longest_match(text, current_pos, text_len)
+        else:
+            token_type_id, next_pos_after_lexeme, reached_end = \
+                table.longest_match_memoized(text, current_pos, text_len, failed)
+        if reached_end and not is_last:
+            break  # The match could continue past the window: leave it to the merge
+
+        if token_type_id is None:
+            token_type_id, next_pos_after_lexeme = error_type_id, current_pos + 1
+        type_ids.append(token_type_id)
+        starts.append(offset + current_pos)
+        ends.append(offset + next_pos_after_lexeme)
+        current_pos = next_pos_after_lexeme
+
+    return type_ids, starts, ends
+
+
+def tokenize_parallel(lexical_analyzer, text, max_workers=None,
+                      chunk_size=config.PARALLEL_CHUNK_SIZE, overlap=config.PARALLEL_OVERLAP) -> TokenBuffer:
+    """
+    Tokeniza `text` com o analisador léxico dado, dividindo-o em pedaços de
+    `chunk_size` caracteres analisados em um ProcessPoolExecutor. Cada trabalhador
+    recebe `overlap` caracteres extras após o seu pedaço. Retorna o mesmo TokenBuffer
+    que lexical_analyzer.process(text) retornaria.
+    """
+    table = lexical_analyzer.table
+    application = lexical_analyzer.application
+    linear_time = lexical_analyzer.linear_time
+    failed = set() if linear_time else None
+    token_types = table.token_types
+    error_type_id = len(token_types)
+    tokens = TokenBuffer(text, token_types + [config.ERROR_TOKEN_TYPE])
+
+    text_len = len(text)
+    bounds = list(range(0, text_len, chunk_size)) + [text_len]
+    regions = list(zip(bounds, bounds[1:]))
+    windows = [(text[start:min(text_len, end + overlap)], start, end, end + overlap >= text_len)
+               for start, end in regions]
+
+    def append_token(token_type_id, start, end):
+        tokens.append(token_type_id, start, end)
+        if token_type_id == error_type_id:
+            application.log(f"Erro Léxico: Caractere inesperado '{text[start]}' na posição {start}.")
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(table, linear_time)) as executor:
+        next_pos = 0  # where the sequential scanner would resume
+        for (region_start, region_end), (type_ids, starts, ends) in zip(regions, executor.map(_scan_window, windows)):
+            index_by_start = None
+            while True:
+                token_start = next_pos
+                while token_start < text_len and text[token_start].isspace():
+                    token_start += 1
+                if token_start >= region_end:
+                    break  # The next true token belongs to a later chunk
+
+                if index_by_start is None:
+                    index_by_start = {start: i for i, start in enumerate(starts)}
+                i = index_by_start.get(token_start)
+                if i is not None:
+                    # Synchronized: the speculative stream is exact from here on
+                    for j in range(i, len(starts)):
+                        append_token(type_ids[j], starts[j], ends[j])
+                    next_pos = ends[-1]
+                    continue
+
+                # Out of sync: scan the next token sequentially
+                if failed is None:
+                    token_type_id, next_pos_after_lexeme, _ = table.longest_match(text, token_start, text_len)
+                else:
+                    token_type_id, next_pos_after_lexeme, _ = \
+                        table.longest_match_memoized(text, token_start, text_len, failed)
+                if token_type_id is None:
+                    token_type_id, next_pos_after_lexeme = error_type_id, token_start + 1
+                append_token(token_type_id, token_start, next_pos_after_lexeme)
+                next_pos = next_pos_after_lexeme
+
+    return tokens
@@ -1,23 +1,68 @@
+import sys
+from bisect import bisect_right
 from src.scanner_framework.automatas.deterministic_automata import DeterministicFiniteAutomata
-from typing import Set, Dict, Tuple, List, Optional, FrozenSet
+from src.scanner_framework.char_ranges import RangeSet
+import src.scanner_framework.char_ranges as char_ranges
+from src.scanner_framework.bitsets import mask_of, iter_bits, lowest_bit
+from typing import Set, Dict, Tuple, List, Optional, NamedTuple
+
+
+class PositionAutomaton(NamedTuple):
+    """
+    Autômato de posições (followpos) de uma ou mais regras, com conjuntos de posições
+    como bitmasks. Um estado do DFA correspondente é uma máscara de posições; a transição
+    por um átomo é a união dos followpos das posições em (estado & atom_masks[átomo]).
+    """
+    start: int  # firstpos da raiz
+    followpos: List[int]  # posição -> máscara de followpos
+    atoms: List[Tuple[int, int]]  # intervalos disjuntos e ordenados do alfabeto
+    atom_masks: List[int]  # átomo -> máscara das posições que o reconhecem
+    end_markers: Dict[int, str]  # posição do marcador de fim -> tipo de token
+
+    def accepting_token_types(self, word: str) -> List[str]:
+        """Tipos de token cujas regras reconhecem a palavra inteira, simulando o autômato."""
+        mask = self.start
+        for char in word:
+            code = ord(char)
+            a = bisect_right(self.atoms, (code, sys.maxunicode)) - 1
+            if a < 0 or code > self.atoms[a][1]:
+                return []
+            next_mask = 0
+            for pos in iter_bits(mask & self.atom_masks[a]):
+                next_mask |= self.followpos[pos]
+            mask = next_mask
+            if not mask:
+                return []
+        return [token_type for pos, token_type in sorted(self.end_markers.items()) if mask >> pos & 1]
+
+
+class RulePositions(NamedTuple):
+    """
+    O que a construção combinada usa de uma regra isolada, com as folhas numeradas a
+    partir de 0 e conjuntos de posições como bitmasks. Não depende das demais regras, então
+    pode ser compilado em paralelo e guardado no cache (ver DfaCache); _link_rules desloca
+    as posições de cada regra para o autômato de posições combinado.
+    """
+    symbols: List[RangeSet]  # posição -> conjunto de intervalos da folha
+    followpos: List[int]  # posição -> máscara de followpos dentro da regra
+    firstpos: int
+    lastpos: int
+    nullable: bool
 
 
 class SyntaxTreeNode:
-    _position_counter = 1 # For assigning unique positions to symbol leaves
-
-    def __init__(self, node_type: str, value: Optional[str] = None, children: Optional[List['SyntaxTreeNode']] = None):
+    def __init__(self, node_type: str, value=None, children: Optional[List['SyntaxTreeNode']] = None,
+                 position: Optional[int] = None):
         self.node_type: str = node_type  # e.g., 'LITERAL', 'CONCAT', 'UNION', 'STAR', 'PLUS', 'OPTION', 'ENDMARKER'
-        self.value: Optional[str] = value # LITERAL/ENDMARKER
+        self.value = value # LITERAL (conjunto de intervalos) / ENDMARKER (tipo de token ou '#')
         self.children: List[SyntaxTreeNode] = children if children is not None else []
 
         self.nullable: bool = False
         self.firstpos: Set[int] = set()
         self.lastpos: Set[int] = set()
         
-        self.position: Optional[int] = None
-        if self.node_type == 'LITERAL' or self.node_type == 'ENDMARKER':
-            self.position = SyntaxTreeNode._position_counter
-            SyntaxTreeNode._position_counter += 1
+        # Posição única das folhas (LITERAL e ENDMARKER), dada por quem constrói a árvore
+        self.position: Optional[int] = position
 
     def __repr__(self) -> str:
         return f"Node({self.node_type}, {self.value or ''}, pos:{self.position}, child_count:{len(self.children)})"
@@ -69,14 +114,21 @@ class RegexProcessor:
         return "".join(processed_regex), placeholder_map
     
     @staticmethod
-    def _expand_char_classes(regex: str) -> str:
+    def _extract_char_classes(regex: str, placeholder_map: Dict[str, str]) -> Tuple[str, Dict[str, RangeSet]]:
         """
-        Transforma expressões de classe de caracteres como [a-zA-Z0-9] em
-        (a|b|...|z|A|B|...|Z|0|1|...|9). Suporta múltiplos intervalos e caracteres isolados.
+        Substitui cada classe de caracteres como [a-zA-Z0-9] ou [^"] por um único
+        caractere placeholder de uso privado, mapeado para o conjunto de intervalos
+        da classe. A classe vira uma única folha da árvore sintática, em vez de uma
+        união com uma folha por caractere. Suporta múltiplos intervalos, caracteres
+        isolados e negação com '^' no início da classe.
+
+        Retorna a regex processada e um mapa do placeholder para o conjunto de intervalos.
         """
         i = 0
-        expanded = []
+        extracted = []
         n = len(regex)
+        class_map: Dict[str, RangeSet] = {}
+        next_placeholder_code = 0xE000 + len(placeholder_map)
 
         while i < n:
             if regex[i] == '[':
@@ -85,38 +137,62 @@ class RegexProcessor:
                     j += 1
                 if j >= n:
                     raise ValueError(f"Char class was not closed in: {regex[i:]}")
+                # Os escapes continuam como placeholders até a classe ser dividida, para que
+                # '\-' e '\^' sejam membros literais e não intervalo ou negação
                 class_body = regex[i+1:j]
-                chars = []
+
+                negated = len(class_body) > 1 and class_body[0] == '^'
+                if negated:
+                    class_body = class_body[1:]
+
+                def code_of(c):
+                    return ord(placeholder_map.get(c, c))
+
+                ranges = []
                 k = 0
                 while k < len(class_body):
                     if (k + 2 < len(class_body)) and (class_body[k+1] == '-'):
-                        start_char = class_body[k]
-                        end_char = class_body[k+2]
-                        for code in range(ord(start_char), ord(end_char) + 1):
-                            chars.append(chr(code))
+                        start_code, end_code = code_of(class_body[k]), code_of(class_body[k+2])
+                        if start_code > end_code:
+                            raise ValueError(f"Invalid range in char class: {chr(start_code)}-{chr(end_code)}")
+                        ranges.append((start_code, end_code))
                         k += 3
                     else:
-                        chars.append(class_body[k])
+                        ranges.append((code_of(class_body[k]), code_of(class_body[k])))
                         k += 1
                 
-                if not chars:
+                if not ranges:
                     raise ValueError("Empty character class [] is not allowed.")
-                
-                if len(chars) == 1:
-                    char = chars[0]
-                    if char in RegexProcessor._ALL_OPERATORS:
-                         expanded.append(char)
-                    else:
-                         expanded.append(char)
-                else:
-                    union_expr = "(" + "|".join(chars) + ")"
-                    expanded.append(union_expr)
+
+                range_set = char_ranges.normalize(ranges)
+                if negated:
+                    range_set = char_ranges.complement(range_set)
+                    if not range_set:
+                        raise ValueError("Negated character class matches no character.")
+
+                placeholder = chr(next_placeholder_code)
+                next_placeholder_code += 1
+                class_map[placeholder] = range_set
+                extracted.append(placeholder)
                 i = j + 1
             else:
-                expanded.append(regex[i])
+                extracted.append(regex[i])
                 i += 1
 
-        return "".join(expanded)
+        return "".join(extracted), class_map
+
+    @staticmethod
+    def literal_word(regex: str) -> Optional[str]:
+        """
+        Se a expressão regular reconhece uma única palavra fixa (apenas caracteres
+        literais ou escapados, como 'if' ou '\\(\\)'), retorna essa palavra; senão None.
+        """
+        escaped_regex, placeholder_map = RegexProcessor._handle_escapes(regex)
+        if not escaped_regex:
+            return None
+        if any(c in RegexProcessor._ALL_OPERATORS or c in '[]' for c in escaped_regex):
+            return None
+        return "".join(placeholder_map.get(c, c) for c in escaped_regex)
 
     @staticmethod
     def _preprocess_regex(regex: str) -> str:
@@ -178,17 +254,23 @@ class RegexProcessor:
     @staticmethod
     def _build_syntax_tree(
         postfix_regex: str,
-        placeholder_map: Dict[str, str]
-    ) -> Tuple[Optional[SyntaxTreeNode], Dict[int, str], Set[str], Optional[int]]:
-
-        SyntaxTreeNode._position_counter = 1
+        placeholder_map: Dict[str, str],
+        class_map: Dict[str, RangeSet],
+        first_position: int = 1
+    ) -> Tuple[Optional[SyntaxTreeNode], Dict[int, RangeSet]]:
+        """
+        Constrói a árvore sintática. Cada folha LITERAL guarda o conjunto de intervalos
+        de caracteres que ela reconhece (um caractere isolado é o intervalo (c, c)).
+        As folhas são numeradas a partir de first_position, para que várias regras possam
+        ser unidas em uma única árvore; nenhum estado é compartilhado entre chamadas.
+        Retorna a raiz e o mapa posição -> conjunto de intervalos.
+        """
+        next_position = first_position
         stack: List[SyntaxTreeNode] = []
-        symbols_map: Dict[int, str] = {}
-        alphabet: Set[str] = set()
-        end_marker_pos: Optional[int] = None
+        symbols_map: Dict[int, RangeSet] = {}
 
         if not postfix_regex:
-            return None, symbols_map, alphabet, end_marker_pos
+            return None, symbols_map
 
         for token in postfix_regex:
             # If the token is a known operator, create an operator node. Otherwise, it's an operand.
@@ -213,35 +295,45 @@ class RegexProcessor:
                 if len(stack) < 2: raise ValueError("Invalid postfix for concatenation")
                 c2, c1 = stack.pop(), stack.pop()
                 stack.append(SyntaxTreeNode('CONCAT', children=[c1, c2]))
-            else:  # It's an operand (literal, placeholder, or endmarker)
-                node: SyntaxTreeNode
-                if token == '#':
-                    node = SyntaxTreeNode('ENDMARKER', value='#')
-                    if node.position is not None:
-                        symbols_map[node.position] = '#'
-                        end_marker_pos = node.position
+            else:  # It's an operand (literal or placeholder)
+                if token in class_map:
+                    range_set = class_map[token]
                 else:
-                    original_value = placeholder_map.get(token, token)
-                    node = SyntaxTreeNode('LITERAL', value=original_value)
-                    if node.position is not None:
-                        symbols_map[node.position] = original_value
-                    alphabet.add(original_value)
+                    code = ord(placeholder_map.get(token, token))
+                    range_set = ((code, code),)
+                node = SyntaxTreeNode('LITERAL', value=range_set, position=next_position)
+                next_position += 1
+                symbols_map[node.position] = range_set
                 stack.append(node)
 
         if len(stack) != 1:
             raise ValueError("Invalid postfix regex, stack should have 1 element (root node)")
         
-        return stack[0], symbols_map, alphabet, end_marker_pos
+        return stack[0], symbols_map
 
     @staticmethod
-    def _compute_tree_annotations(node: Optional[SyntaxTreeNode]):
-        """Computa nullable, firstpos e lastpos para cada nó da árvore recursivamente."""
-        if node is None:
-            return
+    def _postorder(root: Optional[SyntaxTreeNode]) -> List[SyntaxTreeNode]:
+        """
+        Nós da árvore em pós-ordem (filhos antes do pai), com uma pilha explícita: a
+        árvore de um analisador com muitas regras é profunda demais para recursão.
+        """
+        order: List[SyntaxTreeNode] = []
+        stack = [root] if root is not None else []
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            stack.extend(node.children)
+        order.reverse()
+        return order
 
-        for child in node.children:
-            RegexProcessor._compute_tree_annotations(child)
+    @staticmethod
+    def _compute_tree_annotations(root: Optional[SyntaxTreeNode]):
+        """Computa nullable, firstpos e lastpos para cada nó da árvore, dos filhos para o pai."""
+        for node in RegexProcessor._postorder(root):
+            RegexProcessor._annotate_node(node)
 
+    @staticmethod
+    def _annotate_node(node: SyntaxTreeNode):
         if node.node_type == 'LITERAL' or node.node_type == 'ENDMARKER':
             node.nullable = False
             if node.position is not None:
@@ -260,11 +352,10 @@ class RegexProcessor:
             node.lastpos = c2.lastpos.copy()
             if c2.nullable:
                 node.lastpos.update(c1.lastpos)
-        elif node.node_type == 'UNION':
-            c1, c2 = node.children[0], node.children[1]
-            node.nullable = c1.nullable or c2.nullable
-            node.firstpos = c1.firstpos.union(c2.firstpos)
-            node.lastpos = c1.lastpos.union(c2.lastpos)
+        elif node.node_type == 'UNION':  # binária na regex; n-ária na união das regras
+            node.nullable = any(child.nullable for child in node.children)
+            node.firstpos = set().union(*(child.firstpos for child in node.children))
+            node.lastpos = set().union(*(child.lastpos for child in node.children))
         elif node.node_type == 'STAR': # c*
             c1 = node.children[0]
             node.nullable = True
@@ -284,131 +375,251 @@ class RegexProcessor:
 
     @staticmethod
     def _compute_followpos(
-        node: Optional[SyntaxTreeNode], 
+        root: Optional[SyntaxTreeNode],
         followpos_table: Dict[int, Set[int]]
     ) -> None:
-        """ Computa o followpos para cada nó da árvore recursivamente. """
-        if node is None:
-            return
+        """ Computa o followpos para cada nó da árvore (já anotada). """
+        for node in RegexProcessor._postorder(root):
+            if node.node_type == 'CONCAT':
+                c1, c2 = node.children[0], node.children[1]
+                for i in c1.lastpos:
+                    followpos_table.setdefault(i, set()).update(c2.firstpos)
 
-        for child in node.children:
-            RegexProcessor._compute_followpos(child, followpos_table)
+            elif node.node_type == 'STAR' or node.node_type == 'PLUS':
+                c1 = node.children[0]
+                for i in c1.lastpos:
+                    followpos_table.setdefault(i, set()).update(c1.firstpos)
 
-        if node.node_type == 'CONCAT':
-            c1, c2 = node.children[0], node.children[1]
-            for i in c1.lastpos:
-                followpos_table.setdefault(i, set()).update(c2.firstpos)
 
-        elif node.node_type == 'STAR' or node.node_type == 'PLUS':
-            c1 = node.children[0]
-            for i in c1.lastpos:
-                followpos_table.setdefault(i, set()).update(c1.firstpos)
+    @staticmethod
+    def _regex_to_syntax_tree(regex: str, first_position: int = 1) -> Tuple[Optional[SyntaxTreeNode], Dict[int, RangeSet]]:
+        """
+        Converte uma expressão regular em sua árvore sintática, ainda sem o marcador de fim,
+        com as folhas numeradas a partir de first_position.
+        Retorna a raiz (None para a regex vazia) e o mapa posição -> conjunto de intervalos.
+        """
+        # Etapa 0: Pre-processamento (escapes e extração das classes de caracteres)
+        escaped_regex, placeholder_map = RegexProcessor._handle_escapes(regex)
+        expanded_regex, class_map = RegexProcessor._extract_char_classes(escaped_regex, placeholder_map)
+
+        if not expanded_regex:
+            return None, {}
 
+        # Etapa 1: Adiciona o operador de concatenação explícito '.'
+        preprocessed_regex = RegexProcessor._preprocess_regex(expanded_regex)
+
+        # Etapa 2: Converte para notação postfix
+        postfix = RegexProcessor._parse_regex_to_postfix(preprocessed_regex)
+
+        # Etapa 3: Constrói a árvore sintática a partir da expressão postfix
+        return RegexProcessor._build_syntax_tree(postfix, placeholder_map, class_map, first_position)
 
     @staticmethod
-    def regex_to_dfa(regex: str) -> DeterministicFiniteAutomata:
-        """Converte uma expressão regular em um autômato finito determinístico (DFA)."""
-        
+    def rule_positions(regex: str) -> RulePositions:
+        """
+        Dados de posição de uma regra isolada (ver RulePositions), com as folhas numeradas
+        a partir de 0. Lança ValueError se a regex for inválida.
+        """
         try:
-            # Etapa 0: Pre-processamento (escapes e expansão de classes de caracteres)
-            escaped_regex, placeholder_map = RegexProcessor._handle_escapes(regex)
-            expanded_regex = RegexProcessor._expand_char_classes(escaped_regex)
-
-            if not expanded_regex:
-                q_empty_accept = "D0"
-                return DeterministicFiniteAutomata(
-                    states={q_empty_accept}, alphabet=set(), transitions={},
-                    start_state=q_empty_accept, accept_states={q_empty_accept}
-                )
-
-            # Etapa 1: Adiciona o operador de concatenação explícito '.'
-            preprocessed_regex = RegexProcessor._preprocess_regex(expanded_regex)
-
-            # Etapa 2: Converte para notação postfix e aumenta com marcador de fim '#'
-            postfix_original = RegexProcessor._parse_regex_to_postfix(preprocessed_regex)
-            augmented_postfix = postfix_original + "#" + RegexProcessor._CONCAT_OP
-            
-            # Etapa 3: Constrói a árvore sintática a partir da expressão postfix
-            root, symbols_map, alphabet, end_marker_pos = \
-                RegexProcessor._build_syntax_tree(augmented_postfix, placeholder_map)
-
-            if root is None or end_marker_pos is None:
-                raise ValueError("Failed to build syntax tree or find end marker.")
-
-            # Etapa 4: Anota a árvore com nullable, firstpos, lastpos
-            RegexProcessor._compute_tree_annotations(root)
-
-            # Etapa 5: Computa a tabela de followpos
-            num_positions = SyntaxTreeNode._position_counter 
-            followpos_table: Dict[int, Set[int]] = {i: set() for i in range(1, num_positions)}
-            RegexProcessor._compute_followpos(root, followpos_table)
-
-            # Etapa 6: Constrói o DFA a partir da árvore e da tabela de followpos (Subset Construction)
-            dfa_states: Set[str] = set()
-            dfa_transitions: Dict[Tuple[str, str], str] = {}
-            dfa_accept_states: Set[str] = set()
-            
-            dfa_state_name_map: Dict[FrozenSet[int], str] = {}
-            next_dfa_state_id = 0
-
-            def get_dfa_name(pos_set: FrozenSet[int]) -> str:
-                nonlocal next_dfa_state_id
-                if pos_set not in dfa_state_name_map:
-                    name = f"D{next_dfa_state_id}"
-                    dfa_state_name_map[pos_set] = name
-                    next_dfa_state_id += 1
-                return dfa_state_name_map[pos_set]
-
-            initial_pos_set = frozenset(root.firstpos)
-            if not initial_pos_set:
-                d0_name = get_dfa_name(initial_pos_set)
-                dfa_states.add(d0_name)
-                start_state = d0_name
-                accept_states = {d0_name} if root.nullable else set()
-                return DeterministicFiniteAutomata(
-                    states=dfa_states, alphabet=alphabet, transitions=dfa_transitions,
-                    start_state=start_state, accept_states=accept_states
-                )
-
-            dfa_start_state_name = get_dfa_name(initial_pos_set)
-            dfa_states.add(dfa_start_state_name)
-
-            unprocessed_dfa_states: List[FrozenSet[int]] = [initial_pos_set]
-            processed_dfa_sets: Set[FrozenSet[int]] = set()
-
-            while unprocessed_dfa_states:
-                current_pos_frozenset = unprocessed_dfa_states.pop(0)
-                if current_pos_frozenset in processed_dfa_sets:
+            root, symbols_map = RegexProcessor._regex_to_syntax_tree(regex, first_position=0)
+        except (ValueError, IndexError) as e:
+            raise ValueError(f"Falha ao processar regex '{regex}': {e}") from e
+
+        if root is None:
+            return RulePositions(symbols=[], followpos=[], firstpos=0, lastpos=0, nullable=True)
+
+        # Etapa 4: Anota a árvore com nullable, firstpos, lastpos
+        RegexProcessor._compute_tree_annotations(root)
+
+        # Etapa 5: Computa a tabela de followpos, guardada como bitmasks de posições
+        followpos_table: Dict[int, Set[int]] = {i: set() for i in range(len(symbols_map))}
+        RegexProcessor._compute_followpos(root, followpos_table)
+
+        return RulePositions(
+            symbols=[symbols_map[i] for i in range(len(symbols_map))],
+            followpos=[mask_of(followpos_table[i]) for i in range(len(symbols_map))],
+            firstpos=mask_of(root.firstpos),
+            lastpos=mask_of(root.lastpos),
+            nullable=root.nullable
+        )
+
+    @staticmethod
+    def _link_rules(rules: List[Tuple[str, RulePositions]]) -> PositionAutomaton:
+        """
+        Autômato de posições da união de regras já compiladas (tipo de token, RulePositions):
+        cada regra é concatenada a um marcador de fim próprio que identifica o seu tipo de
+        token, e as posições de cada regra são deslocadas para depois das da anterior. Como
+        a união não cria followpos, basta deslocar as máscaras de cada regra e ligar o seu
+        lastpos ao seu marcador.
+        """
+        start = 0
+        followpos: List[int] = [0]  # a posição 0 não é usada
+        leaf_positions: List[int] = []
+        leaf_symbols: List[RangeSet] = []
+        end_markers: Dict[int, str] = {}
+
+        for token_type, rule in rules:
+            base = len(followpos)
+            end_marker = base + len(rule.symbols)
+            for i, follow in enumerate(rule.followpos):
+                follow <<= base
+                if rule.lastpos >> i & 1:
+                    follow |= 1 << end_marker
+                followpos.append(follow)
+            followpos.append(0)
+            leaf_positions.extend(range(base, end_marker))
+            leaf_symbols.extend(rule.symbols)
+
+            start |= rule.firstpos << base
+            if rule.nullable:
+                start |= 1 << end_marker
+            end_markers[end_marker] = token_type
+
+        # Etapa 6: Divide os conjuntos de intervalos das folhas em átomos disjuntos;
+        # cada átomo (lo, hi) é um símbolo do alfabeto do DFA, com a máscara das
+        # posições que o reconhecem
+        atoms, covers = char_ranges.split_into_atoms(leaf_symbols)
+        atom_masks: List[int] = [0] * len(atoms)
+        for pos, covered in zip(leaf_positions, covers):
+            for a in covered:
+                atom_masks[a] |= 1 << pos
+
+        return PositionAutomaton(start, followpos, atoms, atom_masks, end_markers)
+
+    @staticmethod
+    def _position_automaton_to_dfa(automaton: PositionAutomaton) -> Tuple[DeterministicFiniteAutomata, Dict[str, str]]:
+        """
+        Constrói o DFA de um autômato de posições.
+        Um estado é de aceitação se contém algum marcador de fim; quando contém vários, vence
+        o de menor posição, isto é, a regra que aparece primeiro. Retorna o DFA e o mapa
+        estado de aceitação -> tipo de token.
+        """
+        start_mask, followpos_masks, atoms, atom_masks, end_markers = automaton
+        alphabet: Set[Tuple[int, int]] = set(atoms)
+        end_marker_mask = mask_of(end_markers)
+
+        # Etapa 7: Constrói o DFA a partir da tabela de followpos (Subset Construction).
+        # Cada estado é a máscara das suas posições; a transição por um átomo é a união dos
+        # followpos das posições em (estado & máscara do átomo), memorizada por essa interseção.
+        dfa_transitions: Dict[Tuple[str, Tuple[int, int]], str] = {}
+        accept_map: Dict[str, str] = {}
+
+        dfa_state_name_map: Dict[int, str] = {}
+        follow_union_cache: Dict[int, int] = {}
+
+        def get_dfa_name(pos_mask: int) -> str:
+            name = dfa_state_name_map.get(pos_mask)
+            if name is None:
+                name = f"D{len(dfa_state_name_map)}"
+                dfa_state_name_map[pos_mask] = name
+                unprocessed_dfa_states.append(pos_mask)
+            return name
+
+        unprocessed_dfa_states: List[int] = []
+        dfa_start_state_name = get_dfa_name(start_mask)
+
+        next_unprocessed = 0
+        while next_unprocessed < len(unprocessed_dfa_states):
+            current_pos_mask = unprocessed_dfa_states[next_unprocessed]
+            next_unprocessed += 1
+            current_dfa_name = dfa_state_name_map[current_pos_mask]
+
+            markers = current_pos_mask & end_marker_mask
+            if markers:
+                accept_map[current_dfa_name] = end_markers[lowest_bit(markers)]
+
+            for a, atom_mask in enumerate(atom_masks):
+                matched = current_pos_mask & atom_mask
+                if not matched:
                     continue
-                processed_dfa_sets.add(current_pos_frozenset)
-                
-                current_dfa_name = get_dfa_name(current_pos_frozenset)
-
-                if end_marker_pos in current_pos_frozenset:
-                    dfa_accept_states.add(current_dfa_name)
-
-                for char_symbol in alphabet:
-                    next_positions_union: Set[int] = set()
-                    for pos in current_pos_frozenset:
-                        if symbols_map.get(pos) == char_symbol:
-                            next_positions_union.update(followpos_table.get(pos, set()))
-                    
-                    if next_positions_union:
-                        next_dfa_pos_frozenset = frozenset(next_positions_union)
-                        next_dfa_name = get_dfa_name(next_dfa_pos_frozenset)
-                        dfa_states.add(next_dfa_name)
-                        dfa_transitions[(current_dfa_name, char_symbol)] = next_dfa_name
-                        
-                        if next_dfa_pos_frozenset not in processed_dfa_sets:
-                            unprocessed_dfa_states.append(next_dfa_pos_frozenset)
-            
+
+                next_pos_mask = follow_union_cache.get(matched)
+                if next_pos_mask is None:
+                    next_pos_mask = 0
+                    for pos in iter_bits(matched):
+                        next_pos_mask |= followpos_masks[pos]
+                    follow_union_cache[matched] = next_pos_mask
+
+                if next_pos_mask:
+                    dfa_transitions[(current_dfa_name, atoms[a])] = get_dfa_name(next_pos_mask)
+
+        dfa = DeterministicFiniteAutomata(
+            states=set(dfa_state_name_map.values()),
+            alphabet=alphabet,
+            transitions=dfa_transitions,
+            start_state=dfa_start_state_name,
+            accept_states=set(accept_map)
+        )
+        return dfa, accept_map
+
+    @staticmethod
+    def regex_to_dfa(regex: str) -> DeterministicFiniteAutomata:
+        """Converte uma expressão regular em um autômato finito determinístico (DFA)."""
+        rule = RegexProcessor.rule_positions(regex)
+
+        if not rule.symbols:
+            q_empty_accept = "D0"
             return DeterministicFiniteAutomata(
-                states=dfa_states,
-                alphabet=alphabet,
-                transitions=dfa_transitions,
-                start_state=dfa_start_state_name,
-                accept_states=dfa_accept_states
+                states={q_empty_accept}, alphabet=set(), transitions={},
+                start_state=q_empty_accept, accept_states={q_empty_accept}
             )
 
-        except (ValueError, IndexError) as e:
-            raise ValueError(f"Falha ao processar regex '{regex}': {e}") from e
+        dfa, _ = RegexProcessor._position_automaton_to_dfa(RegexProcessor._link_rules([('#', rule)]))
+        return dfa
+
+    @staticmethod
+    def _compile_rules(rules: Dict[str, str],
+                       compiled: Optional[Dict[str, RulePositions]] = None) -> Tuple[List[Tuple[str, RulePositions]], Dict[str, str]]:
+        """
+        Dados de posição de cada regra (tipo de token -> regex), na ordem das regras: os já
+        dados em compiled (tipo de token -> RulePositions) ou compilados aqui.
+        Retorna a lista (tipo de token, RulePositions) das regras válidas e as regras
+        inválidas (tipo de token -> erro).
+        """
+        compiled = compiled or {}
+        valid: List[Tuple[str, RulePositions]] = []
+        failed: Dict[str, str] = {}
+        for token_type, regex in rules.items():
+            rule = compiled.get(token_type)
+            if rule is None:
+                try:
+                    rule = RegexProcessor.rule_positions(regex)
+                except ValueError as e:
+                    failed[token_type] = str(e)
+                    continue
+            valid.append((token_type, rule))
+        return valid, failed
+
+    @staticmethod
+    def rules_to_dfa(rules: Dict[str, str],
+                     compiled: Optional[Dict[str, RulePositions]] = None) -> Tuple[Optional[DeterministicFiniteAutomata], Dict[str, str], Dict[str, str]]:
+        """
+        Constrói o DFA do analisador léxico inteiro em uma única construção de subconjuntos
+        sobre o autômato de posições de todas as regras (ver _link_rules); a prioridade entre
+        tokens segue a ordem das regras. compiled: dados de posição já calculados de algumas
+        regras (tipo de token -> RulePositions, ver rule_positions), que não são recompiladas.
+
+        Retorna (dfa, accept_map, failed): o DFA (None se nenhuma regra for válida), o mapa
+        estado de aceitação -> tipo de token e as regras inválidas (tipo de token -> erro),
+        que ficam de fora do DFA.
+        """
+        position_automaton, failed = RegexProcessor.rules_to_position_automaton(rules, compiled)
+        if position_automaton is None:
+            return None, {}, failed
+
+        dfa, accept_map = RegexProcessor._position_automaton_to_dfa(position_automaton)
+        return dfa, accept_map, failed
+
+    @staticmethod
+    def rules_to_position_automaton(rules: Dict[str, str],
+                                    compiled: Optional[Dict[str, RulePositions]] = None) -> Tuple[Optional[PositionAutomaton], Dict[str, str]]:
+        """
+        Como rules_to_dfa, mas para antes da construção de subconjuntos e retorna o
+        autômato de posições (para construir os estados do DFA sob demanda) e as
+        regras inválidas.
+        """
+        valid, failed = RegexProcessor._compile_rules(rules, compiled)
+        if not valid:
+            return None, failed
+
+        return RegexProcessor._link_rules(valid), failed
@@ -0,0 +1,65 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List
+
+
+class ReservedWordLookup(ABC):
+    """
+    Tabela de palavras reservadas de um reconhecedor com longest_match (TransitionTable
+    ou LazyDFA). As palavras reservadas ficam fora do autômato: reserved_words mapeia
+    cada palavra para o id do seu tipo de token, e um lexema reconhecido com um tipo de
+    reserved_hosts (como ID) é reclassificado se for uma dessas palavras.
+    """
+
+    def __init__(self):
+        self.reserved_words: Dict[str, int] = {}
+        self.reserved_words_bytes: Dict[bytes, int] = {}
+        self.reserved_hosts = frozenset()
+
+    @abstractmethod
+    def longest_match(self, input_stream, current_pos, input_len):
+        """
+        Maximal Munch a partir de current_pos, com as palavras reservadas já
+        reclassificadas. Returns (token_type_id, position_after_lexeme, reached_end).
+        """
+
+    def reserved_type(self, token_type_id, lexeme: str):
+        """Tipo final de um lexema reconhecido com token_type_id (reclassificado se for palavra reservada)."""
+        if token_type_id in self.reserved_hosts:
+            return self.reserved_words.get(lexeme, token_type_id)
+        return token_type_id
+
+    def add_reserved_words(self, words: Dict[str, int]) -> List[str]:
+        """
+        Registra palavras reservadas (palavra -> id do tipo de token), que não fazem
+        parte do autômato. Cada palavra é reconhecida pelo próprio autômato com algum tipo
+        de token (o hospedeiro, como ID); ela só é reclassificada se o seu tipo tiver prioridade
+        maior (id menor) que o do hospedeiro, como aconteceria se estivesse no autômato.
+        Retorna as palavras que nunca seriam reclassificadas.
+        """
+        ignored = []
+        hosts = set(self.reserved_hosts)
+        for word, token_type_id in words.items():
+            host_type_id, end, _ = self._match_without_reserved_words(word)
+            if host_type_id is None or end != len(word) or host_type_id <= token_type_id:
+                ignored.append(word)
+                continue
+            if self.reserved_words.get(word, token_type_id) < token_type_id:
+                continue  # A palavra já pertence a um tipo de maior prioridade
+            self.reserved_words[word] = token_type_id
+            self.reserved_words_bytes[word.encode('utf-8')] = token_type_id
+            hosts.add(host_type_id)
+        self.reserved_hosts = frozenset(hosts)
+        return ignored
+
+    def set_reserved_words(self, words: Dict[str, int], hosts):
+        """Restaura palavras já validadas por add_reserved_words (ex.: de uma imagem salva)."""
+        self.reserved_words = dict(words)
+        self.reserved_words_bytes = {word.encode('utf-8'): token_type_id for word, token_type_id in words.items()}
+        self.reserved_hosts = frozenset(hosts)
+
+    def _match_without_reserved_words(self, word):
+        reserved_hosts, self.reserved_hosts = self.reserved_hosts, frozenset()
+        try:
+            return self.longest_match(word, 0, len(word))
+        finally:
+            self.reserved_hosts = reserved_hosts
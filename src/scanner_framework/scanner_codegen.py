@@ -0,0 +1,166 @@
+"""
+Gerador de módulos Python independentes a partir de um analisador léxico compilado.
+
+O módulo gerado traz as tabelas da TransitionTable como constantes e uma função
+tokenize(text) especializada para elas, sem importar nada de src.scanner_framework
+(apenas bisect e typing, da biblioteca padrão). O laço de varredura usa só variáveis
+locais: cada estado é uma tupla de próximos estados indexada pela classe do
+caractere, o tipo aceito por cada estado vem de uma tupla pré-calculada e o espaço em
+branco entre tokens é testado por pertinência a um frozenset, sem chamadas de método
+por caractere. O código de palavras reservadas só é gerado quando há alguma.
+"""
+
+import os
+import sys
+import tempfile
+from src.scanner_framework.transition_table import TransitionTable
+import src.scanner_framework.config as config
+
+_HEADER = '''"""
+Analisador léxico {name!r}, gerado a partir de src.scanner_framework. Não edite:
+gere novamente a partir das regras.
+
+tokenize(text) devolve a lista de Tokens (lexeme, token_type, start, end) do texto,
+com token_type {error!r} para caracteres inesperados. Espaço em branco entre tokens
+é ignorado.
+"""
+
+from bisect import bisect_right
+from typing import List, NamedTuple
+
+
+class Token(NamedTuple):
+    lexeme: str
+    token_type: str
+    start: int
+    end: int
+
+
+'''
+
+_CLASS_OF = '''
+
+def _class_of(char):
+    """Classe de um caractere fora de CHAR_CLASSES (-1 se nenhuma), guardada em CHAR_CLASSES se houver espaço."""
+    code = ord(char)
+    i = bisect_right(RANGE_STARTS, code) - 1
+    class_id = RANGE_CLASSES[i] if i >= 0 and code <= RANGE_ENDS[i] else -1
+    if len(CHAR_CLASSES) < CHAR_CACHE_MAX_SIZE:
+        CHAR_CLASSES[char] = class_id
+    return class_id
+'''
+
+_TOKENIZE = '''
+
+def tokenize(text: str) -> List[Token]:
+    rows = ROWS
+    accept = ACCEPT
+    char_classes = CHAR_CLASSES
+    class_of = _class_of
+    whitespace = WHITESPACE
+    token_types = TOKEN_TYPES
+    error_type = ERROR_TOKEN_TYPE
+{reserved_bindings}    tokens = []
+    append = tokens.append
+    n = len(text)
+    pos = 0
+    while pos < n:
+        if text[pos] in whitespace:
+            pos += 1
+            continue
+
+        state = 0
+        last_type = -1
+        last_end = pos
+        scan = pos
+        while scan < n:
+            char = text[scan]
+            class_id = char_classes.get(char)
+            if class_id is None:
+                class_id = class_of(char)
+            if class_id < 0:
+                break
+            state = rows[state][class_id]
+            if state < 0:
+                break
+            scan += 1
+            token_type = accept[state]
+            if token_type >= 0:
+                last_type = token_type
+                last_end = scan
+
+        if last_type < 0:
+            append(Token(text[pos], error_type, pos, pos + 1))
+            pos += 1
+            continue
+
+        lexeme = text[pos:last_end]
+{reserved_lookup}        append(Token(lexeme, token_types[last_type], pos, last_end))
+        pos = last_end
+    return tokens
+'''
+
+_RESERVED_BINDINGS = '''    reserved_words = RESERVED_WORDS
+    reserved_hosts = RESERVED_HOSTS
+'''
+
+_RESERVED_LOOKUP = '''        if last_type in reserved_hosts:
+            last_type = reserved_words.get(lexeme, last_type)
+'''
+
+
+def _tuple_constant(name, values, per_line=16) -> str:
+    values = list(values)
+    if not values:
+        return f"{name} = ()\n"
+    lines = [", ".join(map(repr, values[i:i + per_line])) for i in range(0, len(values), per_line)]
+    return f"{name} = (\n" + "".join(f"    {line},\n" for line in lines) + ")\n"
+
+
+def generate_scanner_source(table: TransitionTable, name: str = config.LEXICAL_ANALYZER_DEFAULT_NAME) -> str:
+    """Código-fonte do módulo independente para a tabela dada."""
+    n_classes = table.n_classes
+    rows = [tuple(table.rows[state * n_classes:(state + 1) * n_classes]) for state in range(table.n_states)]
+    has_reserved_words = bool(table.reserved_words)
+    # Caracteres para os quais str.isspace() é verdadeiro, o mesmo teste feito por LexicalAnalyzer.process
+    whitespace = "".join(chr(code) for code in range(sys.maxunicode + 1) if chr(code).isspace())
+
+    parts = [_HEADER.format(name=name, error=config.ERROR_TOKEN_TYPE)]
+    parts.append(_tuple_constant("TOKEN_TYPES", table.token_types, per_line=8))
+    parts.append(f"ERROR_TOKEN_TYPE = {config.ERROR_TOKEN_TYPE!r}\n\n")
+    parts.append("# ROWS[state][class_id] -> próximo estado (-1 se não houver); o estado inicial é 0\n")
+    parts.append("ROWS = (\n" + "".join(f"    {row!r},\n" for row in rows) + ")\n")
+    parts.append("# ACCEPT[state] -> índice em TOKEN_TYPES (-1 se o estado não aceita)\n")
+    parts.append(_tuple_constant("ACCEPT", table.accept))
+    parts.append("\n# Classes de caracteres: intervalos disjuntos e ordenados de code points\n")
+    parts.append(_tuple_constant("RANGE_STARTS", table.range_starts))
+    parts.append(_tuple_constant("RANGE_ENDS", table.range_ends))
+    parts.append(_tuple_constant("RANGE_CLASSES", table.range_classes))
+    precomputed = {chr(code): table.char_classes[chr(code)]
+                   for code in range(TransitionTable.PRECOMPUTED_CODE_POINTS)}
+    parts.append(f"CHAR_CLASSES = {precomputed!r}\n")
+    parts.append(f"CHAR_CACHE_MAX_SIZE = {config.CHAR_CACHE_MAX_SIZE}  # CHAR_CLASSES não cresce além disto\n")
+    parts.append(f"WHITESPACE = frozenset({whitespace!r})\n")
+    if has_reserved_words:
+        parts.append(f"\nRESERVED_WORDS = {dict(sorted(table.reserved_words.items()))!r}\n")
+        parts.append(f"RESERVED_HOSTS = frozenset({sorted(table.reserved_hosts)!r})\n")
+    parts.append(_CLASS_OF)
+    parts.append(_TOKENIZE.format(
+        reserved_bindings=_RESERVED_BINDINGS if has_reserved_words else "",
+        reserved_lookup=_RESERVED_LOOKUP if has_reserved_words else ""))
+    return "".join(parts)
+
+
+def write_scanner_module(table: TransitionTable, path: str, name: str = config.LEXICAL_ANALYZER_DEFAULT_NAME):
+    """Escreve o módulo gerado em `path` de forma atômica (arquivo temporário + os.replace)."""
+    source = generate_scanner_source(table, name)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".scanner.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(source)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
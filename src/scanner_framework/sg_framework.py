@@ -1,7 +1,12 @@
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from src.scanner_framework.regex_processor import RegexProcessor
 from src.scanner_framework.lexical_analyzer import LexicalAnalyzer
-from typing import List, Tuple
+from src.scanner_framework.mapped_source import MappedSource, MappedTokens
+from src.scanner_framework.tokens import TokenBuffer
+from src.scanner_framework.parallel_lexing import tokenize_parallel
+from src.scanner_framework.dfa_cache import DfaCache
 import src.scanner_framework.config as config
 from src.scanner_framework.utils import parse_entries
 
@@ -9,12 +14,38 @@ from src.scanner_framework.utils import parse_entries
 Esta classe será a interface do framework de geração de analisadores léxicos.
 """
 
+def _compile_rule(job):
+    """
+    Compila uma regex em um processo trabalhador. job é (tipo, regex), com tipo DfaCache.DFA
+    (o DFA da regra) ou DfaCache.POSITIONS (os dados de posição usados pela construção
+    combinada). Retorna (resultado, None) ou (None, mensagem de erro).
+    """
+    kind, regex = job
+    try:
+        if kind == DfaCache.POSITIONS:
+            return RegexProcessor.rule_positions(regex), None
+        return RegexProcessor.regex_to_dfa(regex), None
+    except ValueError as e:
+        return None, str(e)
+
+
 class SgFramework:
     def __init__(self, application):
         self.application = application
         self.loaded_lexical_analyzers = []
         self.current_lexical_analyzer = None
         self.save_to_file = True
+        self.minimize_rule_dfas = False
+        self.linear_time_tokenization = False
+        self.combined_construction = True
+        self.reserved_word_table = True
+        self.lazy_dfa = False
+        self.use_dfa_cache = True
+        self.dfa_cache = DfaCache()
+        self.parallel_compilation = False
+        self.max_compile_workers = None  # None: one worker per CPU
+        self._compiled = {}  # (kind, regex) -> (result, error) for the lexer being generated, see _compile
+        self.rule_minimization_stats = {}
 
     def generate_lexical_analyzer(self, ers_filename, name=config.LEXICAL_ANALYZER_DEFAULT_NAME) -> str | None:
 
@@ -24,32 +55,133 @@ class SgFramework:
 
         lexical_analyzer = LexicalAnalyzer(name, self.application)
         parsed_regexs = parse_entries(ers_filename)
+        self.rule_minimization_stats = {}
+
+        # A construção combinada gera o DFA final a partir de uma única árvore com todas as
+        # regras; os DFAs por regra só são construídos se precisarem ser minimizados ou salvos,
+        # e então só depois que o analisador foi gerado com sucesso.
+        # O modo sob demanda sempre parte das regras (do autômato de posições).
+        combined = self.lazy_dfa or (self.combined_construction and not self.minimize_rule_dfas)
+        try:
+            if self.parallel_compilation:
+                self._compile_all(self._rules_to_precompile(parsed_regexs, combined))
+            reserved_words = self._find_reserved_words(parsed_regexs) if self.reserved_word_table else {}
+            self._add_rules(lexical_analyzer, parsed_regexs, reserved_words, combined)
+
+            self.application.log(f"Expressões regulares processadas com sucesso: {parsed_regexs}")
+
+            lexical_analyzer.linear_time = self.linear_time_tokenization
+            lexical_analyzer.lazy = self.lazy_dfa
+            lexical_analyzer.generate()
 
+            if lexical_analyzer.has_errors:
+                self.application.error("Erro ao gerar o analisador léxico.")
+                return
+
+            if combined and self.save_to_file:
+                for key, value in lexical_analyzer.rules.items():
+                    self._process_regular_expression(value, key)
+        finally:
+            self._compiled = {}
+
+        self.loaded_lexical_analyzers.append(lexical_analyzer)
+        self.current_lexical_analyzer = lexical_analyzer
+        self.application.log("Analisador léxico gerado com sucesso.\nAnalisadores léxicos carregados: " +", ".join([la.name for la in self.loaded_lexical_analyzers]))
+        
+        return lexical_analyzer.name
+
+    def _add_rules(self, lexical_analyzer, parsed_regexs, reserved_words, combined):
+        """Registra cada regra no analisador: como palavra reservada, regra (construção combinada) ou DFA."""
         for key, value in parsed_regexs.items():
             if not value:
                 self.application.error(f"Erro ao processar a expressão regular: {key}")
                 continue
+
+            if key in reserved_words:
+                lexical_analyzer.add_reserved_word(key, reserved_words[key])
+                continue
+
+            if combined:
+                try:
+                    positions = self._compile(DfaCache.POSITIONS, value)
+                except ValueError as e:
+                    self.application.error(f"Não foi possível processar a expressão regular: {e}")
+                    continue
+                lexical_analyzer.add_rule(key, value, positions)
+                continue
+
             dfa = self._process_regular_expression(value, key)
 
             if not dfa:
                 continue
             lexical_analyzer.add_dfa(key, dfa)
 
-        self.application.log(f"Expressões regulares processadas com sucesso: {parsed_regexs}")
+    def _rules_to_precompile(self, parsed_regexs, combined):
+        """
+        (tipo, regex) que a compilação paralela adianta: os dados de posição das regras usadas
+        pela construção combinada ou pela detecção das palavras reservadas, e os DFAs das
+        regras que precisam deles (fora da construção combinada, ou para salvá-los em arquivo).
+        Regras de palavra fixa ficam de fora: compilá-las é trivial, e as que viram palavras
+        reservadas nem chegam a ser compiladas.
+        """
+        jobs = []
+        for value in parsed_regexs.values():
+            if not value or RegexProcessor.literal_word(value) is not None:
+                continue
+            if combined or self.reserved_word_table:
+                jobs.append((DfaCache.POSITIONS, value))
+            if not combined or self.save_to_file:
+                jobs.append((DfaCache.DFA, value))
+        return jobs
 
-        lexical_analyzer.generate()
+    def _compile_all(self, jobs):
+        """
+        Compila os (tipo, regex) de jobs (ver _compile_rule) que ainda não foram compilados
+        para o analisador sendo gerado. Cada um é procurado uma única vez no cache de DFAs; os
+        que faltam são compilados em paralelo, em um ProcessPoolExecutor, se a compilação
+        paralela estiver ativada e houver ao menos dois, ou aqui mesmo. A compilação de cada
+        regex não depende de nenhum estado compartilhado, então o resultado é o mesmo da
+        compilação sequencial. Os resultados ficam em self._compiled.
+        """
+        pending = []
+        for job in dict.fromkeys(jobs):
+            if job in self._compiled:
+                continue
+            kind, regex = job
+            cached = None
+            if self.use_dfa_cache:
+                load = self.dfa_cache.load_positions if kind == DfaCache.POSITIONS else self.dfa_cache.load
+                cached = load(regex)
+            if cached is None:
+                pending.append(job)
+            else:
+                self._compiled[job] = (cached, None)
 
-        if lexical_analyzer.has_errors:
-            self.application.error("Erro ao gerar o analisador léxico.")
-            return
+        results = None
+        if self.parallel_compilation and len(pending) >= 2 and self.max_compile_workers != 1:
+            start = time.perf_counter()
+            try:
+                with ProcessPoolExecutor(max_workers=self.max_compile_workers) as executor:
+                    results = list(executor.map(_compile_rule, pending))
+            except Exception as e:
+                self.application.warning(f"Compilação paralela indisponível, compilando sequencialmente: {e}")
+            else:
+                self.application.log(
+                    f"{len(pending)} expressões regulares compiladas em paralelo em {(time.perf_counter() - start) * 1000:.2f} ms.")
+        if results is None:
+            results = [_compile_rule(job) for job in pending]
 
-        self.loaded_lexical_analyzers.append(lexical_analyzer)
-        self.current_lexical_analyzer = lexical_analyzer
-        self.application.log("Analisador léxico gerado com sucesso.\nAnalisadores léxicos carregados: " +", ".join([la.name for la in self.loaded_lexical_analyzers]))
-        
-        return lexical_analyzer.name
+        for (kind, regex), (result, error) in zip(pending, results):
+            self._compiled[(kind, regex)] = (result, error)
+            if error is not None or not self.use_dfa_cache:
+                continue
+            store = self.dfa_cache.store_positions if kind == DfaCache.POSITIONS else self.dfa_cache.store
+            try:
+                store(regex, result)
+            except OSError as e:
+                self.application.warning(f"Não foi possível gravar a compilação de {regex} no cache: {e}")
 
-    def analyze(self, text, lexical_analyzer_name=None) -> List[Tuple[str, str]]:
+    def _find_lexical_analyzer(self, lexical_analyzer_name=None):
         lexical_analyzer = None
 
         if lexical_analyzer_name is None:
@@ -64,40 +196,190 @@ class SgFramework:
         
         if lexical_analyzer is None:
             self.application.error("Nenhum analisador léxico carregado.")
-            return []
+
+        return lexical_analyzer
+
+    def analyze(self, text, lexical_analyzer_name=None) -> TokenBuffer:
+        lexical_analyzer = self._find_lexical_analyzer(lexical_analyzer_name)
+        if lexical_analyzer is None:
+            return TokenBuffer(text, [])
 
         try:
             result = lexical_analyzer.process(text)
-            self.application.log(f"Análise realizada com sucesso: {result}")
+            self.application.log(f"Análise realizada com sucesso: {len(result)} tokens.")
             return result
         except Exception as e:
             self.application.error(f"Erro ao analisar o texto: {e}")
 
-        return []
+        return TokenBuffer(text, [])
+
+    def analyze_parallel(self, text, lexical_analyzer_name=None, max_workers=None,
+                         chunk_size=config.PARALLEL_CHUNK_SIZE) -> TokenBuffer:
+        """
+        Igual a analyze(), mas divide o texto em pedaços de `chunk_size` caracteres
+        tokenizados em paralelo por até `max_workers` processos. O resultado é idêntico
+        ao da análise sequencial. Textos com um único pedaço são analisados sequencialmente.
+        """
+        lexical_analyzer = self._find_lexical_analyzer(lexical_analyzer_name)
+        if lexical_analyzer is None:
+            return TokenBuffer(text, [])
+
+        if len(text) <= chunk_size or max_workers == 1:
+            return self.analyze(text, lexical_analyzer.name)
+
+        if not lexical_analyzer._can_process():
+            return TokenBuffer(text, [])
+
+        try:
+            result = tokenize_parallel(lexical_analyzer, text, max_workers, chunk_size)
+            self.application.log(f"Análise paralela realizada com sucesso: {len(result)} tokens.")
+            return result
+        except Exception as e:
+            self.application.error(f"Erro ao analisar o texto: {e}")
+
+        return TokenBuffer(text, [])
+
+    def iter_tokens(self, source, lexical_analyzer_name=None, chunk_size=config.STREAM_CHUNK_SIZE):
+        """
+        Versão em streaming de analyze(): `source` pode ser uma string, um arquivo
+        aberto ou um iterável de pedaços de texto. Retorna um TokenStream (com peek)
+        ou None se nenhum analisador léxico estiver carregado.
+        """
+        lexical_analyzer = self._find_lexical_analyzer(lexical_analyzer_name)
+        if lexical_analyzer is None:
+            return None
+
+        return lexical_analyzer.iter_tokens(source, chunk_size)
+
+    def analyze_file(self, file_path, lexical_analyzer_name=None) -> MappedTokens | None:
+        """
+        Analisa um arquivo UTF-8 mapeando-o em memória (mmap), sem lê-lo para uma string.
+        O analisador e o arquivo são verificados e o arquivo é mapeado já na chamada;
+        retorna um MappedTokens (None em caso de erro) que gera MappedTokens com offsets
+        em bytes e mantém o arquivo mapeado até ser fechado:
+
+            with sg.analyze_file(path) as tokens:
+                for token in tokens: ...
+        """
+        lexical_analyzer = self._find_lexical_analyzer(lexical_analyzer_name)
+        if lexical_analyzer is None or not lexical_analyzer._can_process():
+            return None
+
+        try:
+            source = MappedSource(file_path)
+        except OSError as e:
+            self.application.error(f"Erro ao abrir o arquivo '{file_path}': {e}")
+            return None
+
+        return MappedTokens(source, lexical_analyzer.iter_mapped(source))
+
+    def _find_reserved_words(self, parsed_regexs):
+        """
+        Separa as palavras reservadas: regras que reconhecem uma única palavra fixa
+        (como IF: if) e cuja palavra também é reconhecida por alguma regra que não é
+        uma palavra fixa (como ID). Essas regras ficam fora do autômato e são
+        resolvidas pela tabela de palavras reservadas. Retorna {tipo de token: palavra}.
+        As palavras são testadas no autômato de posições combinado das demais regras,
+        sem construir o DFA de cada uma.
+        """
+        words = {}
+        host_rules = {}
+        for key, value in parsed_regexs.items():
+            if not value:
+                continue
+            word = RegexProcessor.literal_word(value)
+            if word is not None:
+                words[key] = word
+            else:
+                host_rules[key] = value
+        if not words:
+            return {}
+
+        host_positions = {}
+        for key, value in host_rules.items():
+            try:
+                host_positions[key] = self._compile(DfaCache.POSITIONS, value)
+            except ValueError:
+                continue  # O erro é reportado quando a própria regra é processada
+        hosts, _ = RegexProcessor.rules_to_position_automaton(
+            {key: host_rules[key] for key in host_positions}, host_positions)
+        if hosts is None:
+            return {}
+
+        reserved_words = {key: word for key, word in words.items() if hosts.accepting_token_types(word)}
+        if reserved_words:
+            self.application.log(f"Palavras reservadas fora do autômato: {', '.join(reserved_words)}")
+        return reserved_words
+
+    def _compile(self, kind, regex):
+        """
+        DFA (kind DfaCache.DFA) ou dados de posição (DfaCache.POSITIONS) de uma expressão
+        regular, compilados no máximo uma vez por analisador gerado e carregados do cache de
+        DFAs quando a mesma regex já foi compilada (por qualquer analisador, nesta ou em
+        outra execução). Lança ValueError se a regex for inválida.
+        """
+        self._compile_all([(kind, regex)])
+        result, error = self._compiled[(kind, regex)]
+        if error is not None:
+            raise ValueError(error)
+        return result
 
     def _process_regular_expression(self, regex, er_name="dfa"):
             try:
-                dfa = RegexProcessor.regex_to_dfa(regex)
+                dfa = self._compile(DfaCache.DFA, regex)
             except ValueError as e:
                 self.application.error(f"Não foi possível processar a expressão regular: {e}")
                 return
 
             self.application.log(f"Expressão regular {regex} convertida para autômato com sucesso.")
 
+            if self.minimize_rule_dfas:
+                dfa = self._minimize_rule_dfa(dfa, er_name)
+
             if self.save_to_file:
                 output_dir = "generated_afds"
                 os.makedirs(output_dir, exist_ok=True)
                 file_name = f"{er_name}.txt"
                 file_path = os.path.join(output_dir, file_name)
+                content = dfa.to_file_format()
                 try:
-                    with open(file_path, 'w') as f:
-                        f.write(dfa.to_file_format())
+                    if self._read_text(file_path) != content:
+                        with open(file_path, 'w') as f:
+                            f.write(content)
                     self.application.log(f"DFA para {regex} salvo no arquivo: {file_name}")
                 except Exception as e:
                     self.application.error(f"Erro ao salvar DFA no arquivo: {e}")
 
             return dfa
 
+    @staticmethod
+    def _read_text(file_path):
+        try:
+            with open(file_path, 'r') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _minimize_rule_dfa(self, dfa, er_name):
+        """
+        Minimiza o DFA de uma regra antes da união por épsilon e registra as estatísticas
+        (estados antes/depois e tempo gasto) em self.rule_minimization_stats[er_name].
+        """
+        start = time.perf_counter()
+        minimized_dfa, _ = dfa.minimize()
+        elapsed = time.perf_counter() - start
+
+        stats = {
+            'states_before': len(dfa.states),
+            'states_after': len(minimized_dfa.states),
+            'seconds': elapsed,
+        }
+        self.rule_minimization_stats[er_name] = stats
+        self.application.log(
+            f"DFA de '{er_name}' minimizado: {stats['states_before']} -> {stats['states_after']} estados "
+            f"em {elapsed * 1000:.2f} ms.")
+        return minimized_dfa
+
     def get_current_lexical_analyzer(self):
         return self.current_lexical_analyzer.name if self.current_lexical_analyzer else None
     
@@ -125,6 +407,39 @@ class SgFramework:
         self.application.error(f"Analisador léxico '{analyzer_name}' não encontrado.")
         return False
     
+    def save_lexical_analyzer(self, file_path, analyzer_name=None) -> bool:
+        """Salva o analisador léxico (o atual, se nenhum nome for dado) em uma imagem binária."""
+        lexical_analyzer = self._find_lexical_analyzer(analyzer_name)
+        if lexical_analyzer is None:
+            return False
+        return lexical_analyzer.save(file_path)
+
+    def export_lexical_analyzer_module(self, file_path, analyzer_name=None) -> bool:
+        """Gera um módulo Python independente (sem src.scanner_framework) com o analisador léxico."""
+        lexical_analyzer = self._find_lexical_analyzer(analyzer_name)
+        if lexical_analyzer is None:
+            return False
+        return lexical_analyzer.export_module(file_path)
+
+    def load_lexical_analyzer(self, file_path, name=None) -> str | None:
+        """
+        Carrega um analisador léxico salvo com save_lexical_analyzer (mapeado em memória,
+        sem reconstruir o DFA) e o torna o atual. Retorna o nome do analisador.
+        """
+        lexical_analyzer = LexicalAnalyzer.load(file_path, self.application, name)
+        if lexical_analyzer is None:
+            return None
+
+        if any(la.name == lexical_analyzer.name for la in self.loaded_lexical_analyzers):
+            self.application.error(f"Scanner com o nome '{lexical_analyzer.name}' já existe. Escolha outro nome.")
+            return None
+
+        lexical_analyzer.linear_time = self.linear_time_tokenization
+        self.loaded_lexical_analyzers.append(lexical_analyzer)
+        self.current_lexical_analyzer = lexical_analyzer
+        self.application.log(f"Analisador léxico '{lexical_analyzer.name}' carregado de: {file_path}")
+        return lexical_analyzer.name
+
     def get_lexical_analyzer_info(self, analyzer_name: str):
         for la in self.loaded_lexical_analyzers:
             if la.name == analyzer_name:
@@ -138,3 +453,74 @@ class SgFramework:
             self.application.log("Configuração de salvar DFAs em arquivo ativada.")
         else:
             self.application.log("Configuração de salvar DFAs em arquivo desativada.")
+
+    def set_combined_construction(self, combined: bool):
+        """
+        Ativa/desativa a construção do DFA do analisador a partir de uma única árvore
+        sintática com todas as regras (sem a união por épsilon e a segunda determinização).
+        """
+        self.combined_construction = combined
+        if combined:
+            self.application.log("Construção combinada do DFA léxico ativada.")
+        else:
+            self.application.log("Construção combinada do DFA léxico desativada.")
+
+    def set_reserved_word_table(self, enabled: bool):
+        """
+        Ativa/desativa a tabela de palavras reservadas: regras de palavra fixa reconhecidas
+        por outra regra (como ID) deixam de gerar estados no autômato.
+        """
+        self.reserved_word_table = enabled
+        if enabled:
+            self.application.log("Tabela de palavras reservadas ativada.")
+        else:
+            self.application.log("Tabela de palavras reservadas desativada.")
+
+    def set_parallel_compilation(self, parallel: bool, max_workers=None):
+        """
+        Ativa/desativa a compilação das regras em paralelo (um processo por CPU, ou
+        max_workers processos) ao gerar analisadores léxicos.
+        """
+        self.parallel_compilation = parallel
+        self.max_compile_workers = max_workers
+        if parallel:
+            self.application.log("Compilação paralela das expressões regulares ativada.")
+        else:
+            self.application.log("Compilação paralela das expressões regulares desativada.")
+
+    def set_use_dfa_cache(self, use_cache: bool):
+        """Ativa/desativa o cache em disco dos DFAs compilados por regex (ver DfaCache)."""
+        self.use_dfa_cache = use_cache
+        if use_cache:
+            self.application.log(f"Cache de DFAs ativado em '{self.dfa_cache.directory}'.")
+        else:
+            self.application.log("Cache de DFAs desativado.")
+
+    def set_lazy_dfa(self, lazy: bool):
+        """
+        Ativa/desativa o modo de DFA sob demanda para os próximos analisadores gerados:
+        os estados são construídos durante a análise, em um cache de tamanho limitado
+        (ver LexicalAnalyzer.lazy_dfa_stats).
+        """
+        self.lazy_dfa = lazy
+        if lazy:
+            self.application.log("Modo de DFA sob demanda ativado.")
+        else:
+            self.application.log("Modo de DFA sob demanda desativado.")
+
+    def set_linear_time_tokenization(self, linear_time: bool):
+        """Ativa/desativa o modo de tokenização em tempo linear em todos os analisadores carregados."""
+        self.linear_time_tokenization = linear_time
+        for la in self.loaded_lexical_analyzers:
+            la.linear_time = linear_time
+        if linear_time:
+            self.application.log("Tokenização em tempo linear ativada.")
+        else:
+            self.application.log("Tokenização em tempo linear desativada.")
+
+    def set_minimize_rule_dfas(self, minimize: bool):
+        self.minimize_rule_dfas = minimize
+        if minimize:
+            self.application.log("Minimização dos DFAs de cada regra ativada.")
+        else:
+            self.application.log("Minimização dos DFAs de cada regra desativada.")
@@ -0,0 +1,41 @@
+from collections import deque
+from typing import Iterator, Optional
+from src.scanner_framework.tokens import Token
+
+
+class TokenStream:
+    """
+    Iterador de tokens com um pequeno buffer de lookahead.
+
+    Envolve um gerador de tokens (ver LexicalAnalyzer.iter_tokens) e permite
+    inspecionar até `lookahead` tokens à frente sem consumi-los.
+    """
+
+    def __init__(self, tokens: Iterator[Token], lookahead: int):
+        if lookahead < 1:
+            raise ValueError("O lookahead deve ser de pelo menos 1 token.")
+        self._tokens = tokens
+        self._buffer = deque()
+        self.lookahead = lookahead
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> Token:
+        if self._buffer:
+            return self._buffer.popleft()
+        return next(self._tokens)
+
+    def peek(self, k: int = 0) -> Optional[Token]:
+        """
+        Retorna o k-ésimo próximo token (0 = o próximo) sem consumi-lo,
+        ou None se a entrada terminar antes dele.
+        """
+        if not 0 <= k < self.lookahead:
+            raise ValueError(f"Lookahead fora do limite: {k} (máximo {self.lookahead - 1}).")
+        while len(self._buffer) <= k:
+            token = next(self._tokens, None)
+            if token is None:
+                return None
+            self._buffer.append(token)
+        return self._buffer[k]
@@ -0,0 +1,89 @@
+from array import array
+from typing import Iterator, NamedTuple, Tuple
+
+
+class Token(NamedTuple):
+    """
+    Token produzido pelo analisador léxico.
+    start/end são as posições [start, end) do lexema na entrada.
+    """
+    lexeme: str
+    token_type: str
+    start: int
+    end: int
+
+
+class TokenBuffer:
+    """
+    Sequência compacta de tokens (estrutura de arrays).
+
+    Guarda apenas o id do tipo de cada token e o intervalo [start, end) do lexema
+    em arrays; os lexemas são extraídos de `source` sob demanda. Indexar ou iterar
+    devolve objetos Token, então o buffer pode substituir uma lista de tokens.
+
+    source: a entrada analisada; qualquer objeto que aceite source[start:end] e
+            devolva o lexema (str, MappedSource, ...).
+    token_types: nomes dos tipos de token; type_ids indexa esta lista.
+    """
+
+    def __init__(self, source, token_types):
+        self.source = source
+        self.token_types = list(token_types)
+        self.type_ids = array('i')
+        self.starts = array('q')
+        self.ends = array('q')
+
+    def append(self, type_id: int, start: int, end: int):
+        self.type_ids.append(type_id)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def __len__(self) -> int:
+        return len(self.type_ids)
+
+    def type_name(self, i: int) -> str:
+        return self.token_types[self.type_ids[i]]
+
+    def lexeme(self, i: int) -> str:
+        return self.source[self.starts[i]:self.ends[i]]
+
+    def span(self, i: int) -> Tuple[int, int]:
+        return self.starts[i], self.ends[i]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        start, end = self.starts[i], self.ends[i]
+        return Token(self.source[start:end], self.token_types[self.type_ids[i]], start, end)
+
+    def __iter__(self) -> Iterator[Token]:
+        source = self.source
+        token_types = self.token_types
+        for type_id, start, end in zip(self.type_ids, self.starts, self.ends):
+            yield Token(source[start:end], token_types[type_id], start, end)
+
+    def __eq__(self, other):
+        if isinstance(other, (TokenBuffer, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def to_numpy(self):
+        """
+        Exporta os tokens como um array estruturado do NumPy com os campos
+        'type' (id em token_types), 'start' e 'end'. Requer o pacote numpy.
+        """
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise ImportError("TokenBuffer.to_numpy requer o pacote 'numpy'.") from e
+
+        result = np.empty(len(self), dtype=[('type', np.int32), ('start', np.int64), ('end', np.int64)])
+        result['type'] = np.frombuffer(self.type_ids, dtype=f'i{self.type_ids.itemsize}')
+        result['start'] = np.frombuffer(self.starts, dtype=np.int64)
+        result['end'] = np.frombuffer(self.ends, dtype=np.int64)
+        return result
+
+    def __repr__(self):
+        return repr(list(self))
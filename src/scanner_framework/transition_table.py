@@ -0,0 +1,447 @@
+from array import array
+from bisect import bisect_right
+from typing import Dict, List, Tuple
+from src.scanner_framework.mapped_source import decode_char_at
+from src.scanner_framework.reserved_words import ReservedWordLookup
+import src.scanner_framework.config as config
+
+
+class TransitionTable(ReservedWordLookup):
+    """
+    Forma compilada do DFA final do analisador léxico.
+
+    Os estados são renumerados para inteiros densos (o estado inicial é sempre 0),
+    cada caractere é mapeado para o id da sua classe de equivalência, e as transições
+    ficam em uma única tabela plana: rows[state * n_classes + class_id] -> próximo
+    estado, ou DEAD_STATE quando não há transição.
+
+    As classes são dadas por intervalos disjuntos de code points (range_starts,
+    range_ends, range_classes), consultados por busca binária. char_classes é um
+    cache caractere -> classe (NO_CLASS se o caractere não pertence a nenhuma),
+    pré-preenchido para os code points abaixo de PRECOMPUTED_CODE_POINTS e limitado a
+    config.CHAR_CACHE_MAX_SIZE caracteres: os demais são buscados a cada ocorrência.
+
+    Palavras reservadas ficam fora do DFA (ver ReservedWordLookup).
+    """
+    DEAD_STATE = -1
+    NO_TOKEN = -1
+    NO_CLASS = -1
+    PRECOMPUTED_CODE_POINTS = 0x100
+
+    def __init__(self, class_ranges: List[Tuple[int, int, int]], n_classes: int, rows: array, accept: array, token_types: List[str]):
+        """
+        class_ranges: lista ordenada e disjunta de (lo, hi, class_id).
+        """
+        self._init_tables(array('i', [lo for lo, _, _ in class_ranges]),
+                          array('i', [hi for _, hi, _ in class_ranges]),
+                          array('i', [class_id for _, _, class_id in class_ranges]),
+                          n_classes, rows, accept, token_types)
+
+    @classmethod
+    def from_arrays(cls, range_starts, range_ends, range_classes, n_classes, rows, accept, token_types) -> 'TransitionTable':
+        """
+        Cria a tabela diretamente a partir de sequências de inteiros já prontas (arrays ou
+        memoryviews sobre um mmap, ver lexer_image), sem copiá-las.
+        """
+        table = cls.__new__(cls)
+        table._init_tables(range_starts, range_ends, range_classes, n_classes, rows, accept, token_types)
+        return table
+
+    def _init_tables(self, range_starts, range_ends, range_classes, n_classes, rows, accept, token_types):
+        self.range_starts = range_starts
+        self.range_ends = range_ends
+        self.range_classes = range_classes
+        self.n_classes = n_classes
+        self.char_classes: Dict[str, int] = {}
+        for code in range(self.PRECOMPUTED_CODE_POINTS):
+            self.class_of(chr(code))
+        # Classes indexed by byte value, for scanning ASCII directly from bytes
+        self.ascii_classes = [self.char_classes[chr(b)] for b in range(0x80)]
+        self.rows = rows
+        self.accept = accept
+        self.token_types = token_types
+        self.n_states = len(accept)
+        self.start_state = 0
+        self.image = None  # mmap de onde as tabelas foram carregadas, se houver
+        ReservedWordLookup.__init__(self)
+
+    def __getstate__(self):
+        # Tabelas carregadas de uma imagem são memoryviews sobre um mmap: copia para arrays
+        state = self.__dict__.copy()
+        for name in ('range_starts', 'range_ends', 'range_classes', 'rows', 'accept'):
+            if isinstance(state[name], memoryview):
+                state[name] = array('i', state[name])
+        state['image'] = None
+        return state
+
+    def class_of(self, char: str) -> int:
+        """Classe de um caractere (NO_CLASS se nenhuma), guardada em char_classes se houver espaço."""
+        code = ord(char)
+        i = bisect_right(self.range_starts, code) - 1
+        if i >= 0 and code <= self.range_ends[i]:
+            class_id = self.range_classes[i]
+        else:
+            class_id = self.NO_CLASS
+        if len(self.char_classes) < config.CHAR_CACHE_MAX_SIZE:
+            self.char_classes[char] = class_id
+        return class_id
+
+    @staticmethod
+    def from_dfa(dfa, accept_state_to_token_type_map, token_types, char_classes=None) -> 'TransitionTable':
+        """
+        Compila um DeterministicFiniteAutomata em uma TransitionTable.
+
+        accept_state_to_token_type_map: mapa estado de aceitação -> tipo de token.
+        token_types: lista ordenada de tipos de token; o índice na lista é o id usado em accept.
+        char_classes: mapa intervalo (lo, hi) -> id de classe quando o alfabeto do DFA já é
+                      formado por ids de classe. Se omitido, o alfabeto do DFA deve ser de
+                      intervalos disjuntos e cada um é sua própria classe.
+        """
+        if char_classes is None:
+            char_classes = {symbol: i for i, symbol in enumerate(sorted(dfa.alphabet))}
+            class_of_symbol = char_classes
+        else:
+            class_of_symbol = {class_id: class_id for class_id in dfa.alphabet}
+        n_classes = max(class_of_symbol.values(), default=-1) + 1
+        class_ranges = [(lo, hi, class_id) for (lo, hi), class_id in sorted(char_classes.items())]
+
+        outgoing = {}
+        for (state, symbol), target in dfa.transitions.items():
+            outgoing.setdefault(state, []).append((class_of_symbol[symbol], target))
+
+        # Renumeração em largura a partir do estado inicial
+        state_ids = {dfa.start_state: 0}
+        order = [dfa.start_state]
+        i = 0
+        while i < len(order):
+            for _, target in sorted(outgoing.get(order[i], []), key=lambda move: move[0]):
+                if target not in state_ids:
+                    state_ids[target] = len(order)
+                    order.append(target)
+            i += 1
+
+        token_ids = {token_type: i for i, token_type in enumerate(token_types)}
+        rows = array('i', [TransitionTable.DEAD_STATE]) * (len(order) * n_classes)
+        accept = array('i', [TransitionTable.NO_TOKEN]) * len(order)
+
+        for state, state_id in state_ids.items():
+            base = state_id * n_classes
+            for class_id, target in outgoing.get(state, []):
+                rows[base + class_id] = state_ids[target]
+            token_type = accept_state_to_token_type_map.get(state)
+            if token_type is not None:
+                accept[state_id] = token_ids[token_type]
+
+        return TransitionTable(class_ranges, n_classes, rows, accept, list(token_types))
+
+    def longest_match(self, input_stream, current_pos, input_len):
+        """
+        Maximal Munch: walks the transition table from current_pos and finds the
+        longest lexeme accepted by the DFA. Only positions are tracked; the caller
+        slices the lexeme once.
+        Returns (token_type_id, position_after_lexeme, reached_end), where the first two
+        are None when nothing was accepted and reached_end tells whether the scan
+        stopped only because input_len was reached (the match could still grow).
+        """
+        # Local bindings for the scan loop
+        rows = self.rows
+        accept = self.accept
+        n_classes = self.n_classes
+        char_classes = self.char_classes
+        class_of = self.class_of
+        DEAD_STATE = self.DEAD_STATE
+        NO_TOKEN = self.NO_TOKEN
+
+        current_dfa_state = self.start_state
+        last_token_type_id = None
+        last_end = None
+
+        reached_end = False
+        scan_pos = current_pos
+        while scan_pos < input_len:
+            char = input_stream[scan_pos]
+            class_id = char_classes.get(char)
+            if class_id is None:
+                class_id = class_of(char)
+            if class_id < 0:
+                break  # Character outside the alphabet: no transition
+
+            current_dfa_state = rows[current_dfa_state * n_classes + class_id]
+            if current_dfa_state == DEAD_STATE:
+                break  # End of current scan for maximal munch
+
+            scan_pos += 1
+            token_type_id = accept[current_dfa_state]
+            if token_type_id != NO_TOKEN:
+                last_token_type_id = token_type_id
+                last_end = scan_pos
+        else:
+            reached_end = True
+
+        if last_token_type_id in self.reserved_hosts:
+            last_token_type_id = self.reserved_words.get(input_stream[current_pos:last_end], last_token_type_id)
+        return last_token_type_id, last_end, reached_end
+
+    def advance(self, state, input_stream, scan_pos, input_len):
+        """
+        Resumable scan for input that arrives in pieces (see LexicalAnalyzer.iter_tokens):
+        runs the DFA from `state` (None: the start state) over input_stream[scan_pos:input_len].
+        Returns (state, last_token_type_id, last_end): state is None when the scan stopped
+        before input_len (the match can no longer grow), or the state to pass back with the
+        next piece of input. last_end is a position in this piece (None if no accept state
+        was reached in it). Reserved words are not reclassified (see reserved_type).
+        """
+        rows = self.rows
+        accept = self.accept
+        n_classes = self.n_classes
+        char_classes = self.char_classes
+        class_of = self.class_of
+        DEAD_STATE = self.DEAD_STATE
+        NO_TOKEN = self.NO_TOKEN
+
+        current_dfa_state = self.start_state if state is None else state
+        last_token_type_id = None
+        last_end = None
+
+        while scan_pos < input_len:
+            char = input_stream[scan_pos]
+            class_id = char_classes.get(char)
+            if class_id is None:
+                class_id = class_of(char)
+            if class_id < 0:
+                return None, last_token_type_id, last_end
+
+            current_dfa_state = rows[current_dfa_state * n_classes + class_id]
+            if current_dfa_state == DEAD_STATE:
+                return None, last_token_type_id, last_end
+
+            scan_pos += 1
+            token_type_id = accept[current_dfa_state]
+            if token_type_id != NO_TOKEN:
+                last_token_type_id = token_type_id
+                last_end = scan_pos
+
+        return current_dfa_state, last_token_type_id, last_end
+
+    def advance_memoized(self, state, input_stream, scan_pos, input_len, failed, visited, offset):
+        """
+        Same as advance, but with the memo of longest_match_memoized, for input that arrives
+        in pieces. `failed` holds (state, offset + position) pairs with absolute positions
+        (the input length is not known in advance); `visited` holds the pairs visited since
+        the last accept of the current token and must be passed again with each piece of
+        the same token. When the scan stops, they are moved to `failed`; at the end of the
+        input the caller moves the remaining ones.
+        """
+        rows = self.rows
+        accept = self.accept
+        n_classes = self.n_classes
+        char_classes = self.char_classes
+        class_of = self.class_of
+        DEAD_STATE = self.DEAD_STATE
+        NO_TOKEN = self.NO_TOKEN
+
+        if state is None:
+            current_dfa_state = self.start_state
+            visited.clear()
+        else:
+            current_dfa_state = state
+        last_token_type_id = None
+        last_end = None
+
+        while scan_pos < input_len:
+            char = input_stream[scan_pos]
+            class_id = char_classes.get(char)
+            if class_id is None:
+                class_id = class_of(char)
+            if class_id < 0:
+                break
+
+            current_dfa_state = rows[current_dfa_state * n_classes + class_id]
+            if current_dfa_state == DEAD_STATE:
+                break
+
+            scan_pos += 1
+            key = (current_dfa_state, offset + scan_pos)
+            if key in failed:
+                break
+
+            token_type_id = accept[current_dfa_state]
+            if token_type_id != NO_TOKEN:
+                last_token_type_id = token_type_id
+                last_end = scan_pos
+                visited.clear()
+            else:
+                visited.append(key)
+        else:
+            return current_dfa_state, last_token_type_id, last_end
+
+        failed.update(visited)
+        visited.clear()
+        return None, last_token_type_id, last_end
+
+    def longest_match_memoized(self, input_stream, current_pos, input_len, failed):
+        """
+        Same as longest_match, but guarantees linear total time over a whole input
+        (Reps, "Maximal-Munch Tokenization in Linear Time").
+        `failed` holds (state, position) pairs, encoded as state * (input_len + 1) + position,
+        from which no accept state can be reached; it is shared by every call for one input.
+        Pairs visited after the last accept of this scan are added to it, and reaching a
+        known pair stops the scan early, so no (state, position) is explored twice in vain.
+        Returns (token_type_id, position_after_lexeme, reached_end), like longest_match.
+        """
+        rows = self.rows
+        accept = self.accept
+        n_classes = self.n_classes
+        char_classes = self.char_classes
+        class_of = self.class_of
+        DEAD_STATE = self.DEAD_STATE
+        NO_TOKEN = self.NO_TOKEN
+        stride = input_len + 1
+
+        current_dfa_state = self.start_state
+        last_token_type_id = None
+        last_end = None
+        visited_since_accept = []
+
+        reached_end = False
+        scan_pos = current_pos
+        while scan_pos < input_len:
+            char = input_stream[scan_pos]
+            class_id = char_classes.get(char)
+            if class_id is None:
+                class_id = class_of(char)
+            if class_id < 0:
+                break
+
+            current_dfa_state = rows[current_dfa_state * n_classes + class_id]
+            if current_dfa_state == DEAD_STATE:
+                break
+
+            scan_pos += 1
+            key = current_dfa_state * stride + scan_pos
+            if key in failed:
+                break
+
+            token_type_id = accept[current_dfa_state]
+            if token_type_id != NO_TOKEN:
+                last_token_type_id = token_type_id
+                last_end = scan_pos
+                visited_since_accept.clear()
+            else:
+                visited_since_accept.append(key)
+        else:
+            reached_end = True
+
+        failed.update(visited_since_accept)
+        if last_token_type_id in self.reserved_hosts:
+            last_token_type_id = self.reserved_words.get(input_stream[current_pos:last_end], last_token_type_id)
+        return last_token_type_id, last_end, reached_end
+
+    def longest_match_bytes(self, buffer, current_pos, input_len):
+        """
+        Same as longest_match, but walks UTF-8 bytes in place (e.g. an mmap).
+        ASCII bytes are classified directly; other characters are decoded one at a time.
+        Returns (token_type_id, position_after_lexeme), or (None, None).
+        """
+        rows = self.rows
+        accept = self.accept
+        n_classes = self.n_classes
+        char_classes = self.char_classes
+        class_of = self.class_of
+        ascii_classes = self.ascii_classes
+        DEAD_STATE = self.DEAD_STATE
+        NO_TOKEN = self.NO_TOKEN
+
+        current_dfa_state = self.start_state
+        last_accepted = (None, None)
+
+        scan_pos = current_pos
+        while scan_pos < input_len:
+            byte = buffer[scan_pos]
+            if byte < 0x80:
+                class_id = ascii_classes[byte]
+                width = 1
+            else:
+                char, width = decode_char_at(buffer, scan_pos, input_len)
+                if char is None:
+                    break  # Invalid UTF-8
+                class_id = char_classes.get(char)
+                if class_id is None:
+                    class_id = class_of(char)
+            if class_id < 0:
+                break
+
+            next_dfa_state = rows[current_dfa_state * n_classes + class_id]
+            if next_dfa_state == DEAD_STATE:
+                break
+
+            current_dfa_state = next_dfa_state
+            scan_pos += width
+            token_type_id = accept[current_dfa_state]
+            if token_type_id != NO_TOKEN:
+                last_accepted = (token_type_id, scan_pos)
+
+        token_type_id, last_end = last_accepted
+        if token_type_id in self.reserved_hosts:
+            token_type_id = self.reserved_words_bytes.get(bytes(buffer[current_pos:last_end]), token_type_id)
+            return token_type_id, last_end
+        return last_accepted
+
+    def longest_match_bytes_memoized(self, buffer, current_pos, input_len, failed):
+        """
+        Same as longest_match_bytes, with the memo of longest_match_memoized (the
+        positions in `failed` are byte offsets). Returns (token_type_id, position_after_lexeme).
+        """
+        rows = self.rows
+        accept = self.accept
+        n_classes = self.n_classes
+        char_classes = self.char_classes
+        class_of = self.class_of
+        ascii_classes = self.ascii_classes
+        DEAD_STATE = self.DEAD_STATE
+        NO_TOKEN = self.NO_TOKEN
+        stride = input_len + 1
+
+        current_dfa_state = self.start_state
+        token_type_id, last_end = None, None
+        visited_since_accept = []
+
+        scan_pos = current_pos
+        while scan_pos < input_len:
+            byte = buffer[scan_pos]
+            if byte < 0x80:
+                class_id = ascii_classes[byte]
+                width = 1
+            else:
+                char, width = decode_char_at(buffer, scan_pos, input_len)
+                if char is None:
+                    break  # Invalid UTF-8
+                class_id = char_classes.get(char)
+                if class_id is None:
+                    class_id = class_of(char)
+            if class_id < 0:
+                break
+
+            current_dfa_state = rows[current_dfa_state * n_classes + class_id]
+            if current_dfa_state == DEAD_STATE:
+                break
+
+            scan_pos += width
+            key = current_dfa_state * stride + scan_pos
+            if key in failed:
+                break
+
+            if accept[current_dfa_state] != NO_TOKEN:
+                token_type_id, last_end = accept[current_dfa_state], scan_pos
+                visited_since_accept.clear()
+            else:
+                visited_since_accept.append(key)
+
+        failed.update(visited_since_accept)
+        if token_type_id in self.reserved_hosts:
+            token_type_id = self.reserved_words_bytes.get(bytes(buffer[current_pos:last_end]), token_type_id)
+        return token_type_id, last_end
+
+    def __repr__(self):
+        return (f"<TransitionTable com {self.n_states} estados, {self.n_classes} classes de caracteres, "
+                f"{len(self.token_types)} tipos de token>")
@@ -1,5 +1,7 @@
+import importlib.util
 import os
 import sys
+import tempfile
 from typing import List, Tuple
 
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -16,6 +18,15 @@ try:
 
     from src.parser_framework.pg_framework import PgFramework
     from src.scanner_framework.sg_framework import SgFramework
+    from src.scanner_framework.regex_processor import RegexProcessor
+    from src.scanner_framework.tokens import TokenBuffer
+    from src.scanner_framework.automatas.deterministic_automata import DeterministicFiniteAutomata
+    from src.parser_framework.slr_parser import SLRParser
+    from src.parser_framework.parse_table import ParseTable
+    import src.parser_framework.config as parser_config
+    import src.scanner_framework.config as scanner_config
+    from src.parser_framework.parser_generator import ParserGenerator
+    from src.scanner_framework.dfa_cache import DfaCache
 except ImportError as e:
     print(f"Error importing frameworks: {e}")
     print("Please ensure your project structure is:")
@@ -62,6 +73,637 @@ class MockApplication:
             print(f"WARNING: {message}")
 
 
+class QuietApplication(MockApplication):
+    """Mock application that keeps log messages out of the console (errors and warnings are still printed)."""
+    def log(self, message: str, level: str = "NORMAL"):
+        pass
+
+
+def write_temp_file(content: str, suffix: str = ".txt") -> str:
+    """Writes content to a temporary file and returns its path (the caller removes it)."""
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return path
+
+
+def run_large_rule_count_test(rule_count: int = 1200):
+    """
+    The combined construction must handle lexers with many rules: the rule trees are
+    joined under a single UNION node and annotated without recursion.
+    """
+    test_case_name = f"large_rule_count ({rule_count} rules)"
+    print(f"\n--- Running test case: '{test_case_name}' ---")
+
+    regex_file = write_temp_file("".join(f"T{i}: x{i}y*\n" for i in range(rule_count)))
+    try:
+        scanner_framework = SgFramework(QuietApplication())
+        scanner_framework.set_save_to_file(False)
+        scanner_framework.set_use_dfa_cache(False)
+        if scanner_framework.generate_lexical_analyzer(regex_file) is None:
+            print(f"\nTest case '{test_case_name}' FAILED: the lexical analyzer was not generated.")
+            return
+    finally:
+        os.remove(regex_file)
+
+    last = rule_count - 1
+    tokens = [(t.token_type, t.lexeme) for t in scanner_framework.analyze(f"x0 x7yy x{last}yyy")]
+    expected = [("T0", "x0"), ("T7", "x7yy"), (f"T{last}", f"x{last}yyy")]
+    if tokens != expected:
+        print(f"\nTest case '{test_case_name}' FAILED: got {tokens}, expected {expected}.")
+        return
+    print(f"\nTest case '{test_case_name}' PASSED: all rules are recognized.")
+
+
+def run_char_class_escape_test():
+    """Escaped members of a character class are literal characters, not ranges or negation."""
+    test_case_name = "char_class_escapes"
+    print(f"\n--- Running test case: '{test_case_name}' ---")
+
+    cases = {
+        r"[a\-c]": "ac-",
+        r"[\^a]": "a^",
+        r"[a-]": "a-",
+        r"[^a]": "bc-^",
+    }
+    for regex, expected in cases.items():
+        dfa = RegexProcessor.regex_to_dfa(regex)
+        accepted = "".join(c for c in "abc-^" if dfa.process(c))
+        if accepted != expected:
+            print(f"\nTest case '{test_case_name}' FAILED: {regex} accepts '{accepted}', expected '{expected}'.")
+            return
+    print(f"\nTest case '{test_case_name}' PASSED: all character classes match.")
+
+
+def build_scanner(regex_file: str, **settings) -> SgFramework:
+    """
+    SgFramework with a lexical analyzer generated from regex_file. DFA files are not
+    written and the DFA cache is off unless overridden by settings (attribute -> value).
+    """
+    scanner_framework = SgFramework(QuietApplication())
+    scanner_framework.save_to_file = False
+    scanner_framework.use_dfa_cache = False
+    for attribute, value in settings.items():
+        setattr(scanner_framework, attribute, value)
+    scanner_framework.generate_lexical_analyzer(regex_file)
+    return scanner_framework
+
+
+def load_scanner_test_data(test_case_name: str = "test2"):
+    """
+    Returns (regex_file, entry_text, reference) for a test_data directory, where reference
+    is the output of analyze() on a plain lexical analyzer (full DFA, no reserved-word
+    table, no DFA cache), against which the optional scanner features are compared.
+    """
+    test_data_dir = os.path.join(PROJECT_ROOT, "tests", "test_data", test_case_name)
+    regex_file = os.path.join(test_data_dir, "regex.txt")
+    with open(os.path.join(test_data_dir, "entry.txt"), 'r', encoding='utf-8') as f:
+        entry_text = f.read()
+    reference = list(build_scanner(regex_file, reserved_word_table=False).analyze(entry_text))
+    return regex_file, entry_text, reference
+
+
+def report_scanner_test(test_case_name: str, tokens, expected, condition: bool = True, detail: str = ""):
+    """Prints the result of a scanner test: the tokens must equal the expected ones and condition must hold."""
+    if tokens != expected:
+        print(f"\nTest case '{test_case_name}' FAILED: tokens differ from analyze().")
+    elif not condition:
+        print(f"\nTest case '{test_case_name}' FAILED: {detail}")
+    else:
+        print(f"\nTest case '{test_case_name}' PASSED: tokens match analyze().")
+
+
+def run_minimization_test():
+    """
+    Hopcroft minimization reaches the known minimal DFA, never merges accept states of
+    different token types, and keeps token priorities in a generated lexer.
+    """
+    test_case_name = "dfa_minimization"
+    print(f"\n--- Running test case: '{test_case_name}' ---")
+
+    # (a|b)*abb by the subset construction: A and C are equivalent, the minimal DFA has 4 states
+    moves = {'A': 'BC', 'B': 'BD', 'C': 'BC', 'D': 'BE', 'E': 'BC'}
+    dfa = DeterministicFiniteAutomata(
+        states=set(moves), alphabet={'a', 'b'},
+        transitions={(state, symbol): target for state, targets in moves.items()
+                     for symbol, target in zip('ab', targets)},
+        start_state='A', accept_states={'E'})
+    minimized, state_map = dfa.minimize()
+    samples = ["", "abb", "aabb", "babb", "ab", "abba", "bbabb"]
+    if (len(minimized.states) != 4 or state_map['A'] != state_map['C']
+            or [minimized.process(w) for w in samples] != [dfa.process(w) for w in samples]):
+        print(f"\nTest case '{test_case_name}' FAILED: (a|b)*abb minimized to {len(minimized.states)} states.")
+        return
+
+    # ab and cb end in equivalent states, which only stay apart when labelled with their token types
+    dfa = DeterministicFiniteAutomata(
+        states={'S', 'X', 'Y', 'AB', 'CB'}, alphabet={'a', 'b', 'c'},
+        transitions={('S', 'a'): 'X', ('S', 'c'): 'Y', ('X', 'b'): 'AB', ('Y', 'b'): 'CB'},
+        start_state='S', accept_states={'AB', 'CB'})
+    unlabelled, _ = dfa.minimize()
+    labelled, state_map = dfa.minimize({'AB': 'AB', 'CB': 'CB'})
+    if len(unlabelled.states) != 3 or len(labelled.states) != 5 or state_map['AB'] == state_map['CB']:
+        print(f"\nTest case '{test_case_name}' FAILED: accept states of different token types were merged.")
+        return
+
+    regex_file = write_temp_file("AB: ab\nCB: cb\nID: [a-c]+\n")
+    try:
+        tokens = [(t.token_type, t.lexeme) for t in build_scanner(regex_file).analyze("ab cb abc cc")]
+    finally:
+        os.remove(regex_file)
+    expected = [("AB", "ab"), ("CB", "cb"), ("ID", "abc"), ("ID", "cc")]
+    if tokens != expected:
+        print(f"\nTest case '{test_case_name}' FAILED: got {tokens}, expected {expected}.")
+        return
+    print(f"\nTest case '{test_case_name}' PASSED: minimal DFAs and token priorities match.")
+
+
+def run_rule_minimization_test():
+    """
+    With minimize_rule_dfas, each rule DFA is minimized before the union, its state counts
+    are recorded in rule_minimization_stats, and the lexer scans as without it.
+    """
+    test_case_name = "rule_minimization_stats"
+    print(f"\n--- Running test case: '{test_case_name}' ---")
+
+    regex_file, entry_text, reference = load_scanner_test_data()
+    scanner_framework = build_scanner(regex_file, minimize_rule_dfas=True, reserved_word_table=False)
+    stats = scanner_framework.rule_minimization_stats
+    with open(regex_file, 'r', encoding='utf-8') as f:
+        rule_names = {line.split(':', 1)[0].strip() for line in f if line.strip()}
+    if set(stats) != rule_names:
+        print(f"\nTest case '{test_case_name}' FAILED: stats for {sorted(stats)}, expected {sorted(rule_names)}.")
+        return
+
+    # The followpos DFA of ab|cb has one state after a and another after c; minimized, they merge
+    small_regex_file = write_temp_file("X: ab|cb\n")
+    try:
+        small_framework = build_scanner(small_regex_file, minimize_rule_dfas=True)
+    finally:
+        os.remove(small_regex_file)
+    small_stats = small_framework.rule_minimization_stats.get('X', {})
+    if (small_stats.get('states_before'), small_stats.get('states_after')) != (4, 3) or small_stats['seconds'] < 0:
+        print(f"\nTest case '{test_case_name}' FAILED: unexpected stats for ab|cb: {small_stats}.")
+        return
+    report_scanner_test(test_case_name, list(scanner_framework.analyze(entry_text)), reference,
+                        all(s['states_after'] <= s['states_before'] for s in stats.values()),
+                        f"a rule DFA grew when minimized: {stats}.")
+
+
+def run_token_stream_peek_test(chunk_size: int = 3):
+    """
+    TokenStream.peek returns the upcoming tokens without consuming them, also when the
+    next token continues in a later chunk, and None once the input ends.
+    """
+    test_case_name = "token_stream_peek"
+    print(f"\n--- Running test case: '{test_case_name}' ---")
+
+    regex_file, entry_text, reference = load_scanner_test_data()
+    if not any(token.start // chunk_size != (token.end - 1) // chunk_size for token in reference):
+        print(f"\nTest case '{test_case_name}' FAILED: no token crosses a chunk boundary.")
+        return
+
+    chunks = [entry_text[i:i + chunk_size] for i in range(0, len(entry_text), chunk_size)]
+    stream = build_scanner(regex_file).iter_tokens(chunks, chunk_size=chunk_size)
+    consumed = []
+    while True:
+        upcoming, after = stream.peek(), stream.peek(1)
+        if stream.peek() != upcoming:
+            print(f"\nTest case '{test_case_name}' FAILED: peek() consumed a token.")
+            return
+        if upcoming is None:
+            break
+        token = next(stream)
+        if token != upcoming or stream.peek() != after:
+            print(f"\nTest case '{test_case_name}' FAILED: next() returned {token}, peek() returned {upcoming}.")
+            return
+        consumed.append(token)
+
+    if stream.peek(1) is not None or next(stream, None) is not None:
+        print(f"\nTest case '{test_case_name}' FAILED: tokens left after the end of the input.")
+        return
+    try:
+        stream.peek(stream.lookahead)
+        print(f"\nTest case '{test_case_name}' FAILED: peek() accepted a position beyond the lookahead.")
+        return
+    except ValueError:
+        pass
+    report_scanner_test(test_case_name, consumed, reference)
+
+
+def run_token_buffer_test():
+    """
+    analyze() returns a TokenBuffer, empty on errors, whose column accessors and NumPy
+    export (when numpy is installed) agree with its tokens.
+    """
+    test_case_name = "token_buffer"
+    print(f"\n--- Running test case: '{test_case_name}' ---")
+
+    empty = SgFramework(QuietApplication()).analyze("if x")  # No lexical analyzer loaded
+    if not isinstance(empty, TokenBuffer) or len(empty) != 0:
+        print(f"\nTest case '{test_case_name}' FAILED: analyze() without a lexer returned {empty!r}.")
+        return
+
+    regex_file, entry_text, reference = load_scanner_test_data()
+    tokens = build_scanner(regex_file).analyze(entry_text)
+    columns = [(tokens.lexeme(i), tokens.type_name(i), *tokens.span(i)) for i in range(len(tokens))]
+    if not isinstance(tokens, TokenBuffer) or columns != [tuple(token) for token in reference]:
+        print(f"\nTest case '{test_case_name}' FAILED: the buffer columns differ from its tokens.")
+        return
+
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print(f"\nTest case '{test_case_name}' PASSED: columns match (to_numpy skipped: numpy is not installed).")
+        return
+    exported = tokens.to_numpy()
+    if ([tokens.token_types[type_id] for type_id in exported['type']] != [token.token_type for token in reference]
+            or exported['start'].tolist() != [token.start for token in reference]
+            or exported['end'].tolist() != [token.end for token in reference]
+            or len(empty.to_numpy()) != 0):
+        print(f"\nTest case '{test_case_name}' FAILED: to_numpy() differs from the tokens.")
+        return
+    print(f"\nTest case '{test_case_name}' PASSED: columns and to_numpy() match the tokens.")
+
+
+def run_linear_time_test():
+    """Linear-time tokenization gives the same tokens as the plain scan, in every scanning mode."""
+    test_case_name = "linear_time_tokenization"
+    print(f"\n--- Running test case: '{test_case_name}' ---")
+
+    regex_file, entry_text, reference = load_scanner_test_data()
+    scanner_framework = build_scanner(regex_file, linear_time_tokenization=True)
+    tokens = list(scanner_framework.analyze(entry_text))
+    entry_file = write_temp_file(entry_text)
+    try:
+        with scanner_framework.analyze_file(entry_file) as mapped:
+            mapped_tokens = [(t.lexeme, t.token_type) for t in mapped]
+    finally:
+        os.remove(entry_file)
+    same_modes = (list(scanner_framework.iter_tokens(entry_text, chunk_size=3)) == tokens
+                  and mapped_tokens == [(t.lexeme, t.token_type) for t in tokens])
+
+    # `a` and `a*b` on a run of a's: the plain scanner rescans the run for every token
+    quadratic_regex_file = write_temp_file("A: a\nAB: a*b\n")
+    try:
+        quadratic_text = "a" * 300 + " aab aaa"
+        plain = list(build_scanner(quadratic_regex_file).analyze(quadratic_text))
+        linear = list(build_scanner(quadratic_regex_file, linear_time_tokenization=True).analyze(quadratic_text))
+    finally:
+        os.remove(quadratic_regex_file)
+    report_scanner_test(test_case_name, tokens, reference, same_modes and plain == linear,
+                        "the linear-time scan differs from the plain scan.")
+
+
+def run_parallel_lexing_test():
+    """analyze_parallel splits the input in chunks and still gives the tokens of analyze()."""
+    test_case_name = "analyze_parallel"
+    print(f"\n--- Running test case: '{test_case_name}' ---")
+
+    regex_file, entry_text, reference = load_scanner_test_data()
+    tokens = list(build_scanner(regex_file).analyze_parallel(entry_text, max_workers=2, chunk_size=16))
+    linear_framework = build_scanner(regex_file, linear_time_tokenization=True)
+    linear_tokens = list(linear_framework.analyze_parallel(entry_text, max_workers=2, chunk_size=16))
+    report_scanner_test(test_case_name, tokens, reference, linear_tokens == reference,
+                        "the linear-time parallel scan differs from analyze().")
+
+
+class RecordingApplication(QuietApplication):
+    """Quiet mock application that keeps the log messages in self.messages."""
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def log(self, message: str, level: str = "NORMAL"):
+        self.messages.append(message)
+
+
+def run_parallel_compilation_test():
+    """Rules compiled in a process pool give the same transition table as sequential compilation."""
+    test_case_name = "parallel_compilation"
+    print(f"\n--- Running test case: '{test_case_name}' ---")
+
+    regex_file, entry_text, reference = load_scanner_test_data()
+    table_fields = ('range_starts', 'range_ends', 'range_classes', 'rows', 'accept', 'token_types', 'reserved_words')
+    problems = []
+    for settings in ({}, {"combined_construction": False}):
+        tables = []
+        for parallel in (False, True):
+            application = RecordingApplication()
+            scanner_framework = SgFramework(application)
+            scanner_framework.save_to_file = False
+            scanner_framework.use_dfa_cache = False
+            for attribute, value in settings.items():
+                setattr(scanner_framework, attribute, value)
+            scanner_framework.set_parallel_compilation(parallel, max_workers=2)
+            scanner_framework.generate_lexical_analyzer(regex_file)
+            table = scanner_framework.current_lexical_analyzer.table
+            tables.append([list(getattr(table, field)) if field != 'reserved_words' else table.reserved_words
+                           for field in table_fields])
+        tokens = list(scanner_framework.analyze(entry_text))
+        if tokens != reference:
+            break
+        if not any("compiladas em paralelo" in message for message in application.messages):
+            problems.append(f"{settings}: the process pool was not used")
+        if tables[0] != tables[1]:
+            problems.append(f"{settings}: parallel and sequential tables differ")
+    report_scanner_test(test_case_name, tokens, reference, not problems, "; ".join(problems) + ".")
+
+
+def run_reserved_word_table_test():
+    """Keywords resolved by the reserved-word table are classified as if they were in the DFA."""
+    test_case_name = "reserved_word_table"
+    print(f"\n--- Running test case: '{test_case_name}' ---")
+
+    regex_file, entry_text, reference = load_scanner_test_data()
+    scanner_framework = build_scanner(regex_file, reserved_word_table=True)
+    reserved = scanner_framework.current_lexical_analyzer.reserved_words
+    report_scanner_test(test_case_name, list(scanner_framework.analyze(entry_text)), reference,
+                        set(reserved) == {"IF", "ELSE"}, f"unexpected reserved words {reserved}.")
+
+
+def run_rule_dfas_on_demand_test():
+    """With the combined construction, per-rule DFAs are built only for the files saved to generated_afds."""
+    test_case_name = "rule_dfas_on_demand"
+    print(f"\n--- Running test case: '{test_case_name}' ---")
+
+    regex_file, entry_text, reference = load_scanner_test_data()
+    compiled = []
+    regex_to_dfa = RegexProcessor.regex_to_dfa
+
+    def counting_regex_to_dfa(regex):
+        compiled.append(regex)
+        return regex_to_dfa(regex)
+
+    cwd = os.getcwd()
+    RegexProcessor.regex_to_dfa = staticmethod(counting_regex_to_dfa)
+    try:
+        scanner_framework = build_scanner(regex_file)
+        built_without_saving = len(compiled)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.chdir(temp_dir)
+            scanner_framework = build_scanner(regex_file, save_to_file=True)
+            saved = sorted(os.listdir("generated_afds"))
+    finally:
+        os.chdir(cwd)
+        RegexProcessor.regex_to_dfa = staticmethod(regex_to_dfa)
+
+    lexical_analyzer = scanner_framework.current_lexical_analyzer
+    expected_files = sorted(f"{key}.txt" for key in lexical_analyzer.rules)
+    report_scanner_test(test_case_name, list(scanner_framework.analyze(entry_text)), reference,
+                        built_without_saving == 0 and saved == expected_files
+                        and len(compiled) == len(expected_files),
+                        f"{built_without_saving} DFAs built without saving, {len(compiled)} built "
+                        f"to save {saved}.")
+
+
+def run_lazy_dfa_test():
+    """A lazy DFA with a tiny cache flushes it, or stops caching, without changing the tokens."""
+    test_case_name = "lazy_dfa"
+    print(f"\n--- Running test case: '{test_case_name}' ---")
+
+    regex_file, entry_text, reference = load_scanner_test_data()
+    for min_hits_per_miss, expect_fallback in ((0, False), (None, True)):
+        scanner_framework = build_scanner(regex_file, lazy_dfa=True)
+        table = scanner_framework.current_lexical_analyzer.table
+        table.max_states = 2
+        if min_hits_per_miss is not None:
+            table.min_hits_per_miss = min_hits_per_miss
+        tokens = list(scanner_framework.analyze(entry_text))
+        stats = table.stats()
+        if tokens != reference or stats['flushes'] == 0 or stats['fallback'] != expect_fallback:
+            break
+    report_scanner_test(test_case_name, tokens, reference,
+                        stats['flushes'] > 0 and stats['fallback'] == expect_fallback,
+                        f"unexpected cache behaviour {stats}.")
+
+
+def run_char_cache_limit_test():
+    """Characters past CHAR_CACHE_MAX_SIZE are looked up without growing the per-character caches."""
+    test_case_name = "char_cache_limit"
+    print(f"\n--- Running test case: '{test_case_name}' ---")
+
+    regex_file, entry_text, _ = load_scanner_test_data()
+    # Many distinct non-Latin-1 characters between the tokens of the entry text
+    text = entry_text + " ".join(chr(0x3400 + i) + word for i, word in enumerate(entry_text.split()))
+    reference = list(build_scanner(regex_file, reserved_word_table=False).analyze(text))
+    limit = 0x100 + 8
+    saved_limit = scanner_config.CHAR_CACHE_MAX_SIZE
+    scanner_config.CHAR_CACHE_MAX_SIZE = limit
+    try:
+        for lazy in (False, True):
+            scanner_framework = build_scanner(regex_file, reserved_word_table=False, lazy_dfa=lazy)
+            tokens = list(scanner_framework.analyze(text))
+            table = scanner_framework.current_lexical_analyzer.table
+            cache_size = len(table.char_atoms if lazy else table.char_classes)
+            if tokens != reference or cache_size > limit:
+                break
+    finally:
+        scanner_config.CHAR_CACHE_MAX_SIZE = saved_limit
+    report_scanner_test(test_case_name, tokens, reference, cache_size <= limit,
+                        f"cache holds {cache_size} characters, limit is {limit}.")
+
+
+def run_dfa_cache_test():
+    """
+    A rebuild finds every cache entry exactly once, with the combined construction and with
+    per-rule DFAs, and editing one rule recompiles only that rule.
+    """
+    test_case_name = "dfa_cache"
+    print(f"\n--- Running test case: '{test_case_name}' ---")
+
+    regex_file, entry_text, reference = load_scanner_test_data()
+    with open(regex_file, 'r', encoding='utf-8') as f:
+        rules_text = f.read()
+    edited_file = write_temp_file(rules_text.replace("NUM: [0-9]+", "NUM: [0-9][0-9]*"))
+    problems = []
+    try:
+        for settings in ({}, {"combined_construction": False, "parallel_compilation": True}):
+            with tempfile.TemporaryDirectory() as cache_dir:
+                build_scanner(regex_file, use_dfa_cache=True, dfa_cache=DfaCache(cache_dir), **settings)
+                entries = len(os.listdir(cache_dir))
+
+                cache = DfaCache(cache_dir)
+                scanner_framework = build_scanner(regex_file, use_dfa_cache=True, dfa_cache=cache, **settings)
+                tokens = list(scanner_framework.analyze(entry_text))
+                if tokens != reference:
+                    break
+                if (cache.hits, cache.misses) != (entries, 0):
+                    problems.append(f"{settings}: rebuild had {cache.hits} hits, {cache.misses} misses "
+                                    f"for {entries} entries")
+
+                cache = DfaCache(cache_dir)
+                build_scanner(edited_file, use_dfa_cache=True, dfa_cache=cache, **settings)
+                new_entries = len(os.listdir(cache_dir)) - entries
+                if not 0 < new_entries < entries or (cache.hits, cache.misses) != (entries - new_entries, new_entries):
+                    problems.append(f"{settings}: edited rebuild had {cache.hits} hits, {cache.misses} misses "
+                                    f"and {new_entries} new entries")
+    finally:
+        os.remove(edited_file)
+    report_scanner_test(test_case_name, tokens, reference, not problems, "; ".join(problems) + ".")
+
+
+def run_lexer_image_test():
+    """A lexer saved as a binary image and loaded back scans like the original."""
+    test_case_name = "lexer_image"
+    print(f"\n--- Running test case: '{test_case_name}' ---")
+
+    regex_file, entry_text, reference = load_scanner_test_data()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        image_path = os.path.join(temp_dir, "lexer.bin")
+        saved = build_scanner(regex_file).save_lexical_analyzer(image_path)
+        loaded_framework = SgFramework(QuietApplication())
+        loaded = saved and loaded_framework.load_lexical_analyzer(image_path) is not None
+        tokens = list(loaded_framework.analyze(entry_text)) if loaded else None
+    report_scanner_test(test_case_name, tokens, reference)
+
+
+def run_scanner_codegen_test():
+    """The standalone scanner module tokenizes like the lexer it was generated from."""
+    test_case_name = "scanner_codegen"
+    print(f"\n--- Running test case: '{test_case_name}' ---")
+
+    regex_file, entry_text, reference = load_scanner_test_data()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        module_path = os.path.join(temp_dir, "generated_scanner.py")
+        tokens = None
+        if build_scanner(regex_file).export_lexical_analyzer_module(module_path):
+            spec = importlib.util.spec_from_file_location("generated_scanner", module_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            tokens = [tuple(token) for token in module.tokenize(entry_text)]
+    report_scanner_test(test_case_name, tokens, [tuple(token) for token in reference])
+
+
+# Gramática LALR(1) que não é SLR: FOLLOW(R) contém EQ, que conflita com o shift de EQ após L
+LALR_NOT_SLR_GRAMMAR = """
+<S> ::= <L> EQ <R> | <R>
+<L> ::= STAR <R> | ID
+<R> ::= <L>
+"""
+
+
+def check_table_construction(test_case_name: str, grammar_str: str, expected_conflicts, accepted, rejected) -> bool:
+    """
+    Generates a parser for the grammar with each method of expected_conflicts (method ->
+    whether a conflict is expected) and checks that conflicts are reported exactly where
+    expected and that each generated parser accepts the sentences of `accepted` and rejects
+    those of `rejected` (token types separated by spaces). Prints the failure, if any.
+    """
+    grammar = ParserGenerator._parse_grammar_from_string(grammar_str)
+    for method, expect_conflict in expected_conflicts.items():
+        try:
+            parser = ParserGenerator.generate_parser(grammar, test_case_name, method)
+        except ValueError as e:
+            if "Conflito" not in str(e):
+                raise
+            parser = None
+        if (parser is None) != expect_conflict:
+            print(f"\nTest case '{test_case_name}' FAILED: {method.upper()} "
+                  f"{'reported an unexpected conflict' if parser is None else 'did not report a conflict'}.")
+            return False
+        if parser is None:
+            continue
+
+        for sentence in accepted + rejected:
+            tokens = [(token_type.lower(), token_type) for token_type in sentence.split()]
+            try:
+                result = parser.parse(tokens)
+            except ValueError:
+                result = False
+            if result != (sentence in accepted):
+                print(f"\nTest case '{test_case_name}' FAILED: {method.upper()} "
+                      f"{'rejected' if sentence in accepted else 'accepted'} '{sentence}'.")
+                return False
+    return True
+
+
+def run_lalr_construction_test():
+    """LALR(1) lookaheads resolve the conflicts that SLR reports on an LALR(1) grammar."""
+    test_case_name = "lalr_construction"
+    print(f"\n--- Running test case: '{test_case_name}' ---")
+
+    if check_table_construction(test_case_name, LALR_NOT_SLR_GRAMMAR,
+                                {parser_config.SLR: True, parser_config.LALR: False},
+                                ["ID EQ STAR ID", "STAR STAR ID", "ID"], ["ID EQ", "EQ ID"]):
+        print(f"\nTest case '{test_case_name}' PASSED: conflicts and parses match.")
+
+
+# Gramática LR(1) que não é LALR(1): fundir os estados com X -> C . e Y -> C . gera
+# um conflito reduce/reduce em D e E
+LR1_NOT_LALR_GRAMMAR = """
+<S> ::= A <X> D | B <Y> D | A <Y> E | B <X> E
+<X> ::= C
+<Y> ::= C
+"""
+
+
+def run_lr1_construction_test():
+    """LR(1) with state merging accepts grammars whose LALR(1) tables have conflicts."""
+    test_case_name = "lr1_construction"
+    print(f"\n--- Running test case: '{test_case_name}' ---")
+
+    if (check_table_construction(test_case_name, LR1_NOT_LALR_GRAMMAR,
+                                 {parser_config.SLR: True, parser_config.LALR: True, parser_config.LR1: False},
+                                 ["A C D", "B C D", "A C E", "B C E"], ["A C C", "A D"])
+            and check_table_construction(test_case_name, LALR_NOT_SLR_GRAMMAR, {parser_config.LR1: False},
+                                         ["ID EQ STAR ID", "STAR STAR ID", "ID"], ["ID EQ", "EQ ID"])):
+        print(f"\nTest case '{test_case_name}' PASSED: conflicts and parses match.")
+
+
+def parse_table_mismatches(parser, tables) -> List[str]:
+    """
+    Compares the packed ParseTable of a parser with the dict tables it was built from,
+    for every state and symbol. Terminals without an explicit action may only return
+    the state's default reduction; GOTO is compared wherever the dict defines it.
+    """
+    table = parser.table
+    mismatches = []
+    if table.n_states != len(tables['action']):
+        mismatches.append(f"{table.n_states} states, expected {len(tables['action'])}")
+    for state in range(table.n_states):
+        row = tables['action'][state]
+        for terminal in row:
+            if terminal not in table.terminal_ids:
+                mismatches.append(f"terminal '{terminal}' missing from the table")
+        for terminal, terminal_id in table.terminal_ids.items():
+            got = ParseTable.decode(table.action(state, terminal_id))
+            expected = row.get(terminal)
+            if got != expected and not (expected is None and got is not None and got[0] == 'reduce'):
+                mismatches.append(f"action[{state}][{terminal}] = {got}, expected {expected}")
+        for non_terminal, target in tables['goto'][state].items():
+            got = table.goto(state, table.non_terminal_ids[non_terminal])
+            if got != target:
+                mismatches.append(f"goto[{state}][{non_terminal}] = {got}, expected {target}")
+    return mismatches
+
+
+def run_parse_table_test():
+    """The packed ParseTable answers like the ACTION/GOTO dicts it was built from."""
+    test_case_name = "parse_table"
+    print(f"\n--- Running test case: '{test_case_name}' ---")
+
+    grammars = [("LALR but not SLR", LALR_NOT_SLR_GRAMMAR), ("LR(1) but not LALR", LR1_NOT_LALR_GRAMMAR)]
+    for test_data in ("test1", "aritmetica", "test2"):
+        with open(os.path.join(PROJECT_ROOT, "tests", "test_data", test_data, "grammar.txt"), encoding='utf-8') as f:
+            grammars.append((test_data, f.read()))
+
+    for grammar_name, grammar_str in grammars:
+        grammar = ParserGenerator._parse_grammar_from_string(grammar_str)
+        for method in parser_config.TABLE_CONSTRUCTION_METHODS:
+            try:
+                tables = ParserGenerator._build_parsing_table(grammar, method)
+            except ValueError as e:
+                if "Conflito" not in str(e):
+                    raise
+                continue
+            mismatches = parse_table_mismatches(SLRParser(tables, grammar_name), tables)
+            if mismatches:
+                print(f"\nTest case '{test_case_name}' FAILED: {grammar_name} with {method.upper()}: {mismatches[:5]}")
+                return
+    print(f"\nTest case '{test_case_name}' PASSED: packed tables match the dict tables.")
+
+
 def run_framework_test(test_case_name: str, expect_success: bool = True):
     """
     Runs a complete test for the scanner and parser frameworks using
@@ -138,12 +780,37 @@ def run_framework_test(test_case_name: str, expect_success: bool = True):
     try:
         tokens: List[Tuple[str, str]] = scanner_framework.analyze(entry_text)
         print("Lexical analysis complete. Generated tokens:")
-        for token_type, token_value in tokens:
-            print(f"  ({token_type}, '{token_value}')")
+        for token in tokens:
+            print(f"  ({token.token_type}, '{token.lexeme}', {token.start}:{token.end})")
     except Exception as e:
         print(f"Error during lexical analysis: {e}")
         return
 
+    # --- 5b. Streaming tokenizer must match the in-memory analysis ---
+    print("\nStreaming entry text in small chunks...")
+    with open(entry_file, 'r', encoding='utf-8') as f:
+        streamed_tokens = list(scanner_framework.iter_tokens(f, chunk_size=3))
+    if streamed_tokens != list(tokens):
+        print(f"\nTest case '{test_case_name}' FAILED: streamed tokens differ from analyze().")
+        return
+    print("Streamed tokens match.")
+
+    # --- 5c. Memory-mapped scanning of the entry file must match too ---
+    with scanner_framework.analyze_file(entry_file) as mapped:
+        mapped_tokens = [(t.lexeme, t.token_type) for t in mapped]
+    if mapped_tokens != [(t.lexeme, t.token_type) for t in tokens]:
+        print(f"\nTest case '{test_case_name}' FAILED: memory-mapped tokens differ from analyze().")
+        return
+    # The file stays mapped after the iteration ends, until the result is closed
+    collected = list(scanner_framework.analyze_file(entry_file))
+    if [(t.lexeme, t.token_type) for t in collected] != mapped_tokens:
+        print(f"\nTest case '{test_case_name}' FAILED: lexemes unreadable after the mapped iteration ended.")
+        return
+    if scanner_framework.analyze_file(os.path.join(test_data_dir, "missing.txt")) is not None:
+        print(f"\nTest case '{test_case_name}' FAILED: analyze_file accepted a missing file.")
+        return
+    print("Memory-mapped tokens match.")
+
     # --- 6. Parse Tokens with Parser ---
     print("\nParsing tokens with the generated parser...")
     try:
@@ -178,3 +845,37 @@ if __name__ == "__main__":
 
     run_framework_test("test2", True)
 
+    run_large_rule_count_test()
+
+    run_char_class_escape_test()
+
+    run_minimization_test()
+
+    run_rule_minimization_test()
+
+    run_token_buffer_test()
+
+    run_token_stream_peek_test()
+
+    run_linear_time_test()
+
+    run_parallel_lexing_test()
+    run_parallel_compilation_test()
+
+    run_reserved_word_table_test()
+    run_rule_dfas_on_demand_test()
+
+    run_lazy_dfa_test()
+    run_char_cache_limit_test()
+
+    run_dfa_cache_test()
+
+    run_lexer_image_test()
+
+    run_scanner_codegen_test()
+
+    run_lalr_construction_test()
+
+    run_lr1_construction_test()
+
+    run_parse_table_test()